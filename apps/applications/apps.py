@@ -5,5 +5,7 @@ class ApplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.applications'
     verbose_name = "Quản lý ứng tuyển"
-    
-   
\ No newline at end of file
+
+    def ready(self):
+        """Import signals when app is ready"""
+        import apps.applications.signals  # noqa
@@ -0,0 +1,50 @@
+"""
+Email phỏng vấn (ghi vào EmailOutbox, worker `emails` gửi)
+dedupe_key gắn với buổi phỏng vấn + giờ phỏng vấn => task retry không gửi trùng,
+đổi giờ phỏng vấn thì ứng viên nhận email mới
+"""
+from apps.notifications.outbox import EmailOutboxService
+from .utils import generate_ics_content
+
+
+def interview_invitation_email(interview):
+    """Thư mời phỏng vấn kèm file .ics (interview cần application__candidate, application__job__company)"""
+    candidate = interview.application.candidate
+    job = interview.application.job
+
+    subject = f"📅 Thư mời phỏng vấn: {job.title} tại {job.company.name}"
+    body = f"""
+    Xin chào {candidate.full_name},
+    
+    Công ty {job.company.name} trân trọng mời bạn tham gia buổi phỏng vấn cho vị trí {job.title}.
+    
+    ⏰ Thời gian: {interview.interview_date.strftime('%H:%M %d/%m/%Y')}
+    📍 Địa điểm/Link: {interview.meeting_link or interview.location}
+    📝 Ghi chú: {interview.note}
+    
+    Vui lòng kiểm tra file lịch (.ics) đính kèm để thêm vào lịch của bạn.
+    
+    Trân trọng,
+    OneTop Recruitment Team
+    """
+
+    return EmailOutboxService.build(
+        to_email=candidate.email,
+        subject=subject,
+        body=body,
+        dedupe_key=f"interview-invite:{interview.id}:{interview.interview_date:%Y%m%d%H%M}",
+        attachments=[('interview_invite.ics', generate_ics_content(interview), 'text/calendar')],
+    )
+
+
+def interview_reminder_email(interview):
+    """Nhắc lịch phỏng vấn trước 1 tiếng"""
+    return EmailOutboxService.build(
+        to_email=interview.application.candidate.email,
+        subject="🔔 Nhắc nhở: Bạn có lịch phỏng vấn sau 1 tiếng nữa!",
+        body=(
+            f"Đừng quên buổi phỏng vấn vị trí {interview.application.job.title} "
+            f"lúc {interview.interview_date.strftime('%H:%M')} nhé!"
+        ),
+        dedupe_key=f"interview-reminder:{interview.id}:{interview.interview_date:%Y%m%d%H%M}",
+    )
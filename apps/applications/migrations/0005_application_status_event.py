@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_status_events(apps, schema_editor):
+    """
+    Đơn ứng tuyển có trước bảng event: 1 event nộp đơn (created_at)
+    + 1 event sang trạng thái hiện tại (updated_at) nếu đã khác PENDING
+    Sau migrate chạy `manage.py rollup_job_stats --since ...` để tính bucket cho các ngày cũ
+    """
+    Application = apps.get_model('applications', 'Application')
+    ApplicationStatusEvent = apps.get_model('applications', 'ApplicationStatusEvent')
+
+    rows = Application.objects.order_by('pkid').values_list('pkid', 'job_id', 'status', 'created_at', 'updated_at')
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pkid__gt=last_pk)[:1000])
+        if not batch:
+            return
+        events = []
+        for pk, job_id, status, created_at, updated_at in batch:
+            events.append(ApplicationStatusEvent(
+                application_id=pk, job_id=job_id, from_status=None, to_status='PENDING', created_at=created_at,
+            ))
+            if status != 'PENDING':
+                events.append(ApplicationStatusEvent(
+                    application_id=pk, job_id=job_id, from_status='PENDING', to_status=status, created_at=updated_at,
+                ))
+        ApplicationStatusEvent.objects.bulk_create(events)
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_interviewschedule'),
+        ('jobs', '0009_job_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('PENDING', 'Chờ duyệt'), ('VIEWED', 'Nhà tuyển dụng đã xem'), ('INTERVIEW', 'Mời phỏng vấn'), ('REJECTED', 'Từ chối'), ('ACCEPTED', 'Đã trúng tuyển')], max_length=20, null=True)),
+                ('to_status', models.CharField(choices=[('PENDING', 'Chờ duyệt'), ('VIEWED', 'Nhà tuyển dụng đã xem'), ('INTERVIEW', 'Mời phỏng vấn'), ('REJECTED', 'Từ chối'), ('ACCEPTED', 'Đã trúng tuyển')], max_length=20)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('application', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_events', to='applications.application')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='application_events', to='jobs.job')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['job', 'created_at'], name='application_event_job_time')],
+            },
+        ),
+        migrations.RunPython(backfill_status_events, migrations.RunPython.noop),
+    ]
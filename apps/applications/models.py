@@ -2,6 +2,7 @@ from django.db import models
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from apps.core.models import TimeStampedModel
 from apps.jobs.models import Job
 # [REFACTOR] Import validator chung để tránh lặp code
@@ -53,6 +54,29 @@ class Application(TimeStampedModel):
     def __str__(self):
         return f"{self.candidate.full_name} applied to {self.job.title}"
 
+class ApplicationStatusEvent(models.Model):
+    """
+    Lịch sử đổi trạng thái đơn ứng tuyển (append-only: chỉ INSERT, không sửa/xóa)
+    from_status NULL = lúc nộp đơn. Nguồn tính JobDailyStats (apps/jobs/analytics.py)
+    """
+    # Không ràng buộc FK: xóa đơn ứng tuyển vẫn giữ lịch sử cho số liệu các ngày đã qua
+    application = models.ForeignKey(
+        Application, on_delete=models.DO_NOTHING, db_constraint=False, related_name='status_events',
+    )
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='application_events')
+    from_status = models.CharField(max_length=20, choices=Application.Status.choices, null=True, blank=True)
+    to_status = models.CharField(max_length=20, choices=Application.Status.choices)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['job', 'created_at'], name='application_event_job_time'),
+        ]
+
+    def __str__(self):
+        return f"{self.application_id}: {self.from_status} -> {self.to_status}"
+
 # [TÍNH NĂNG MỚI] Model Quản lý lịch phỏng vấn
 class InterviewSchedule(TimeStampedModel):
     class Status(models.TextChoices):
@@ -2,18 +2,20 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 from django.utils.translation import gettext_lazy as _
 from .models import Application, InterviewSchedule
+from apps.core.fieldsets import DynamicFieldsMixin
+from apps.core.soft_delete import SoftDeletePrefetchListSerializer, prefetch_soft_deleted
 from apps.jobs.serializers import JobSerializer
 from apps.jobs.models import Job
 from apps.users.serializers import UserSerializer
 
 # [TÍNH NĂNG MỚI] Serializer cho lịch phỏng vấn
-class InterviewScheduleSerializer(serializers.ModelSerializer):
+class InterviewScheduleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = InterviewSchedule
         fields = '__all__'
         read_only_fields = ['application'] # Application ID sẽ được gán tự động trong View
 
-class ApplicationSerializer(serializers.ModelSerializer):
+class ApplicationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Nhúng thông tin Job và Candidate để Frontend hiển thị chi tiết
     job_info = JobSerializer(source='job', read_only=True)
     candidate_info = UserSerializer(source='candidate', read_only=True)
@@ -21,10 +23,19 @@ class ApplicationSerializer(serializers.ModelSerializer):
     # [TÍNH NĂNG MỚI] Nhúng thông tin lịch phỏng vấn (nếu có) vào response
     interview_schedule = InterviewScheduleSerializer(read_only=True)
 
+    # Job nạp qua all_objects (kể cả đã xóa mềm), list thì nạp 1 lần cho cả trang
+    soft_delete_related = {'job': Job.all_objects.select_related('company')}
+
     class Meta:
         model = Application
         fields = '__all__'
         read_only_fields = ['id', 'candidate', 'created_at', 'updated_at', 'status']
+        # List: bỏ cover_letter/note (TEXT dài), job_info là job card (?expand=cover_letter,note để lấy thêm)
+        list_fields = (
+            'id', 'job', 'job_info', 'candidate', 'candidate_info', 'cv_file', 'status',
+            'interview_schedule', 'created_at', 'updated_at',
+        )
+        list_serializer_class = SoftDeletePrefetchListSerializer
         
         # Validate: Đảm bảo 1 người không nộp 2 lần cho 1 job ngay tại Serializer
         validators = [
@@ -40,28 +51,19 @@ class ApplicationSerializer(serializers.ModelSerializer):
         CRITICAL FIX: Handle soft-deleted jobs in application history
         
         When a job is soft-deleted (is_deleted=True), we still need to show it in user's application history.
-        Using instance.job_id (raw FK field) instead of instance.job (which returns None for soft-deleted jobs).
+        The job is loaded through all_objects by prefetch_soft_deleted (once per page for lists,
+        no query at all when the view already select_related it), so job_info always carries is_deleted
+        for the frontend to show "This job is no longer available".
         """
+        prefetch_soft_deleted([instance], 'job', self.soft_delete_related['job'])
         representation = super().to_representation(instance)
         
-        # CRITICAL FIX: Use job_id (raw foreign key) instead of job object
-        # instance.job returns None if job is soft-deleted (SoftDeleteManager filters it out)
-        # but instance.job_id always contains the actual ID from database
-        if instance.job_id:
-            try:
-                # Use all_objects to include soft-deleted jobs
-                job = Job.all_objects.get(pk=instance.job_id)
-                representation['job_info'] = JobSerializer(job).data
-                
-                # Add flag to indicate if job was deleted (for frontend to show "This job is no longer available")
-                representation['job_info']['is_deleted'] = job.is_deleted
-                
-            except Job.DoesNotExist:
-                # Fallback: Job was hard-deleted (very rare)
-                representation['job_info'] = {
-                    'title': '[Công việc đã bị xóa vĩnh viễn]',
-                    'is_deleted': True,
-                    'company': {'name': 'N/A'}
-                }
+        if instance.job_id and 'job_info' in representation and representation['job_info'] is None:
+            # Fallback: Job was hard-deleted (very rare)
+            representation['job_info'] = {
+                'title': '[Công việc đã bị xóa vĩnh viễn]',
+                'is_deleted': True,
+                'company': {'name': 'N/A'}
+            }
         
-        return representation
\ No newline at end of file
+        return representation
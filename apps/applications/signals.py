@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Application, ApplicationStatusEvent
+
+
+@receiver(pre_save, sender=Application)
+def remember_application_status(sender, instance, raw=False, **kwargs):
+    """Đọc trạng thái cũ trong DB để biết save này có đổi trạng thái không"""
+    instance._previous_status = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_status = Application.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Application)
+def record_application_status_event(sender, instance, created, raw=False, **kwargs):
+    """Nộp đơn / đổi trạng thái -> ghi 1 event (cùng transaction với thay đổi)"""
+    if raw or (not created and instance._previous_status == instance.status):
+        return
+    ApplicationStatusEvent.objects.create(
+        application_id=instance.pk,
+        job_id=instance.job_id,
+        from_status=None if created else instance._previous_status,
+        to_status=instance.status,
+    )
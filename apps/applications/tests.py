@@ -1,4 +1,6 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APITestCase, APIClient
@@ -512,3 +514,108 @@ class InterviewScheduleAPITest(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(len(response.data['results']) > 0)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    ELASTICSEARCH_DSL_AUTOSYNC=False,
+)
+class ApplicationListQueryCountTest(APITestCase):
+    """Test list đơn ứng tuyển có số query cố định, job đã xóa mềm vẫn hiển thị"""
+
+    def setUp(self):
+        self.candidate = User.objects.create_user(
+            email='candidate@test.com',
+            username='candidate@test.com',
+            password='testpass123',
+            full_name='Test Candidate',
+            user_type='CANDIDATE'
+        )
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+        self.applications_url = reverse('v1:application-list')
+
+    def create_applications(self, count):
+        for i in range(count):
+            job = Job.objects.create(
+                title=f'Python Developer {i}',
+                company=self.company,
+                location='Hà Nội',
+                job_type='FULL_TIME',
+                description='Test job description',
+                requirements='Python, Django',
+                benefits='Competitive salary',
+                deadline=timezone.now().date() + timedelta(days=30),
+                status='PUBLISHED'
+            )
+            # bulk_create: không bắn signal tạo notification
+            Application.objects.bulk_create([
+                Application(job=job, candidate=self.candidate, cv_file=f'applications/cvs/cv{i}.pdf')
+            ])
+        return job
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.applications_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_list_query_count_is_constant(self):
+        """Test số query không tăng theo số đơn, job đã xóa mềm vẫn có trong job_info"""
+        self.client.force_authenticate(user=self.candidate)
+        self.create_applications(2)
+        _, baseline = self.list_queries()
+
+        deleted_job = self.create_applications(5)
+        deleted_job.delete()
+        response, queries = self.list_queries()
+
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(response.data['results']), 7)
+        deleted = [row['job_info']['title'] for row in response.data['results'] if row['job_info']['is_deleted']]
+        self.assertEqual(deleted, [deleted_job.title])
+
+    def test_list_is_compact_unless_expanded(self):
+        """Test list không trả/không SELECT cover_letter, ?expand=cover_letter mới có"""
+        self.client.force_authenticate(user=self.recruiter)
+        self.create_applications(1)
+        Application.objects.update(cover_letter='Long cover letter')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.applications_url, {'fields': 'id,status,job_info.title'})
+        row = response.data['results'][0]
+        self.assertEqual(set(row), {'id', 'status', 'job_info'})
+        self.assertEqual(row['job_info'], {'title': 'Python Developer 0'})
+        self.assertNotIn('"cover_letter"', ' '.join(query['sql'] for query in queries.captured_queries))
+
+        response, _ = self.list_queries()
+        self.assertNotIn('cover_letter', response.data['results'][0])
+        self.assertNotIn('description', response.data['results'][0]['job_info'])
+
+        response = self.client.get(self.applications_url, {'expand': 'cover_letter'})
+        self.assertEqual(response.data['results'][0]['cover_letter'], 'Long cover letter')
+
+    def test_prefetch_soft_deleted_single_query(self):
+        """Test prefetch_soft_deleted nạp job (kể cả đã xóa mềm) của cả list bằng 1 query"""
+        from apps.core.soft_delete import prefetch_soft_deleted
+
+        self.create_applications(3).delete()
+        applications = list(Application.objects.all())
+
+        with self.assertNumQueries(1):
+            prefetch_soft_deleted(applications, 'job', Job.all_objects.select_related('company'))
+            names = {application.job.company.name for application in applications}
+
+        self.assertEqual(names, {'Test Company'})
+        self.assertEqual(sum(application.job.is_deleted for application in applications), 1)
@@ -7,10 +7,12 @@ from django.db import transaction # <--- IMPORT QUAN TRỌNG
 
 from .models import Application, InterviewSchedule
 from .serializers import ApplicationSerializer, InterviewScheduleSerializer
-from .tasks import send_interview_invitation_email
+from .emails import interview_invitation_email
+from apps.notifications.outbox import EmailOutboxService
+from apps.core.fieldsets import SparseFieldsetMixin
 from apps.core.throttling import ApplicationSubmissionThrottle
 
-class ApplicationViewSet(viewsets.ModelViewSet):
+class ApplicationViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = ApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -28,7 +30,8 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         # --- TỐI ƯU QUERY ---
-        queryset = Application.objects.select_related('job', 'job__company', 'candidate')
+        # interview_schedule (OneToOne ngược) cũng JOIN luôn, tránh 1 query/dòng khi serialize
+        queryset = Application.objects.select_related('job', 'job__company', 'candidate', 'interview_schedule')
         
         if user.user_type == 'CANDIDATE':
             return queryset.filter(candidate=user).order_by('-created_at')
@@ -90,7 +93,7 @@ class InterviewScheduleViewSet(viewsets.ModelViewSet):
 
         try:
             # Kiểm tra quyền: Chỉ chủ sở hữu Job mới được tạo lịch cho đơn này
-            application = Application.objects.get(
+            application = Application.objects.select_related('candidate', 'job__company').get(
                 id=application_id, 
                 job__company__owner=self.request.user
             )
@@ -106,7 +109,6 @@ class InterviewScheduleViewSet(viewsets.ModelViewSet):
             application.status = 'INTERVIEW'
             application.save()
 
-        # 4. Gửi email mời (Async - chạy ngầm)
-        # QUAN TRỌNG: Để ngoài transaction để tránh việc Worker chạy trước khi DB commit xong
-        if interview:
-            send_interview_invitation_email.delay(interview.id)
\ No newline at end of file
+            # 4. Email mời ghi vào outbox cùng transaction: rollback thì không gửi,
+            # worker chỉ được hẹn sau khi commit
+            EmailOutboxService.enqueue_many([interview_invitation_email(interview)])
\ No newline at end of file
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class CompaniesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.companies'  # <--- BẮT BUỘC PHẢI CÓ 'apps.' ở trước
-    verbose_name = "Quản lý công ty"
\ No newline at end of file
+    verbose_name = "Quản lý công ty"
+
+    def ready(self):
+        """Import signals when app is ready"""
+        import apps.companies.signals  # noqa
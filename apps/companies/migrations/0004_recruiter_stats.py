@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_merge_20251207_0541'),
+        ('users', '0004_user_phone_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecruiterStats',
+            fields=[
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recruiter_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_jobs', models.IntegerField(default=0)),
+                ('active_jobs', models.IntegerField(default=0)),
+                ('total_views', models.BigIntegerField(default=0)),
+                ('total_applications', models.IntegerField(default=0)),
+                ('new_applications', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Recruiter stats',
+            },
+        ),
+    ]
@@ -48,4 +48,25 @@ class Company(SoftDeleteMixin, TimeStampedModel):
                 condition=models.Q(is_deleted=False),
                 name='unique_active_company_slug'
             ),
-        ]
\ No newline at end of file
+        ]
+
+class RecruiterStats(models.Model):
+    """
+    Số liệu dashboard tính sẵn của 1 nhà tuyển dụng (đọc O(1) thay vì đếm lại mỗi lần)
+    Được cộng/trừ dần bởi các thay đổi Job/Application - xem apps.companies.stats
+    """
+    owner = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='recruiter_stats',
+    )
+    total_jobs = models.IntegerField(default=0)
+    active_jobs = models.IntegerField(default=0)
+    total_views = models.BigIntegerField(default=0)
+    total_applications = models.IntegerField(default=0)
+    new_applications = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Recruiter stats"
+
+    def __str__(self):
+        return f"Stats of {self.owner_id}"
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from apps.core.fieldsets import DynamicFieldsMixin
 from .models import Company
 
-class CompanySerializer(serializers.ModelSerializer):
+class CompanySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Company
         fields = '__all__'
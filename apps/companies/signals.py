@@ -0,0 +1,65 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.applications.models import Application
+from apps.jobs.models import Job
+from .stats import RecruiterStatsService
+
+# Field của Job ảnh hưởng tới RecruiterStats (save chỉ đổi field khác thì bỏ qua)
+JOB_STAT_FIELDS = {'status', 'is_deleted', 'company'}
+
+
+def job_stats_state(job):
+    return {
+        'owner_id': job.company.owner_id,
+        'status': job.status,
+        'is_deleted': job.is_deleted,
+        'views_count': job.views_count,
+    }
+
+
+@receiver(pre_save, sender=Job)
+def remember_job_stats_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Đọc trạng thái cũ trong DB trước khi save để tính delta cho RecruiterStats"""
+    instance._stats_before = None
+    instance._stats_skip = raw or (update_fields is not None and JOB_STAT_FIELDS.isdisjoint(update_fields))
+    if instance._stats_skip or instance._state.adding:
+        return
+    instance._stats_before = Job.all_objects.filter(pk=instance.pk).values(
+        'status', 'is_deleted', 'views_count', owner_id=F('company__owner_id'),
+    ).first()
+
+
+@receiver(post_save, sender=Job)
+def update_recruiter_stats_on_job_save(sender, instance, created, raw=False, **kwargs):
+    if raw or instance._stats_skip:
+        return
+    RecruiterStatsService.job_changed(instance.pk, instance._stats_before, job_stats_state(instance))
+
+
+@receiver(post_delete, sender=Job)
+def update_recruiter_stats_on_job_delete(sender, instance, **kwargs):
+    RecruiterStatsService.job_changed(instance.pk, job_stats_state(instance), None)
+
+
+@receiver(pre_save, sender=Application)
+def remember_application_stats_state(sender, instance, raw=False, **kwargs):
+    instance._stats_before = None
+    if raw or instance._state.adding:
+        return
+    instance._stats_before = Application.objects.filter(pk=instance.pk).values('job_id', 'status').first()
+
+
+@receiver(post_save, sender=Application)
+def update_recruiter_stats_on_application_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    after = {'job_id': instance.job_id, 'status': instance.status}
+    if instance._stats_before != after:
+        RecruiterStatsService.application_changed(instance._stats_before, after)
+
+
+@receiver(post_delete, sender=Application)
+def update_recruiter_stats_on_application_delete(sender, instance, **kwargs):
+    RecruiterStatsService.application_changed({'job_id': instance.job_id, 'status': instance.status}, None)
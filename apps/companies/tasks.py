@@ -0,0 +1,17 @@
+# apps/companies/tasks.py
+import logging
+from celery import shared_task
+from .stats import RecruiterStatsService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_recruiter_stats():
+    """
+    Tính lại toàn bộ RecruiterStats từ Job/Application (sửa lệch do ghi đồng thời / update ngoài signal)
+    Chạy hằng đêm bởi Celery beat (xem CELERY_BEAT_SCHEDULE)
+    """
+    updated = RecruiterStatsService.reconcile()
+    logger.info(f"Reconciled stats of {updated} recruiters.")
+    return f"Reconciled {updated} recruiter stats."
@@ -1,10 +1,17 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from unittest import mock
 
-from .models import Company
+from .models import Company, RecruiterStats
+from .stats import RecruiterStatsService
+from apps.applications.models import Application
+from apps.jobs.models import Job
+from apps.core.testing import LOCAL_TEST_SETTINGS
 
 User = get_user_model()
 
@@ -196,3 +203,222 @@ class CompanyAPITest(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['name'], 'Test Company')
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class RecruiterStatsTest(APITestCase):
+    """Test RecruiterStats: đọc 1 row, cộng dồn khớp với tính lại từ đầu"""
+
+    def setUp(self):
+        patcher = mock.patch('apps.notifications.signals.send_websocket_notification')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+        self.candidates = [
+            User.objects.create_user(
+                email=f'candidate{i}@test.com',
+                username=f'candidate{i}@test.com',
+                password='testpass123',
+                full_name=f'Candidate {i}',
+                user_type='CANDIDATE'
+            )
+            for i in range(3)
+        ]
+        self.jobs = [self.create_job(f'Job {i}') for i in range(3)]
+        self.stats_url = reverse('v1:company-stats')
+
+    def create_job(self, title, status='PUBLISHED'):
+        return Job.objects.create(
+            title=title,
+            company=self.company,
+            location='Hà Nội',
+            description='Test job description',
+            requirements='Python, Django',
+            benefits='Competitive salary',
+            deadline=timezone.now().date() + timedelta(days=30),
+            status=status
+        )
+
+    def apply(self, job, candidate):
+        return Application.objects.create(job=job, candidate=candidate, cv_file='applications/cvs/cv.pdf')
+
+    def assert_in_sync(self):
+        row = RecruiterStats.objects.values(*RecruiterStatsService.compute(self.recruiter.pk)).get(
+            owner=self.recruiter
+        )
+        self.assertEqual(row, RecruiterStatsService.compute(self.recruiter.pk))
+
+    def test_stats_endpoint_reads_single_row(self):
+        """Test dashboard đọc 1 row (1 query) sau lần tính đầu tiên"""
+        self.apply(self.jobs[0], self.candidates[0])
+        self.client.force_authenticate(user=self.recruiter)
+        self.client.get(self.stats_url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.stats_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['overview']['total_jobs'], 3)
+        self.assertEqual(response.data['overview']['active_jobs'], 3)
+        self.assertEqual(response.data['applications'], {'total': 1, 'new': 1})
+
+    def test_incremental_updates_match_compute(self):
+        """Test mọi loại thay đổi Job/Application cộng dồn đúng như tính lại từ đầu"""
+        from apps.jobs.counters import JobViewCounter
+        from apps.jobs.expiry import JobExpiryService
+
+        RecruiterStatsService.get(self.recruiter.pk)
+        job, other_job, expiring_job = self.jobs
+
+        application = self.apply(job, self.candidates[0])
+        self.apply(job, self.candidates[1])
+        self.apply(other_job, self.candidates[2])
+        self.create_job('Draft', status='DRAFT')
+        self.assert_in_sync()
+
+        application.status = Application.Status.ACCEPTED
+        application.save()
+        JobViewCounter.apply_counts({job.pk: 5, other_job.pk: 2})
+        self.assert_in_sync()
+
+        job.refresh_from_db()
+        job.delete()  # Xóa mềm: job + lượt xem + đơn ứng tuyển của nó không còn tính
+        self.assert_in_sync()
+        job.restore()
+        self.assert_in_sync()
+
+        other_job.status = Job.Status.CLOSED
+        other_job.save(update_fields=['status'])
+        application.delete()
+        Job.objects.filter(pk=expiring_job.pk).update(deadline=timezone.now().date() - timedelta(days=1))
+        JobExpiryService.close_expired()
+        self.assert_in_sync()
+
+        stats = RecruiterStatsService.get(self.recruiter.pk)
+        self.assertEqual(stats['total_jobs'], 4)
+        self.assertEqual(stats['active_jobs'], 1)
+        self.assertEqual(stats['total_views'], 7)
+        self.assertEqual(stats['total_applications'], 2)
+
+    def test_reconcile_fixes_drift(self):
+        """Test reconcile tính lại row bị lệch"""
+        self.apply(self.jobs[0], self.candidates[0])
+        RecruiterStatsService.get(self.recruiter.pk)
+        RecruiterStats.objects.filter(owner=self.recruiter).update(total_jobs=99, new_applications=-4)
+
+        self.assertEqual(RecruiterStatsService.reconcile(), 1)
+        self.assert_in_sync()
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class RecruiterAnalyticsTest(APITestCase):
+    """Test analytics theo ngày: event trạng thái -> rollup JobDailyStats -> endpoint"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+        patcher = mock.patch('apps.notifications.signals.send_websocket_notification')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+        self.jobs = [
+            Job.objects.create(
+                title=f'Job {i}',
+                company=company,
+                location='Hà Nội',
+                description='Test job description',
+                requirements='Python, Django',
+                benefits='Competitive salary',
+                deadline=timezone.now().date() + timedelta(days=30),
+                status='PUBLISHED'
+            )
+            for i in range(2)
+        ]
+        self.applications = [
+            Application.objects.create(
+                job=self.jobs[i % 2],
+                candidate=User.objects.create_user(
+                    email=f'candidate{i}@test.com',
+                    username=f'candidate{i}@test.com',
+                    password='testpass123',
+                    full_name=f'Candidate {i}',
+                    user_type='CANDIDATE'
+                ),
+                cv_file='applications/cvs/cv.pdf'
+            )
+            for i in range(3)
+        ]
+        self.analytics_url = reverse('v1:company-analytics')
+        self.client.force_authenticate(user=self.recruiter)
+
+    def set_status(self, application, status_value):
+        application.status = status_value
+        application.save()
+
+    def test_rollup_feeds_daily_series_and_funnel(self):
+        """Test event + lượt xem được rollup đúng, chạy rollup lại không cộng trùng"""
+        from apps.jobs.analytics import JobAnalyticsService
+        from apps.jobs.counters import JobViewCounter
+
+        first, second, third = self.applications
+        self.set_status(first, Application.Status.VIEWED)
+        self.set_status(first, Application.Status.INTERVIEW)
+        self.set_status(first, Application.Status.ACCEPTED)
+        self.set_status(second, Application.Status.VIEWED)
+        self.set_status(second, Application.Status.VIEWED)  # Không đổi trạng thái => không có event
+        JobViewCounter.apply_counts({self.jobs[0].pk: 7, self.jobs[1].pk: 3})
+
+        self.assertEqual(JobAnalyticsService.rollup(), 2)
+        JobAnalyticsService.rollup(since=timezone.now() - timedelta(days=1))
+
+        response = self.client.get(self.analytics_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['series']), 30)
+        self.assertEqual(response.data['series'][-1]['day'], timezone.localdate())
+        self.assertEqual(
+            response.data['totals'],
+            {'views': 10, 'applications': 3, 'viewed': 2, 'interview': 1, 'accepted': 1, 'rejected': 0},
+        )
+        self.assertEqual([step['count'] for step in response.data['funnel']], [3, 2, 1, 1])
+
+        response = self.client.get(self.analytics_url, {'job': self.jobs[1].pk})
+        self.assertEqual(response.data['totals']['views'], 3)
+        self.assertEqual(response.data['totals']['applications'], 1)
+
+    def test_invalid_range_rejected(self):
+        """Test khoảng ngày ngược / quá dài / sai định dạng => 400"""
+        today = timezone.localdate()
+        for params in (
+            {'from': today.isoformat(), 'to': (today - timedelta(days=1)).isoformat()},
+            {'from': (today - timedelta(days=400)).isoformat()},
+            {'from': '2026-02-30'},
+        ):
+            response = self.client.get(self.analytics_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
@@ -1,12 +1,29 @@
 from rest_framework import viewsets, permissions
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Sum
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.translation import gettext as _
+from apps.core.conditional import ConditionalGetMixin
 from .models import Company
 from .serializers import CompanySerializer
-from apps.jobs.models import Job
-from apps.applications.models import Application
+from .stats import RecruiterStatsService
+
+def parse_day_param(request, param, default):
+    """Đọc query param ngày YYYY-MM-DD (không có => default, sai định dạng => 400)"""
+    value = request.query_params.get(param)
+    if not value:
+        return default
+    try:
+        day = parse_date(value)
+    except ValueError:  # Đúng định dạng nhưng ngày không tồn tại (vd: 2026-02-30)
+        day = None
+    if day is None:
+        raise ValidationError({param: _("Date has wrong format. Use YYYY-MM-DD.")})
+    return day
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -14,7 +31,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
         return obj.owner == request.user
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Company.objects.all().order_by('-created_at')
     serializer_class = CompanySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
@@ -34,25 +51,47 @@ class CompanyViewSet(viewsets.ModelViewSet):
         if user.user_type != 'RECRUITER':
             return Response({"detail": "Chỉ dành cho nhà tuyển dụng."}, status=403)
 
-        my_jobs = Job.objects.filter(company__owner=user)
-        
-        total_jobs = my_jobs.count()
-        active_jobs = my_jobs.filter(status='PUBLISHED').count()
-        total_views = my_jobs.aggregate(Sum('views_count'))['views_count__sum'] or 0
-        
-        total_applications = Application.objects.filter(job__in=my_jobs).count()
-        new_applications = Application.objects.filter(job__in=my_jobs, status='PENDING').count()
+        # Row tính sẵn, cộng dồn theo từng thay đổi Job/Application => 1 query bất kể số tin đăng
+        stats = RecruiterStatsService.get(user.pk)
 
         return Response({
             "overview": {
-                "total_jobs": total_jobs,
-                "active_jobs": active_jobs,
-                "total_views": total_views,
+                "total_jobs": stats['total_jobs'],
+                "active_jobs": stats['active_jobs'],
+                "total_views": stats['total_views'],
                 "credits_left": user.job_posting_credits,
                 "vip_expiry": user.membership_expires_at
             },
             "applications": {
-                "total": total_applications,
-                "new": new_applications
+                "total": stats['total_applications'],
+                "new": stats['new_applications']
             }
-        })
\ No newline at end of file
+        })
+
+    @action(detail=False, methods=['get'], url_path='analytics')
+    def analytics(self, request):
+        """
+        Số liệu theo ngày (lượt xem, đơn nộp, funnel trạng thái) cho Nhà tuyển dụng.
+        Query params: from, to (YYYY-MM-DD, mặc định 30 ngày gần nhất), job (pk, tùy chọn)
+        Đọc bucket rollup sẵn (JobDailyStats) => chi phí theo số ngày, không theo số đơn ứng tuyển.
+        """
+        from apps.jobs.analytics import JobAnalyticsService
+
+        user = request.user
+        if user.user_type != 'RECRUITER':
+            return Response({"detail": "Chỉ dành cho nhà tuyển dụng."}, status=403)
+
+        end = parse_day_param(request, 'to', timezone.localdate())
+        start = parse_day_param(request, 'from', end - timedelta(days=29))
+        if start > end:
+            raise ValidationError({'from': _("Start date must not be after end date.")})
+        max_days = getattr(settings, 'JOB_ANALYTICS_MAX_RANGE_DAYS', 366)
+        if (end - start).days >= max_days:
+            raise ValidationError({'from': _("Date range is limited to {days} days.").format(days=max_days)})
+
+        job_pk = request.query_params.get('job')
+        if job_pk is not None and not job_pk.isdigit():
+            raise ValidationError({'job': _("A valid integer is required.")})
+
+        report = JobAnalyticsService.report(user.pk, start, end, job_pk=int(job_pk) if job_pk else None)
+        return Response({"from": start, "to": end, "job": job_pk and int(job_pk), **report})
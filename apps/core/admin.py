@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Location
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'kind', 'parent', 'latitude', 'longitude', 'sort_order')
+    list_filter = ('kind',)
+    search_fields = ('name', 'slug')
+    list_select_related = ('parent',)
+    # Slug là giá trị đã index trên ES (location_slugs) => đổi slug cần reindex_jobs
+    prepopulated_fields = {'slug': ('name',)}
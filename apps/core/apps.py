@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'  # <--- BẮT BUỘC PHẢI CÓ 'apps.' ở trước
-    verbose_name = "Cốt lõi hệ thống"
\ No newline at end of file
+    verbose_name = "Cốt lõi hệ thống"
+
+    def ready(self):
+        """Import signals when app is ready"""
+        import apps.core.signals  # noqa
@@ -0,0 +1,109 @@
+"""
+Tagged Cache
+Cache entry gắn tag, invalidate theo tag mà không cần biết key cụ thể
+
+HOW IT WORKS:
+- Mỗi tag có 1 version lưu trong cache (vd: 'job:42' -> 1733541234567000000)
+- Entry lưu kèm snapshot version của các tag lúc được tạo
+  (nên đọc snapshot TRƯỚC khi load dữ liệu rồi truyền vào set(versions=...):
+  invalidate xảy ra trong lúc load => entry ghi ra đã lệch version, không bị phục vụ bản cũ)
+- Đọc entry: so snapshot với version hiện tại, lệch => coi như miss
+- Invalidate tag = tăng version (O(1), không phải tìm/xóa key)
+
+Version khởi tạo theo thời gian (ns) chứ không phải 1: nếu key version bị evict
+rồi tạo lại, entry cũ vẫn bị coi là hết hạn (tránh ABA).
+
+USAGE:
+    from apps.core.cache_tags import TaggedCache
+
+    versions = TaggedCache.get_tag_versions(['job:42', 'company:7'])
+    data = load_job_detail(42)
+    TaggedCache.set('jobs:detail:42', data, tags=['job:42', 'company:7'], timeout=3600, versions=versions)
+    TaggedCache.get('jobs:detail:42')  # -> data
+    TaggedCache.invalidate_tags('company:7')
+    TaggedCache.get('jobs:detail:42')  # -> None
+"""
+import time
+
+from django.core.cache import cache
+
+
+class TaggedCache:
+    """Cache với invalidation theo tag (tag versioning)"""
+
+    TAG_PREFIX = 'cache_tag:'
+
+    @classmethod
+    def _tag_key(cls, tag):
+        return f"{cls.TAG_PREFIX}{tag}"
+
+    @staticmethod
+    def _initial_version():
+        return time.time_ns()
+
+    @classmethod
+    def get_tag_versions(cls, tags):
+        """Version hiện tại của các tag (khởi tạo tag chưa có)"""
+        keys = {cls._tag_key(tag): tag for tag in tags}
+        found = cache.get_many(list(keys))
+
+        versions = {}
+        for key, tag in keys.items():
+            if key not in found:
+                cache.add(key, cls._initial_version(), timeout=None)
+                found[key] = cache.get(key)
+            versions[tag] = found[key]
+        return versions
+
+    @classmethod
+    def get(cls, key):
+        """Trả value nếu entry còn hợp lệ với version tag hiện tại, ngược lại None"""
+        entry = cache.get(key)
+        if entry is None:
+            return None
+
+        if cls.get_tag_versions(entry['tags']) != entry['tags']:
+            return None
+        return entry['value']
+
+    @classmethod
+    def get_many(cls, keys):
+        """
+        Như get() cho nhiều key: 2 round-trip (entries + versions của mọi tag) thay vì 2N
+        Returns: {key: value} chỉ gồm các entry còn hợp lệ
+        """
+        entries = cache.get_many(list(keys))
+        if not entries:
+            return {}
+
+        all_tags = {tag for entry in entries.values() for tag in entry['tags']}
+        current = cls.get_tag_versions(all_tags)
+        return {
+            key: entry['value']
+            for key, entry in entries.items()
+            if all(current[tag] == version for tag, version in entry['tags'].items())
+        }
+
+    @classmethod
+    def set(cls, key, value, tags, timeout=None, versions=None):
+        """
+        Lưu value kèm snapshot version của tags
+
+        Args:
+            versions: snapshot get_tag_versions(tags) đọc trước khi load value
+                (None => đọc lúc ghi: chỉ an toàn khi value không thể bị invalidate trong lúc load)
+        """
+        if versions is None:
+            versions = cls.get_tag_versions(tags)
+        cache.set(key, {'tags': versions, 'value': value}, timeout)
+
+    @classmethod
+    def invalidate_tags(cls, *tags):
+        """Tăng version => mọi entry gắn các tag này hết hiệu lực"""
+        for tag in tags:
+            key = cls._tag_key(tag)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Tag chưa từng được dùng: tạo version mới là đủ
+                cache.set(key, cls._initial_version(), timeout=None)
@@ -0,0 +1,110 @@
+"""
+Circuit Breaker
+Ngắt tạm thời 1 dependency ngoài (Elasticsearch...) khi nó lỗi/chậm liên tục, chuyển sang phương án dự phòng
+
+WHY?
+- Dependency chết => mỗi request vẫn chờ tới timeout rồi 500
+- Dependency chậm => worker bị giữ, kéo sập cả API
+- Ngắt mạch: sau N lần lỗi/chậm liên tiếp thì bỏ qua dependency trong reset_timeout giây,
+  gọi thẳng fallback; hết thời gian thì cho 1 request thử lại (half-open)
+
+HOW IT WORKS:
+- Trạng thái lưu trong Django cache => mọi process/worker dùng chung 1 trạng thái
+- Lỗi (exception) hoặc chạy quá latency_budget giây đều tính là 1 lần hỏng
+  (request chậm vẫn trả kết quả của nó, chỉ request sau mới bị chuyển sang fallback)
+- Cache lỗi => coi như mạch đóng (không để breaker thành điểm hỏng mới)
+
+USAGE:
+    from apps.core.circuit_breaker import CircuitBreaker
+
+    breaker = CircuitBreaker('elasticsearch', failure_threshold=5, reset_timeout=30, latency_budget=2)
+    results = breaker.call(lambda: es_search(q), fallback=lambda: db_search(q))
+"""
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Đếm lỗi liên tiếp của 1 dependency, mở mạch khi vượt ngưỡng"""
+
+    KEY_PREFIX = 'core:circuit:'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, latency_budget=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_budget = latency_budget
+
+        prefix = f"{self.KEY_PREFIX}{name}:"
+        self.failures_key = f"{prefix}failures"
+        self.open_key = f"{prefix}open"
+        # Còn tồn tại sau khi open_key hết hạn => đang half-open, lỗi 1 lần là mở lại ngay
+        self.tripped_key = f"{prefix}tripped"
+
+    def state(self):
+        """{'open': bool, 'dirty': bool} trong 1 round-trip (dirty = có lỗi gần đây cần xóa khi thành công)"""
+        try:
+            values = cache.get_many([self.open_key, self.failures_key, self.tripped_key])
+        except Exception as e:
+            logger.warning(f"Circuit '{self.name}' state unavailable: {e}")
+            return {'open': False, 'dirty': False}
+        return {
+            'open': bool(values.get(self.open_key)),
+            'dirty': bool(values.get(self.failures_key) or values.get(self.tripped_key)),
+        }
+
+    def is_open(self):
+        return self.state()['open']
+
+    def trip(self):
+        """Mở mạch: bỏ qua dependency trong reset_timeout giây"""
+        cache.set(self.open_key, 1, timeout=self.reset_timeout)
+        cache.set(self.tripped_key, 1, timeout=self.reset_timeout * 10)
+        cache.delete(self.failures_key)
+        logger.error(f"Circuit '{self.name}' opened for {self.reset_timeout}s")
+
+    def record_failure(self):
+        try:
+            if cache.get(self.tripped_key):
+                return self.trip()
+            cache.add(self.failures_key, 0, timeout=self.reset_timeout * 10)
+            if cache.incr(self.failures_key) >= self.failure_threshold:
+                self.trip()
+        except Exception as e:
+            logger.warning(f"Could not record failure for circuit '{self.name}': {e}")
+
+    def record_success(self):
+        try:
+            cache.delete_many([self.failures_key, self.tripped_key])
+        except Exception as e:
+            logger.warning(f"Could not record success for circuit '{self.name}': {e}")
+
+    def call(self, func, fallback):
+        """
+        Chạy func qua breaker; mạch mở hoặc func lỗi => trả về fallback()
+
+        Lỗi của fallback không bị nuốt (không còn phương án nào khác)
+        """
+        state = self.state()
+        if state['open']:
+            return fallback()
+
+        started = time.monotonic()
+        try:
+            result = func()
+        except Exception as e:
+            logger.warning(f"Circuit '{self.name}': call failed ({type(e).__name__}: {e}), using fallback")
+            self.record_failure()
+            return fallback()
+
+        elapsed = time.monotonic() - started
+        if self.latency_budget is not None and elapsed > self.latency_budget:
+            logger.warning(f"Circuit '{self.name}': call took {elapsed:.2f}s (budget {self.latency_budget}s)")
+            self.record_failure()
+        elif state['dirty']:
+            self.record_success()
+        return result
@@ -0,0 +1,115 @@
+"""
+Conditional GET (ETag / Last-Modified)
+Client gửi lại validator đã nhận (If-None-Match / If-Modified-Since) => 304 không body,
+không chạy query chính và không serialize khi dữ liệu chưa đổi
+
+WHY?
+- App mobile poll liên tục job list/detail, công ty, config; phần lớn lần poll dữ liệu không đổi
+  nhưng mỗi lần vẫn query + serialize + truyền lại nguyên body
+- ConditionalGetMiddleware của Django chỉ so ETag sau khi đã render xong response => không tiết kiệm được gì ở server
+
+HOW IT WORKS:
+- List: validator = aggregate trên queryset đã filter (1 query 1 dòng, không ORDER BY, không serialize)
+    * max(updated_at): sửa bản ghi
+    * count + sum(pk): tập bản ghi thay đổi (xóa mềm/khôi phục bằng queryset.update() không đổi updated_at)
+    * ViewSet thêm aggregate riêng (vd sum(views_count) của job: counter flush bằng update())
+  List chỉ có ETag: Last-Modified (giây) không phản ánh được các thay đổi trên
+- Detail: ETag + Last-Modified theo updated_at của object (get_object() rồi mới serialize)
+- Response đã cache sẵn (job detail, config): ETag = hash nội dung => chỉ tốn 1 lần đọc cache
+- ETag gồm cả URL đầy đủ (filter, ?fields=, cursor), media type, ngôn ngữ
+- Browsable API (HTML có thông tin user) => bỏ qua, luôn trả 200
+
+USAGE:
+    class CompanyViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+        ...
+
+    return conditional_response(request, content_etag(request, data), None, lambda: Response(data))
+"""
+import hashlib
+import json
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from django.utils.translation import get_language
+from rest_framework.response import Response
+
+
+def make_etag(request, *parts):
+    """ETag (đã quote) từ các phần validator + biến thể của request (URL, media type, ngôn ngữ)"""
+    variant = (request.get_full_path(), getattr(request, 'accepted_media_type', None), get_language())
+    raw = json.dumps([variant, parts], sort_keys=True, default=str)
+    return quote_etag(hashlib.sha1(raw.encode('utf-8')).hexdigest())
+
+
+def content_etag(request, data):
+    """ETag theo nội dung response (dữ liệu đã có sẵn trong cache)"""
+    return make_etag(request, data)
+
+
+def supports_conditional(request):
+    """Chỉ response JSON (Browsable API render cả thông tin user/CSRF)"""
+    return getattr(getattr(request, 'accepted_renderer', None), 'format', None) != 'api'
+
+
+def conditional_response(request, etag, last_modified, respond):
+    """
+    304 nếu validator client gửi lên còn khớp, ngược lại respond() kèm header ETag / Last-Modified
+
+    Args:
+        last_modified: datetime (aware) hoặc None
+        respond: callable trả Response (chỉ được gọi khi phải trả body)
+    """
+    if not supports_conditional(request):
+        return respond()
+
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if not_modified is not None:
+        return not_modified
+
+    response = respond()
+    if response.status_code == 200:
+        if etag:
+            response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+class ConditionalGetMixin:
+    """ViewSet: ETag cho list, ETag + Last-Modified cho retrieve, 304 khi không đổi"""
+
+    # Aggregate trên queryset của list => validator (key: tên, value: biểu thức aggregate)
+    conditional_list_aggregates = {
+        'modified': Max('updated_at'),
+        'count': Count('pk'),
+        'members': Sum('pk'),
+    }
+
+    def get_list_aggregates(self):
+        return self.conditional_list_aggregates
+
+    def get_list_etag(self):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        values = queryset.aggregate(**self.get_list_aggregates())
+        return make_etag(self.request, sorted(values.items()))
+
+    def get_object_validators(self, instance):
+        """(etag, last_modified) của 1 object"""
+        return make_etag(self.request, instance.pk, instance.updated_at), instance.updated_at
+
+    def list(self, request, *args, **kwargs):
+        if not supports_conditional(request):
+            return super().list(request, *args, **kwargs)
+        return conditional_response(
+            request, self.get_list_etag(), None,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_object_validators(instance)
+        return conditional_response(
+            request, etag, last_modified, lambda: Response(self.get_serializer(instance).data),
+        )
@@ -0,0 +1,279 @@
+"""
+Fast-path Serialization
+List endpoint nóng: serialize thẳng từ tuple của values_list() theo "field plan" đã compile sẵn,
+không tạo model instance và không chạy pipeline field-by-field của DRF
+
+WHY?
+- ModelSerializer list: mỗi dòng = 1 model instance + mỗi field get_attribute() -> to_representation() -> OrderedDict
+  => với page_size 20-100, CPU của list (jobs, saved jobs, notifications) chủ yếu nằm ở serializer
+- Phần lớn field chỉ là cột (str/int/bool/uuid/datetime) => đọc thẳng từ tuple là đủ
+
+HOW IT WORKS:
+- FieldPlan.for_serializer(serializer): compile 1 lần cho mỗi (serializer class, field_selection) (lru_cache)
+    * Field map được vào cột: CharField/ChoiceField/IntegerField/BooleanField/PrimaryKeyRelatedField... đọc thẳng,
+      UUIDField -> str, DateTime/Date/Decimal... -> to_representation của field DRF, File/Image -> URL (tuyệt đối nếu có request)
+    * Serializer lồng qua FK/OneToOne (vd company_info) -> cột `company__...` trong cùng câu SELECT (JOIN)
+    * Field không map được (SerializerMethodField, source='*', property, reverse relation...) => None, dùng serializer thường
+    * Serializer có snapshot (bản list mặc định render sẵn, vd job card) => chỉ đọc cột snapshot + live_fields
+- Opt-in: serializer gốc khai báo Meta.fast_read = True; serializer nào override to_representation cũng phải tự khai báo
+  (xác nhận phần override không cần cho đường đọc nhanh, vd placeholder job bị xóa cứng)
+- FastListMixin (view): list => values_list(*plan.columns, named=True) -> pagination -> plan.emit()
+  (Row namedtuple có attribute theo tên cột => KeysetPagination đọc giá trị cursor như với model instance)
+- API_FAST_SERIALIZATION=False => tắt, mọi list quay về serializer DRF (so sánh/rollback)
+
+USAGE:
+    class NotificationSerializer(serializers.ModelSerializer):
+        class Meta:
+            model = Notification
+            fields = '__all__'
+            fast_read = True
+
+    class NotificationViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
+        ...
+
+    python manage.py benchmark_serializers  # So sánh với serializer DRF
+"""
+import json
+from functools import lru_cache
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields as drf_fields, relations, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .fieldsets import DynamicFieldsMixin, ordering_columns
+
+# Giá trị DB đã đúng dạng JSON của field DRF => đọc thẳng, không gọi to_representation
+PASSTHROUGH_FIELDS = (
+    drf_fields.CharField, drf_fields.IntegerField, drf_fields.BooleanField,
+    drf_fields.ReadOnlyField,
+)
+# Field cần to_representation của DRF (timezone, format ngày, làm tròn decimal...)
+CONVERTED_FIELDS = (
+    drf_fields.DateTimeField, drf_fields.DateField, drf_fields.TimeField,
+    drf_fields.DecimalField, drf_fields.FloatField, drf_fields.DurationField,
+)
+
+
+class FieldPlan:
+    """
+    Cách dựng output của 1 serializer từ 1 dòng values_list()
+
+    columns: đường dẫn cột (kiểu values_list) theo đúng vị trí trong tuple
+    steps: [(key, index, converter, nested_steps)] - nested_steps != None: serializer lồng, index là cột pk của nó
+    """
+
+    def __init__(self, columns, steps):
+        self.columns = columns
+        self.steps = steps
+
+    @classmethod
+    def for_serializer(cls, serializer):
+        """Plan cho serializer (đã bind context); None nếu serializer không dùng được đường nhanh"""
+        selection = serializer.context.get('field_selection')
+        return compile_plan(type(serializer), json.dumps(selection, sort_keys=True))
+
+    @classmethod
+    def compile(cls, serializer):
+        columns = []
+        steps = compile_steps(serializer, '', columns)
+        if steps is None:
+            return None
+        return cls(columns, steps)
+
+    def with_columns(self, extra):
+        """Thêm cột (vd cột ordering cho cursor) vào cuối tuple, không ảnh hưởng vị trí các cột của plan"""
+        missing = [column for column in extra if column not in self.columns]
+        return FieldPlan(self.columns + missing, self.steps) if missing else self
+
+    def emit(self, rows, context):
+        """list[dict] cùng format với serializer(rows, many=True).data"""
+        build = bind_steps(self.steps, context.get('request'))
+        return [build(row) for row in rows]
+
+
+class SnapshotSteps:
+    """Output đọc từ cột snapshot (render sẵn) + các cột live_fields"""
+
+    def __init__(self, snapshot, pk_index, card_index, live):
+        self.snapshot = snapshot
+        self.pk_index = pk_index
+        self.card_index = card_index
+        self.live = live  # [(field, index)]
+
+    def bind(self, request):
+        snapshot, pk_index, card_index, live = self.snapshot, self.pk_index, self.card_index, self.live
+
+        def build(row):
+            # Card chưa dựng (bulk_create, dữ liệu cũ): dựng + lưu 1 lần
+            card = row[card_index] or snapshot.load([row[pk_index]])[row[pk_index]]
+            output = snapshot.render(card, request)
+            for name, index in live:
+                output[name] = row[index]
+            return output
+
+        return build
+
+
+# to_representation không cần opt-in (đường nhanh tái hiện đúng)
+BUILTIN_REPRESENTATIONS = (serializers.ModelSerializer.to_representation, DynamicFieldsMixin.to_representation)
+
+
+def compile_steps(serializer, prefix, columns):
+    if not getattr(serializer.Meta, 'fast_read', False):
+        if type(serializer).to_representation not in BUILTIN_REPRESENTATIONS:
+            return None  # Override to_representation mà không opt-in => không biết có tái hiện được không
+        if not prefix:
+            return None  # Serializer gốc phải opt-in
+
+    model = serializer.Meta.model
+    steps = []
+
+    def column_index(path):
+        if path not in columns:
+            columns.append(path)
+        return columns.index(path)
+
+    pk_index = column_index(prefix + model._meta.pk.name)
+    snapshot = serializer.get_snapshot() if isinstance(serializer, DynamicFieldsMixin) else None
+    if snapshot is not None:
+        return SnapshotSteps(
+            snapshot, pk_index, column_index(prefix + snapshot.column),
+            [(name, column_index(prefix + name)) for name in snapshot.live_fields],
+        )
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or len(field.source_attrs) != 1:
+            return None
+        name = field.source_attrs[0]
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+        if isinstance(field, serializers.ModelSerializer):
+            if not model_field.concrete or not (model_field.many_to_one or model_field.one_to_one):
+                return None
+            nested = compile_steps(field, f"{prefix}{name}__", columns)
+            if nested is None:
+                return None
+            # Cột pk của model lồng: NULL (FK null / LEFT JOIN không khớp) => field = None
+            nested_pk = columns.index(f"{prefix}{name}__{field.Meta.model._meta.pk.name}")
+            steps.append((field.field_name, nested_pk, None, nested))
+            continue
+
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+        path = prefix + name
+        converter = field_converter(field, model_field)
+        if converter is False:
+            return None
+        steps.append((field.field_name, column_index(path), converter, None))
+    return steps
+
+
+class FileURL:
+    """Converter cho File/ImageField: tên file -> URL theo storage của model field (tuyệt đối nếu có request)"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def bind(self, request):
+        storage = self.storage
+
+        def convert(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+
+        return convert
+
+
+def field_converter(field, model_field):
+    """None: đọc thẳng; callable: chuyển giá trị; FileURL: URL của file; False: không hỗ trợ"""
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        return None if field.pk_field is None else field.pk_field.to_representation
+    if isinstance(field, relations.RelatedField):
+        return False  # Hyperlinked / SlugRelated...: cần object liên quan
+    if isinstance(field, drf_fields.FileField):
+        if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+            return None
+        return FileURL(model_field.storage)
+    if isinstance(field, drf_fields.UUIDField):
+        return str if field.uuid_format == 'hex_verbose' else field.to_representation
+    if isinstance(field, drf_fields.JSONField):
+        return None if not field.binary else field.to_representation
+    if isinstance(field, (drf_fields.MultipleChoiceField, drf_fields.FilePathField)):
+        return False
+    if isinstance(field, drf_fields.ChoiceField):
+        return None
+    if isinstance(field, CONVERTED_FIELDS):
+        return field.to_representation
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    return False
+
+
+def bind_steps(steps, request):
+    """Hàm build(row) -> dict cho 1 request (URL file cần request để thành URL tuyệt đối)"""
+    if isinstance(steps, SnapshotSteps):
+        return steps.bind(request)
+    bound = []
+    for key, index, converter, nested in steps:
+        if nested is not None:
+            bound.append((key, itemgetter(index), None, bind_steps(nested, request)))
+        else:
+            if isinstance(converter, FileURL):
+                converter = converter.bind(request)
+            bound.append((key, itemgetter(index), converter, None))
+
+    def build(row):
+        output = {}
+        for key, get, convert, nested in bound:
+            value = get(row)
+            if value is None:
+                output[key] = None
+            elif nested is not None:
+                output[key] = nested(row)
+            else:
+                output[key] = value if convert is None else convert(value)
+        return output
+
+    return build
+
+
+@lru_cache(maxsize=256)
+def compile_plan(serializer_class, selection_key):
+    """Compile theo (class, field_selection) - selection từ ?fields= nên giới hạn kích thước cache"""
+    selection = json.loads(selection_key)
+    context = {'field_selection': selection} if selection is not None else {}
+    return FieldPlan.compile(serializer_class(context=context))
+
+
+class FastListMixin:
+    """ViewSet: list serialize bằng FieldPlan nếu serializer opt-in (Meta.fast_read) và compile được"""
+
+    def get_fast_plan(self):
+        if not getattr(settings, 'API_FAST_SERIALIZATION', True):
+            return None
+        return FieldPlan.for_serializer(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_fast_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = plan.with_columns(ordering_columns(queryset))
+        rows = queryset.values_list(*plan.columns, named=True)
+
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.emit(page, context))
+        return Response(plan.emit(rows, context))
@@ -0,0 +1,232 @@
+"""
+Sparse Fieldsets
+Client chọn field cần trả về (?fields= / ?expand=), list mặc định trả bản rút gọn (job card),
+queryset chỉ SELECT các cột serializer thật sự dùng
+
+WHY?
+- JobSerializer `__all__` + CompanySerializer `__all__`: mỗi dòng list mang theo description/requirements/benefits
+  + mô tả công ty => hàng chục KB mỗi trang, phần lớn frontend không hiển thị
+- Postgres vẫn phải đọc (và de-TOAST) các cột TEXT lớn đó dù response không cần
+
+HOW IT WORKS:
+- SparseFieldsetMixin (view): action list/retrieve => context['field_selection'] = {'only', 'expand', 'compact'}
+    * ?fields=id,title,company_info.name  -> chỉ các field này (dấu chấm: chọn field của serializer lồng)
+    * ?expand=description,job_info.benefits -> thêm field ngoài mặc định
+    * action list (compact) => mặc định Meta.list_fields của serializer (nếu có)
+- DynamicFieldsMixin (serializer): bỏ field không được chọn trong get_fields(), truyền phần chọn con xuống serializer lồng
+  Không có field_selection trong context (create/update/task...) => trả đủ field như cũ
+- project_queryset: list => .only(cột của các field được chọn + cột ordering) và bỏ select_related không dùng tới
+  Có field không suy ra được cột (source='*', property...) => giữ nguyên queryset
+- Serializer có `snapshot` (vd JobSerializer -> JobCardSnapshot, apps/jobs/cards.py): bản list mặc định
+  đọc từ cột JSON render sẵn + các cột live_fields thay vì serialize từng field (chỉ SELECT các cột đó)
+
+USAGE:
+    class JobSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+        class Meta:
+            model = Job
+            fields = '__all__'
+            list_fields = ('id', 'title', 'company_info.name')
+
+    class JobViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
+        ...
+
+    GET /api/v1/jobs/?fields=id,title&expand=description
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+def parse_field_paths(paths):
+    """
+    ['id', 'job_info.title', 'job_info.company_info.name'] (hoặc chuỗi 'id,job_info.title')
+    -> {'id': {}, 'job_info': {'title': {}, 'company_info': {'name': {}}}}
+    ({} = dùng mặc định của serializer lồng)
+    """
+    if isinstance(paths, str):
+        paths = paths.split(',')
+    tree = {}
+    for path in paths:
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer chỉ giữ các field được chọn trong context['field_selection']
+    Meta.list_fields: field mặc định khi serialize list (compact)
+    """
+
+    _selection = None  # Serializer lồng: phần chọn do serializer cha truyền xuống
+    # Output mặc định của list render sẵn trong 1 cột: có `column`, `live_fields`, load(pks), render(card, request, live)
+    snapshot = None
+
+    def get_field_selection(self):
+        if self._selection is not None:
+            return self._selection
+        return self.context.get('field_selection')
+
+    def get_snapshot(self):
+        """Snapshot dùng được khi serialize bản list mặc định (không ?fields= / ?expand= cho serializer này)"""
+        selection = self.get_field_selection()
+        if self.snapshot is None or not selection or not selection.get('compact'):
+            return None
+        if selection.get('only') or selection.get('expand'):
+            return None
+        return self.snapshot
+
+    def to_representation(self, instance):
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            return super().to_representation(instance)
+        card = getattr(instance, snapshot.column) or snapshot.load([instance.pk])[instance.pk]
+        return snapshot.render(card, self.context.get('request'), instance)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.get_field_selection()
+        if not selection:
+            return fields
+
+        only = selection.get('only') or None
+        expand = selection.get('expand') or {}
+        list_fields = getattr(self.Meta, 'list_fields', None)
+        if only is None and selection.get('compact') and list_fields is not None:
+            only = parse_field_paths(list_fields)
+
+        if only is not None:
+            keep = set(only) | set(expand)
+            fields = {name: field for name, field in fields.items() if name in keep}
+
+        for name, field in fields.items():
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(nested, DynamicFieldsMixin):
+                nested._selection = {
+                    'only': (only or {}).get(name) or None,
+                    'expand': expand.get(name, {}),
+                    'compact': selection.get('compact', False),
+                }
+        return fields
+
+
+def serializer_columns(serializer, prefix=''):
+    """
+    Đường dẫn cột (kiểu .only()) cho các field đọc của ModelSerializer, gồm cả serializer lồng qua FK/OneToOne
+    None nếu có field không map được vào cột (source='*', property, method...)
+    """
+    model = serializer.Meta.model
+    columns = [prefix + model._meta.pk.name]
+    snapshot = serializer.get_snapshot() if isinstance(serializer, DynamicFieldsMixin) else None
+    if snapshot is not None:
+        return columns + [prefix + name for name in (snapshot.column, *snapshot.live_fields)]
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or len(field.source_attrs) != 1:
+            return None
+        name = field.source_attrs[0]
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if model_field.many_to_many or model_field.one_to_many:
+            continue  # Không có cột trên bảng này (prefetch riêng)
+        if model_field.is_relation and isinstance(nested, serializers.ModelSerializer):
+            nested_columns = serializer_columns(nested, prefix=f"{prefix}{name}__")
+            if nested_columns is None:
+                return None
+            if model_field.concrete:
+                columns.append(prefix + name)
+            columns.extend(nested_columns)
+        elif model_field.concrete:
+            columns.append(prefix + name)
+        else:
+            return None
+    return columns
+
+
+def flatten_select_related(related, prefix=''):
+    """{'job': {'company': {}}, 'candidate': {}} -> ['job', 'job__company', 'candidate']"""
+    paths = []
+    for name, children in related.items():
+        paths.append(prefix + name)
+        paths.extend(flatten_select_related(children, prefix=f"{prefix}{name}__"))
+    return paths
+
+
+def ordering_columns(queryset):
+    """Cột của bảng chính trong ORDER BY (KeysetPagination đọc giá trị các cột này để tạo cursor)"""
+    opts = queryset.model._meta
+    ordering = queryset.query.order_by or (opts.ordering if queryset.query.default_ordering else [])
+    columns = []
+    for item in ordering:
+        name = item.lstrip('-+') if isinstance(item, str) else ''
+        if name and '__' not in name and name not in ('?', 'pk'):
+            columns.append(name)
+    return columns
+
+
+def project_queryset(queryset, serializer):
+    """
+    .only() các cột serializer cần + cột ordering (cursor của KeysetPagination đọc giá trị ordering)
+    select_related không còn field nào đi qua => bỏ (tránh JOIN thừa và lỗi "deferred and traversed")
+    """
+    columns = serializer_columns(serializer)
+    related = queryset.query.select_related
+    if columns is None or related is True:
+        return queryset
+
+    columns.extend(ordering_columns(queryset))
+    traversed = {'__'.join(column.split('__')[:index])
+                 for column in columns for index in range(1, column.count('__') + 1)}
+    queryset = queryset.only(*dict.fromkeys(columns))
+    if related:
+        kept = [path for path in flatten_select_related(related) if path in traversed]
+        queryset = queryset.select_related(None).select_related(*kept)
+    return queryset
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet: ?fields= / ?expand= cho list/retrieve, list trả bản compact (Meta.list_fields)
+    và chỉ SELECT các cột được dùng
+    """
+
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def get_field_selection(self):
+        if self.request is None or self.action not in self.sparse_fieldset_actions:
+            return None
+        params = self.request.query_params
+        only = params.get(FIELDS_QUERY_PARAM)
+        return {
+            'only': parse_field_paths(only) if only else None,
+            'expand': parse_field_paths(params.get(EXPAND_QUERY_PARAM, '')),
+            'compact': self.action == 'list',
+        }
+
+    def has_custom_fieldset(self):
+        """Request có ?fields= / ?expand= (response khác bản mặc định => không dùng chung cache)"""
+        params = self.request.query_params
+        return bool(params.get(FIELDS_QUERY_PARAM) or params.get(EXPAND_QUERY_PARAM))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        selection = self.get_field_selection()
+        if selection is not None:
+            context['field_selection'] = selection
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = project_queryset(queryset, self.get_serializer())
+        return queryset
@@ -0,0 +1,36 @@
+"""
+Keyset Ranges
+Chia 1 queryset lớn thành các khoảng (low, high] theo pk để xử lý theo lô / song song
+
+WHY?
+- OFFSET lớn = DB phải quét bỏ toàn bộ phần trước => lô càng về sau càng chậm
+- Mỗi lô chỉ là 1 range scan trên index, chia đều cho nhiều worker
+- Ranh giới tính theo số row HIỆN TẠI: thêm/bớt row làm dịch mọi khoảng phía sau
+  => muốn resume, lưu lại danh sách khoảng lần đầu và dùng lại (reindex_jobs, JobAlertRun)
+
+USAGE:
+    from apps.core.keyset import keyset_ranges
+
+    for low, high in keyset_ranges(User.objects.filter(is_active=True), 500):
+        process.delay(low, high)  # worker: queryset.filter(pk__gt=low, pk__lte=high)
+"""
+
+
+def keyset_ranges(queryset, chunk_size, field='pk'):
+    """
+    Sinh các khoảng (low, high] theo `field` (số nguyên tăng dần), mỗi khoảng ~chunk_size row
+
+    Mỗi ranh giới tốn 1 query đọc đúng 1 giá trị trên index, không load cả danh sách pk vào RAM.
+    """
+    values = queryset.order_by(field).values_list(field, flat=True)
+    low = 0
+    while True:
+        boundary = list(values.filter(**{f"{field}__gt": low})[chunk_size - 1:chunk_size])
+        if not boundary:
+            # Khoảng cuối: tới giá trị lớn nhất (nếu còn)
+            last = values.filter(**{f"{field}__gt": low}).last()
+            if last is not None:
+                yield low, last
+            return
+        yield low, boundary[0]
+        low = boundary[0]
@@ -0,0 +1,128 @@
+"""
+Location Directory
+Map địa điểm dạng text tự do ("TP. HCM", "Quận 1, Hồ Chí Minh", "ha noi") sang Location chuẩn hóa
+
+HOW IT WORKS:
+- Toàn bộ bảng Location (vài trăm dòng) cache 1 lần: danh sách + map alias đã bỏ dấu -> pk
+- resolve(text): thử cả chuỗi rồi từng phần tách bởi dấu phẩy/gạch theo thứ tự
+  ("Quận 1, Hồ Chí Minh": quận trước => ưu tiên địa điểm cụ thể nhất khớp được)
+- Location thay đổi (admin/seed) -> signal xóa cache
+
+USAGE:
+    from apps.core.locations import LocationDirectory, fold_text
+
+    fold_text('Đà Nẵng')  # 'da nang'
+    LocationDirectory.resolve('TP. Hồ Chí Minh')  # {'pk': 2, 'slug': 'ho-chi-minh', ...}
+    LocationDirectory.expand_pks(2)  # [2, <pk quận 1>, ...]
+"""
+import logging
+import re
+import unicodedata
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Tiền tố hành chính bỏ đi trước khi so khớp ("tp ho chi minh" -> "ho chi minh")
+ADMIN_PREFIXES = ('thanh pho ', 'tp ', 'tinh ', 'quan ', 'huyen ', 'thi xa ', 'tx ')
+# Quận có tên là số ("Quận 1") thì giữ tiền tố, "1" một mình không có nghĩa
+NUMBERED_DISTRICT = re.compile(r'^quan \d+$')
+
+
+def fold_text(text):
+    """Bỏ dấu tiếng Việt + lowercase + chỉ giữ chữ/số ('Bà Rịa - Vũng Tàu' -> 'ba ria vung tau')"""
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
+
+
+def strip_admin_prefix(folded):
+    if NUMBERED_DISTRICT.match(folded):
+        return folded
+    for prefix in ADMIN_PREFIXES:
+        if folded.startswith(prefix):
+            return folded[len(prefix):]
+    return folded
+
+
+class LocationDirectory:
+    """Bảng Location cache trong Django cache (đọc nhiều, gần như không đổi)"""
+
+    CACHE_KEY = 'core:locations:directory'
+
+    @classmethod
+    def _load(cls):
+        from .models import Location
+
+        rows = list(Location.objects.all())
+        locations = [
+            {
+                'pk': location.pk,
+                'name': location.name,
+                'slug': location.slug,
+                'kind': location.kind,
+                'parent_id': location.parent_id,
+                'lat': location.latitude,
+                'lon': location.longitude,
+            }
+            for location in rows
+        ]
+
+        aliases = {}
+        # Tỉnh trước quận: alias trùng nhau (vd "quang ngai" là tỉnh lẫn thành phố) ưu tiên tỉnh
+        for location in sorted(rows, key=lambda row: row.kind != Location.Kind.PROVINCE):
+            folded = fold_text(location.name)
+            keys = {folded, strip_admin_prefix(folded), folded.replace(' ', ''), location.slug.replace('-', ' ')}
+            keys.update(fold_text(alias) for alias in location.aliases or [])
+            for key in keys:
+                aliases.setdefault(key, location.pk)
+
+        return {'locations': locations, 'aliases': aliases}
+
+    @classmethod
+    def get(cls):
+        try:
+            directory = cache.get(cls.CACHE_KEY)
+        except Exception as e:
+            # Cache lỗi không được làm hỏng Job.save(): đọc thẳng DB (bảng nhỏ)
+            logger.warning(f"Location directory cache unavailable: {e}")
+            return cls._load()
+
+        if directory is None:
+            directory = cls._load()
+            cache.set(cls.CACHE_KEY, directory, timeout=None)
+        return directory
+
+    @classmethod
+    def invalidate(cls):
+        try:
+            cache.delete(cls.CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"Could not invalidate location directory cache: {e}")
+
+    @classmethod
+    def all(cls):
+        """Mọi Location theo thứ tự hiển thị (sort_order, name)"""
+        return cls.get()['locations']
+
+    @classmethod
+    def resolve(cls, text):
+        """Text tự do -> Location (dict) hoặc None nếu không nhận ra"""
+        if not text:
+            return None
+        directory = cls.get()
+        aliases = directory['aliases']
+
+        parts = [fold_text(part) for part in re.split(r'[,;/|]|\s-\s', text)]
+        candidates = [fold_text(text)] + [part for part in parts if part]
+        for candidate in candidates:
+            for key in (candidate, strip_admin_prefix(candidate)):
+                if key in aliases:
+                    return next(item for item in directory['locations'] if item['pk'] == aliases[key])
+        return None
+
+    @classmethod
+    def expand_pks(cls, pk):
+        """pk của địa điểm + các địa điểm con (lọc theo tỉnh thì khớp cả job ghi quận)"""
+        return [pk] + [item['pk'] for item in cls.all() if item['parent_id'] == pk]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:22
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('pkid', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('kind', models.CharField(choices=[('PROVINCE', 'Tỉnh/Thành phố'), ('DISTRICT', 'Quận/Huyện'), ('REMOTE', 'Làm việc từ xa')], db_index=True, default='PROVINCE', max_length=10)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('aliases', models.JSONField(blank=True, default=list)),
+                ('sort_order', models.PositiveSmallIntegerField(default=100)),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='core.location')),
+            ],
+            options={
+                'verbose_name': 'Địa điểm',
+                'verbose_name_plural': 'Địa điểm',
+                'ordering': ['sort_order', 'name'],
+            },
+        ),
+    ]
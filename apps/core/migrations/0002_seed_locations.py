@@ -0,0 +1,116 @@
+"""
+Seed danh mục 63 tỉnh/thành phố (tọa độ trung tâm hành chính) + "Remote"
+Quận/Huyện thêm sau qua admin (parent = tỉnh), không cần đổi code
+"""
+from django.db import migrations
+
+from apps.core.locations import fold_text
+
+# (tên, vĩ độ, kinh độ, alias đã bỏ dấu)
+PROVINCES = [
+    ('Hà Nội', 21.0285, 105.8542, ['hn', 'hanoi']),
+    ('Hồ Chí Minh', 10.8231, 106.6297, ['hcm', 'tp hcm', 'tphcm', 'hcmc', 'sai gon', 'saigon', 'sg']),
+    ('Đà Nẵng', 16.0544, 108.2022, ['danang', 'dn']),
+    ('Hải Phòng', 20.8449, 106.6881, ['haiphong', 'hp']),
+    ('Cần Thơ', 10.0452, 105.7469, ['cantho', 'ct']),
+    ('An Giang', 10.3865, 105.4352, []),
+    ('Bà Rịa - Vũng Tàu', 10.4963, 107.1684, ['vung tau', 'ba ria', 'brvt']),
+    ('Bắc Giang', 21.2731, 106.1946, []),
+    ('Bắc Kạn', 22.1470, 105.8348, ['bac can']),
+    ('Bạc Liêu', 9.2940, 105.7216, []),
+    ('Bắc Ninh', 21.1861, 106.0763, []),
+    ('Bến Tre', 10.2415, 106.3759, []),
+    ('Bình Định', 13.7830, 109.2197, ['quy nhon']),
+    ('Bình Dương', 10.9804, 106.6519, ['thu dau mot']),
+    ('Bình Phước', 11.5349, 106.8832, []),
+    ('Bình Thuận', 10.9289, 108.1021, ['phan thiet']),
+    ('Cà Mau', 9.1769, 105.1524, []),
+    ('Cao Bằng', 22.6657, 106.2570, []),
+    ('Đắk Lắk', 12.6667, 108.0500, ['dak lak', 'daklak', 'buon ma thuot']),
+    ('Đắk Nông', 12.0046, 107.6907, ['dak nong', 'daknong']),
+    ('Điện Biên', 21.3860, 103.0230, []),
+    ('Đồng Nai', 10.9574, 106.8426, ['bien hoa']),
+    ('Đồng Tháp', 10.4602, 105.6329, []),
+    ('Gia Lai', 13.9833, 108.0000, ['pleiku']),
+    ('Hà Giang', 22.8233, 104.9836, []),
+    ('Hà Nam', 20.5411, 105.9139, []),
+    ('Hà Tĩnh', 18.3428, 105.9057, []),
+    ('Hải Dương', 20.9373, 106.3146, []),
+    ('Hậu Giang', 9.7845, 105.4701, []),
+    ('Hòa Bình', 20.8133, 105.3383, ['hoa binh']),
+    ('Hưng Yên', 20.6464, 106.0511, []),
+    ('Khánh Hòa', 12.2388, 109.1967, ['nha trang']),
+    ('Kiên Giang', 10.0125, 105.0809, ['rach gia', 'phu quoc']),
+    ('Kon Tum', 14.3545, 108.0076, []),
+    ('Lai Châu', 22.3964, 103.4582, []),
+    ('Lâm Đồng', 11.9404, 108.4583, ['da lat', 'dalat']),
+    ('Lạng Sơn', 21.8537, 106.7615, []),
+    ('Lào Cai', 22.4809, 103.9755, ['sa pa', 'sapa']),
+    ('Long An', 10.5360, 106.4131, []),
+    ('Nam Định', 20.4200, 106.1683, []),
+    ('Nghệ An', 18.6796, 105.6813, ['vinh']),
+    ('Ninh Bình', 20.2506, 105.9745, []),
+    ('Ninh Thuận', 11.5639, 108.9886, ['phan rang']),
+    ('Phú Thọ', 21.3227, 105.4019, ['viet tri']),
+    ('Phú Yên', 13.0882, 109.0929, ['tuy hoa']),
+    ('Quảng Bình', 17.4689, 106.6223, ['dong hoi']),
+    ('Quảng Nam', 15.5736, 108.4740, ['hoi an', 'tam ky']),
+    ('Quảng Ngãi', 15.1214, 108.8044, []),
+    ('Quảng Ninh', 20.9712, 107.0448, ['ha long', 'halong']),
+    ('Quảng Trị', 16.8163, 107.1003, []),
+    ('Sóc Trăng', 9.6025, 105.9739, []),
+    ('Sơn La', 21.3256, 103.9188, []),
+    ('Tây Ninh', 11.3100, 106.0983, []),
+    ('Thái Bình', 20.4463, 106.3366, []),
+    ('Thái Nguyên', 21.5942, 105.8482, []),
+    ('Thanh Hóa', 19.8067, 105.7852, ['thanh hoa']),
+    ('Thừa Thiên Huế', 16.4637, 107.5909, ['hue', 'thua thien hue']),
+    ('Tiền Giang', 10.3600, 106.3600, ['my tho']),
+    ('Trà Vinh', 9.9347, 106.3453, []),
+    ('Tuyên Quang', 21.8233, 105.2140, []),
+    ('Vĩnh Long', 10.2537, 105.9722, []),
+    ('Vĩnh Phúc', 21.3089, 105.6049, ['vinh yen']),
+    ('Yên Bái', 21.7229, 104.9113, []),
+]
+
+# 5 thành phố trực thuộc trung ương lên đầu dropdown (như danh sách cũ của GeneralConfigView)
+MAJOR_CITIES = 5
+
+
+def seed_locations(apps, schema_editor):
+    Location = apps.get_model('core', 'Location')
+
+    locations = [
+        Location(
+            name=name,
+            slug=fold_text(name).replace(' ', '-'),
+            kind='PROVINCE',
+            latitude=latitude,
+            longitude=longitude,
+            aliases=aliases,
+            sort_order=index if index < MAJOR_CITIES else 100,
+        )
+        for index, (name, latitude, longitude, aliases) in enumerate(PROVINCES)
+    ]
+    locations.append(Location(
+        name='Remote', slug='remote', kind='REMOTE',
+        aliases=['tu xa', 'lam viec tu xa', 'wfh', 'work from home'], sort_order=MAJOR_CITIES,
+    ))
+    Location.objects.bulk_create(locations, ignore_conflicts=True)
+
+
+def unseed_locations(apps, schema_editor):
+    Location = apps.get_model('core', 'Location')
+    slugs = [fold_text(name).replace(' ', '-') for name, *_ in PROVINCES] + ['remote']
+    Location.objects.filter(slug__in=slugs).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_locations, unseed_locations),
+    ]
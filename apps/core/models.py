@@ -12,4 +12,34 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+class Location(TimeStampedModel):
+    """
+    Danh mục địa điểm chuẩn hóa (tỉnh/thành phố, quận/huyện) có tọa độ
+    Job.location (text tự do) được map sang Location qua tên/alias đã bỏ dấu (apps/core/locations.py)
+    """
+    class Kind(models.TextChoices):
+        PROVINCE = 'PROVINCE', 'Tỉnh/Thành phố'
+        DISTRICT = 'DISTRICT', 'Quận/Huyện'
+        REMOTE = 'REMOTE', 'Làm việc từ xa'
+
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)  # Tên bỏ dấu, dùng làm keyword filter trên ES
+    kind = models.CharField(max_length=10, choices=Kind.choices, default=Kind.PROVINCE, db_index=True)
+    parent = models.ForeignKey(
+        'self', on_delete=models.CASCADE, null=True, blank=True, related_name='children',
+    )  # Quận/Huyện -> Tỉnh/Thành phố
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Cách viết khác đã bỏ dấu + lowercase (vd: ['hcm', 'tp hcm', 'sai gon'])
+    aliases = models.JSONField(default=list, blank=True)
+    sort_order = models.PositiveSmallIntegerField(default=100)  # Thứ tự hiển thị trong dropdown
+
+    class Meta:
+        ordering = ['sort_order', 'name']
+        verbose_name = "Địa điểm"
+        verbose_name_plural = "Địa điểm"
+
+    def __str__(self):
+        return f"{self.name}, {self.parent.name}" if self.parent_id else self.name
@@ -0,0 +1,282 @@
+"""
+Pagination
+Phân trang mặc định cho mọi list endpoint: keyset (cursor) theo thứ tự của queryset + pk
+
+WHY?
+- Không phân trang => list trả cả bảng
+- OFFSET lớn: DB quét bỏ toàn bộ phần trước, trang càng sâu càng chậm; row mới chèn vào làm lệch/trùng trang
+- COUNT(*) trên bảng lớn quét cả bảng chỉ để hiển thị tổng số
+
+HOW IT WORKS:
+- KeysetPagination (DEFAULT_PAGINATION_CLASS):
+    * Thứ tự lấy từ queryset (order_by / Meta.ordering, mặc định -created_at) + pk làm tie-breaker
+      => (created_at, pkid) duy nhất, trang sau = WHERE (created_at, pkid) < (giá trị cuối trang trước)
+    * cursor = base64(JSON giá trị của row cuối/đầu trang), không có COUNT
+    * Response: {'next', 'previous', 'results'}
+- Thứ tự không keyset được (biểu thức, field nullable, field qua relation - vd ?ordering=salary_max,
+  thứ tự rank của ES) => tự chuyển sang EstimatedCountPagination (offset, ?page=N)
+- EstimatedCountPagination: đếm chính xác tới API_COUNT_ESTIMATE_THRESHOLD (COUNT trên subquery LIMIT),
+  vượt ngưỡng => ước lượng (pg_class.reltuples khi không filter, row estimate của EXPLAIN khi có filter)
+  Response: {'count', 'count_is_estimate', 'next', 'previous', 'results'}
+
+USAGE:
+    # settings: REST_FRAMEWORK['DEFAULT_PAGINATION_CLASS'] = 'apps.core.pagination.KeysetPagination'
+    # View cần số trang / tổng số:
+    class ReportViewSet(viewsets.ReadOnlyModelViewSet):
+        pagination_class = EstimatedCountPagination
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator có count chính xác tới ngưỡng, lớn hơn thì ước lượng"""
+
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        threshold = getattr(settings, 'API_COUNT_ESTIMATE_THRESHOLD', 10000)
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):  # List thường: len() là đủ
+            return len(queryset)
+        # SELECT COUNT(*) FROM (... LIMIT threshold + 1): dừng quét khi vượt ngưỡng
+        capped = queryset.order_by()[:threshold + 1].count()
+        self.count_is_estimate = capped > threshold
+        if not self.count_is_estimate:
+            return capped
+        return max(self.estimate(queryset), capped)
+
+    @staticmethod
+    def estimate(queryset):
+        """Số row ước lượng theo thống kê của Postgres (DB khác: 0 => dùng số đã đếm tới ngưỡng)"""
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return 0
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+            else:
+                sql, params = queryset.order_by().query.sql_with_params()
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            row = cursor.fetchone()
+        if row is None:
+            return 0
+        value = row[0]
+        if isinstance(value, str):
+            value = json.loads(value)
+        if isinstance(value, list):
+            value = value[0]['Plan']['Plan Rows']
+        return int(value)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """Offset (?page=N) cho view thật sự cần số trang/tổng số; COUNT(*) được thay bằng ước lượng trên ngưỡng"""
+
+    django_paginator_class = EstimatedCountPaginator
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'API_MAX_PAGE_SIZE', 100)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_estimate': self.page.paginator.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {'type': 'boolean'}
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination trên (thứ tự của queryset..., pk); không keyset được => EstimatedCountPagination"""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    fallback_class = EstimatedCountPagination
+    invalid_cursor_message = _('Invalid cursor')
+
+    def __init__(self):
+        self.fallback = None
+
+    @property
+    def page_size(self):
+        return api_settings.PAGE_SIZE or 20
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), getattr(settings, 'API_MAX_PAGE_SIZE', 100))
+
+    @staticmethod
+    def get_ordering(queryset):
+        """
+        [(field, descending), ...] kết thúc bằng pk, hoặc None nếu thứ tự không keyset được
+        (biểu thức, field nullable, field qua relation)
+        """
+        query = queryset.query
+        opts = queryset.model._meta
+        ordering = list(query.order_by or (opts.ordering if query.default_ordering else []))
+        if not ordering:
+            ordering = ['-created_at'] if any(f.name == 'created_at' for f in opts.concrete_fields) else []
+
+        result = []
+        for item in ordering:
+            if not isinstance(item, str) or item == '?' or '__' in item:
+                return None
+            descending = item.startswith('-')
+            name = item.lstrip('-+')
+            try:
+                field = opts.pk if name == 'pk' else opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.null or field.is_relation:
+                return None
+            result.append((field.name, descending))
+            if field.primary_key or field.unique:
+                return result  # Đã duy nhất, không cần tie-breaker
+        return result + [(opts.pk.name, result[-1][1] if result else False)]
+
+    def encode_cursor(self, values, reverse):
+        # isoformat()/str() đầy đủ (DjangoJSONEncoder cắt microsecond => so sánh = trên created_at sẽ sai)
+        values = [value if isinstance(value, (int, float, str)) else
+                  value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values]
+        payload = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, queryset):
+        """(giá trị đã to_python theo field, reverse) - cursor hỏng => 404"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values, reverse = payload['v'], bool(payload['r'])
+            if len(values) != len(self.ordering):
+                raise ValueError
+            opts = queryset.model._meta
+            values = [opts.get_field(name).to_python(value) for (name, _), value in zip(self.ordering, values)]
+        except (ValueError, TypeError, KeyError, binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def position_filter(self, values, reverse):
+        """
+        Row nằm sau (reverse: trước) vị trí `values` theo self.ordering:
+        (a > x) OR (a = x AND b > y) OR ... (chiều so sánh theo từng field)
+        """
+        condition = Q()
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal_prefix = dict(zip(self.field_names[:index], values[:index]))
+            condition |= Q(**{f"{name}__{lookup}": values[index]}, **equal_prefix)
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        if self.ordering is None:
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+        self.field_names = [name for name, _ in self.ordering]
+
+        page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor, queryset)
+            queryset = queryset.filter(self.position_filter(values, reverse))
+
+        order_by = [('-' if descending != reverse else '') + name for name, descending in self.ordering]
+        rows = list(queryset.order_by(*order_by)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Trang tiến: có trang trước nếu đến từ 1 cursor; trang lùi: luôn có trang sau (nơi vừa lùi từ đó)
+        self.has_next = has_more if not reverse else bool(cursor)
+        self.has_previous = bool(cursor) if not reverse else has_more
+        self.first = self.row_values(rows[0]) if rows else None
+        self.last = self.row_values(rows[-1]) if rows else None
+        if not rows and cursor:
+            # Trang rỗng (vd: hết dữ liệu phía sau): vẫn cho quay lại từ đúng vị trí cursor
+            self.first = self.last = values
+        return rows
+
+    def row_values(self, row):
+        return [getattr(row, name) for name in self.field_names]
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last, False))
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.first, True))
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor của trang (lấy từ next/previous)',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Số kết quả mỗi trang',
+                'schema': {'type': 'integer'},
+            },
+        ]
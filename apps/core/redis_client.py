@@ -0,0 +1,24 @@
+"""
+Redis Client
+Kết nối Redis "thô" cho các cấu trúc mà Django cache API không có (HASH, SET, ZSET...)
+
+WHY?
+- django.core.cache chỉ có get/set/incr trên key đơn
+- Counter buffer, hàng đợi dedupe... cần HINCRBY, RENAME, SADD => dùng redis-py trực tiếp
+- Dùng chung REDIS_URL với Celery/Channels, connection pool tạo 1 lần mỗi process
+
+USAGE:
+    from apps.core.redis_client import get_redis
+
+    get_redis().hincrby('jobs:views:pending', '42', 1)
+"""
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis():
+    """Redis client dùng chung (decode_responses=True => trả về str thay vì bytes)"""
+    return redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
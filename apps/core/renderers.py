@@ -0,0 +1,61 @@
+"""
+JSON Renderer / Parser (orjson)
+Thay json của stdlib cho mọi response/request JSON
+
+WHY?
+- JSONRenderer của DRF dùng json.dumps (pure Python encoder cho dict/list lồng nhau)
+  => với list 20-100 dòng, encode JSON chiếm phần đáng kể CPU sau serializer
+- orjson (Rust) encode/decode nhanh hơn nhiều lần, output đã là bytes UTF-8
+
+HOW IT WORKS:
+- ORJSONRenderer: orjson.dumps; kiểu orjson không tự xử lý (Decimal, lazy string, QuerySet...)
+  đi qua encoder của DRF => output giống JSONRenderer (datetime UTC kết thúc bằng 'Z', Decimal -> số)
+- Accept: application/json; indent=N => OPT_INDENT_2 (orjson chỉ hỗ trợ indent 2)
+- ORJSONParser: orjson.loads, lỗi => ParseError như JSONParser (NaN/Infinity bị từ chối)
+- Chưa cài orjson => dùng nguyên JSONRenderer / JSONParser của DRF
+"""
+from decimal import Decimal
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn
+    orjson = None
+
+
+def default(obj):
+    """Kiểu orjson không serialize được: cùng cách với encoder của DRF"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return JSONEncoder().default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer dùng orjson (cùng media type 'application/json')"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=default, option=option)
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser dùng orjson"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read() if stream is not None else b'')
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .locations import LocationDirectory
+from .models import Location
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_directory(sender, **kwargs):
+    """Thêm/sửa/xóa Location (admin, seed) -> nạp lại danh mục địa điểm đã cache"""
+    LocationDirectory.invalidate()
@@ -32,6 +32,7 @@ USAGE:
 
 from django.db import models
 from django.utils import timezone
+from rest_framework import serializers
 
 
 class SoftDeleteQuerySet(models.QuerySet):
@@ -200,6 +201,62 @@ class SoftDeleteAdminMixin:
 
 
 # Utility functions
+def prefetch_soft_deleted(instances, field_name, queryset=None):
+    """
+    Nạp FK `field_name` (trỏ tới model soft delete) cho cả danh sách bằng 1 query qua all_objects
+
+    WHY?
+    - Manager mặc định bỏ qua bản ghi đã xóa mềm => serializer từng phải get() lại từng dòng (N+1)
+    - Gom id của cả trang, in_bulk 1 lần rồi gắn vào cache của field => instance.<field_name> không query nữa
+    - Instance đã có object trong cache (select_related) thì bỏ qua; bản ghi đã bị xóa cứng => None
+
+    Usage:
+        from apps.core.soft_delete import prefetch_soft_deleted
+
+        prefetch_soft_deleted(applications, 'job', Job.all_objects.select_related('company'))
+        applications[0].job  # Job (kể cả is_deleted=True), không query thêm
+
+    Args:
+        instances: List model instance (cùng model)
+        field_name: Tên ForeignKey
+        queryset: Queryset nạp object liên quan (default: related_model.all_objects.all())
+
+    Returns:
+        list: instances (đã gắn object liên quan)
+    """
+    instances = list(instances)
+    if not instances:
+        return instances
+
+    field = instances[0]._meta.get_field(field_name)
+    pending = [
+        obj for obj in instances
+        if getattr(obj, field.attname) is not None and not field.is_cached(obj)
+    ]
+    if pending:
+        if queryset is None:
+            queryset = field.related_model.all_objects.all()
+        related = queryset.in_bulk({getattr(obj, field.attname) for obj in pending})
+        for obj in pending:
+            field.set_cached_value(obj, related.get(getattr(obj, field.attname)))
+    return instances
+
+
+class SoftDeletePrefetchListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer nạp trước FK soft delete của cả trang trước khi serialize từng dòng
+
+    Serializer con khai báo `soft_delete_related = {'job': Job.all_objects.select_related('company')}`
+    và Meta.list_serializer_class = SoftDeletePrefetchListSerializer
+    """
+
+    def to_representation(self, data):
+        instances = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        for field_name, queryset in getattr(self.child, 'soft_delete_related', {}).items():
+            prefetch_soft_deleted(instances, field_name, queryset)
+        return super().to_representation(instances)
+
+
 def cleanup_old_deleted_objects(model, days=90, batch_size=1000):
     """
     Permanently delete objects that were soft-deleted > X days ago
@@ -0,0 +1,20 @@
+"""
+Test Settings
+Settings dùng chung cho test chạy không cần Redis/Elasticsearch
+
+USAGE:
+    from apps.core.testing import LOCAL_TEST_SETTINGS
+
+    @override_settings(**LOCAL_TEST_SETTINGS)
+    class JobDetailCacheTest(APITestCase): ...
+
+    @override_settings(**LOCAL_TEST_SETTINGS, JOB_SEARCH_BACKEND='memory')  # chỉ thêm phần riêng của class
+    class MemorySearchBackendTest(APITestCase): ...
+"""
+
+LOCAL_TEST_SETTINGS = {
+    # Cache trong process thay cho Redis (django-redis)
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    # Không đồng bộ Elasticsearch theo signal
+    'ELASTICSEARCH_DSL_AUTOSYNC': False,
+}
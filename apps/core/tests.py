@@ -1,3 +1,333 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from .cache_tags import TaggedCache
+from .locations import LocationDirectory, fold_text
+from .models import Location
+from .testing import LOCAL_TEST_SETTINGS
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class TaggedCacheTest(TestCase):
+    """Test cache invalidate theo tag"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_get_returns_value_until_tag_invalidated(self):
+        """Test entry hợp lệ cho tới khi 1 trong các tag bị invalidate"""
+        TaggedCache.set('detail:1', {'title': 'Python'}, tags=['job:1', 'company:7'])
+        self.assertEqual(TaggedCache.get('detail:1'), {'title': 'Python'})
+
+        TaggedCache.invalidate_tags('company:7')
+
+        self.assertIsNone(TaggedCache.get('detail:1'))
+
+    def test_invalidate_other_tag_keeps_entry(self):
+        """Test invalidate tag không liên quan không ảnh hưởng entry"""
+        TaggedCache.set('detail:1', 'data', tags=['job:1'])
+        TaggedCache.invalidate_tags('job:2')
+
+        self.assertEqual(TaggedCache.get('detail:1'), 'data')
+
+    def test_evicted_tag_version_treated_as_stale(self):
+        """Test tag version bị evict -> entry cũ không được dùng lại (tránh ABA)"""
+        from django.core.cache import cache
+
+        TaggedCache.set('detail:1', 'data', tags=['job:1'])
+        TaggedCache.invalidate_tags('job:1')
+        cache.delete(TaggedCache._tag_key('job:1'))
+
+        self.assertIsNone(TaggedCache.get('detail:1'))
+
+    def test_get_many_skips_invalidated_entries(self):
+        """Test get_many chỉ trả các entry có tag còn hợp lệ"""
+        TaggedCache.set('card:1', 'one', tags=['job:1', 'company:7'])
+        TaggedCache.set('card:2', 'two', tags=['job:2', 'company:7'])
+        TaggedCache.invalidate_tags('job:1')
+
+        self.assertEqual(TaggedCache.get_many(['card:1', 'card:2', 'card:3']), {'card:2': 'two'})
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class LocationDirectoryTest(TestCase):
+    """Test danh mục địa điểm (seed bằng migration) + map text tự do"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # pytest chạy --nomigrations => seed danh mục địa điểm giống migration 0002
+        from importlib import import_module
+        from django.apps import apps
+        import_module('apps.core.migrations.0002_seed_locations').seed_locations(apps, None)
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_fold_text(self):
+        self.assertEqual(fold_text('  Bà Rịa - Vũng Tàu '), 'ba ria vung tau')
+        self.assertEqual(fold_text('Đà Nẵng'), 'da nang')
+
+    def test_resolve_variants(self):
+        """Test tên có/không dấu, tiền tố hành chính, alias, chuỗi nhiều phần"""
+        for text in ('Hồ Chí Minh', 'TP. Hồ Chí Minh', 'tphcm', 'Sài Gòn', 'Quận 3, HCM'):
+            self.assertEqual(LocationDirectory.resolve(text)['slug'], 'ho-chi-minh', text)
+        self.assertEqual(LocationDirectory.resolve('hanoi')['slug'], 'ha-noi')
+        self.assertIsNone(LocationDirectory.resolve('Sao Hỏa'))
+
+    def test_location_change_invalidates_directory(self):
+        """Test thêm Location -> resolve thấy ngay (signal xóa cache)"""
+        self.assertIsNone(LocationDirectory.resolve('Thủ Đức'))
+
+        Location.objects.create(
+            name='Thủ Đức', slug='thu-duc', kind=Location.Kind.DISTRICT,
+            parent=Location.objects.get(slug='ho-chi-minh'),
+        )
+
+        self.assertEqual(LocationDirectory.resolve('TP Thủ Đức')['slug'], 'thu-duc')
+
+    def test_config_view_serves_locations_from_table(self):
+        """Test /config/ trả danh mục tỉnh/thành (thành phố lớn đầu tiên), không gồm quận"""
+        response = self.client.get(reverse('general-config'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['locations'][:2], ['Hà Nội', 'Hồ Chí Minh'])
+        self.assertEqual(len(response.data['locations']), 64)
+        self.assertEqual(response.data['location_options'][0]['value'], 'ha-noi')
+
+    def test_config_view_conditional_get(self):
+        """Test /config/ trả ETag, gửi lại If-None-Match => 304 không body cho tới khi danh mục đổi"""
+        url = reverse('general-config')
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        Location.objects.create(name='Tỉnh Mới', slug='tinh-moi', kind=Location.Kind.PROVINCE)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class CircuitBreakerTest(TestCase):
+    """Test ngắt mạch sau N lần lỗi/chậm, half-open lỗi 1 lần là mở lại"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def fail(self):
+        raise ConnectionError('down')
+
+    def test_opens_after_threshold(self):
+        from unittest import mock
+        from .circuit_breaker import CircuitBreaker
+
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=30)
+        self.assertEqual(breaker.call(self.fail, fallback=lambda: 'fallback'), 'fallback')
+        self.assertFalse(breaker.is_open())
+        self.assertEqual(breaker.call(self.fail, fallback=lambda: 'fallback'), 'fallback')
+        self.assertTrue(breaker.is_open())
+
+        primary = mock.Mock(return_value='primary')
+        self.assertEqual(breaker.call(primary, fallback=lambda: 'fallback'), 'fallback')
+        primary.assert_not_called()
+
+    def test_half_open_and_latency_budget(self):
+        from django.core.cache import cache
+        from unittest import mock
+        from .circuit_breaker import CircuitBreaker
+
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30, latency_budget=0.5)
+        breaker.trip()
+        cache.delete(breaker.open_key)  # Hết reset_timeout => half-open
+
+        with mock.patch('apps.core.circuit_breaker.time.monotonic', side_effect=[0, 1]):
+            # Chậm quá budget: vẫn trả kết quả nhưng mạch mở lại
+            self.assertEqual(breaker.call(lambda: 'slow', fallback=lambda: 'fallback'), 'slow')
+        self.assertTrue(breaker.is_open())
+
+        cache.delete(breaker.open_key)
+        self.assertEqual(breaker.call(lambda: 'ok', fallback=lambda: 'fallback'), 'ok')
+        self.assertEqual(breaker.state(), {'open': False, 'dirty': False})
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class PaginationTest(TestCase):
+    """Test keyset cursor (created_at, pkid) trên list endpoint, offset + count ước lượng khi không keyset được"""
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.contrib.auth import get_user_model
+        from django.utils import timezone
+        from apps.companies.models import Company
+        from apps.jobs.models import Job
+
+        recruiter = get_user_model().objects.create_user(
+            email='recruiter@test.com', username='recruiter@test.com', password='testpass123',
+            full_name='Test Recruiter', user_type='RECRUITER',
+        )
+        company = Company.objects.create(name='C', description='D', address='A', owner=recruiter)
+        self.jobs = [
+            Job.objects.create(
+                title=f'Job {i}', company=company, location='Hà Nội', description='D', requirements='R',
+                benefits='B', deadline=timezone.now().date() + timedelta(days=30), salary_max=i * 100,
+            )
+            for i in range(5)
+        ]
+        # 3 job cùng created_at: tie-breaker pkid phải giữ thứ tự ổn định, không trùng/sót
+        Job.objects.filter(pk__in=[job.pk for job in self.jobs[1:4]]).update(created_at=self.jobs[1].created_at)
+        self.url = reverse('v1:job-list')
+
+    def test_cursor_walks_forward_and_back(self):
+        from apps.jobs.models import Job
+
+        expected = list(Job.objects.order_by('-created_at', '-pkid').values_list('title', flat=True))
+        seen, pages, url = [], [], f'{self.url}?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            pages.append(response.data)
+            seen.extend(job['title'] for job in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]['previous'])
+
+        response = self.client.get(pages[2]['previous'])
+        self.assertEqual([job['title'] for job in response.data['results']], expected[2:4])
+
+        self.assertEqual(self.client.get(self.url, {'cursor': 'not-a-cursor'}).status_code, 404)
+
+    @override_settings(API_COUNT_ESTIMATE_THRESHOLD=3)
+    def test_nullable_ordering_falls_back_to_estimated_offset(self):
+        response = self.client.get(self.url, {'ordering': '-salary_max', 'page_size': 2})
+
+        self.assertEqual([job['title'] for job in response.data['results']], ['Job 4', 'Job 3'])
+        self.assertTrue(response.data['count_is_estimate'])
+        self.assertEqual(response.data['count'], 4)  # Đếm tới ngưỡng + 1 (sqlite không có thống kê để ước lượng)
+        self.assertIn('page=2', response.data['next'])
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class FastSerializationTest(APITestCase):
+    """Test đường serialize nhanh (values_list + FieldPlan) trả đúng như serializer DRF"""
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.contrib.auth import get_user_model
+        from django.contrib.contenttypes.models import ContentType
+        from django.utils import timezone
+        from apps.companies.models import Company
+        from apps.jobs.models import Job, SavedJob
+        from apps.notifications.models import Notification
+
+        User = get_user_model()
+        recruiter = User.objects.create_user(
+            email='recruiter@test.com', username='recruiter@test.com', password='testpass123',
+            full_name='Test Recruiter', user_type='RECRUITER',
+        )
+        self.candidate = User.objects.create_user(
+            email='candidate@test.com', username='candidate@test.com', password='testpass123',
+            full_name='Test Candidate', user_type='CANDIDATE',
+        )
+        company = Company.objects.create(
+            name='C', description='D', address='A', owner=recruiter, logo='company_logos/c.png',
+        )
+        jobs = [
+            Job.objects.create(
+                title=f'Job {i}', company=company, location='Hà Nội', description='D', requirements='R',
+                benefits='B', deadline=timezone.now().date() + timedelta(days=30),
+                salary_min=None if i else 1000, salary_max=i * 100,
+            )
+            for i in range(3)
+        ]
+        for job in jobs:
+            SavedJob.objects.create(user=self.candidate, job=job)
+        jobs[0].delete()  # Job đã xóa mềm vẫn hiển thị trong danh sách đã lưu
+
+        # bulk_create: không bắn signal gửi websocket
+        Notification.objects.bulk_create([
+            Notification(recipient=self.candidate, verb=f'Verb {i}', description=None if i else 'Text',
+                         content_type=ContentType.objects.get_for_model(Job), object_id=jobs[i].id)
+            for i in range(2)
+        ])
+
+    def get_both(self, url, params=None):
+        """Response của đường nhanh (serializer DRF không được gọi) và của serializer DRF"""
+        from unittest import mock
+        from rest_framework import serializers
+
+        self.client.force_authenticate(user=self.candidate)
+        with mock.patch.object(serializers.ModelSerializer, 'to_representation', side_effect=AssertionError):
+            fast = self.client.get(url, params)
+        with self.settings(API_FAST_SERIALIZATION=False):
+            slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, 200)
+        return fast.json(), slow.json()
+
+    def test_job_list_matches_serializer(self):
+        fast, slow = self.get_both(reverse('v1:job-list'))
+
+        self.assertEqual(fast, slow)
+        self.assertEqual(len(fast['results']), 2)
+        self.assertTrue(fast['results'][0]['company_info']['logo'].startswith('http://testserver/'))
+
+        fast, slow = self.get_both(reverse('v1:job-list'), {'fields': 'id,salary_min', 'expand': 'description'})
+        self.assertEqual(fast, slow)
+
+    def test_saved_job_and_notification_lists_match_serializer(self):
+        fast, slow = self.get_both(reverse('v1:saved-jobs-list'))
+        self.assertEqual(fast, slow)
+        self.assertEqual(sum(row['job_info']['is_deleted'] for row in fast['results']), 1)
+
+        fast, slow = self.get_both(reverse('v1:notification-list'))
+        self.assertEqual(fast, slow)
+        self.assertEqual(len(fast['results']), 2)
+
+    def test_cursor_pages_from_values_rows(self):
+        """Test KeysetPagination tạo cursor từ Row của values_list như từ model instance"""
+        self.client.force_authenticate(user=self.candidate)
+        first = self.client.get(reverse('v1:saved-jobs-list'), {'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+
+        titles = [row['job_info']['title'] for row in first['results'] + second['results']]
+        self.assertEqual(titles, ['Job 2', 'Job 1', 'Job 0'])
+
+
+class ORJSONRendererTest(TestCase):
+    """Test renderer/parser orjson cho cùng kết quả với JSONRenderer/JSONParser của DRF"""
+
+    def test_render_matches_drf_json(self):
+        import io
+        import json
+        import uuid
+        from datetime import date, datetime, timezone as dt_timezone
+        from decimal import Decimal
+        from django.utils.translation import gettext_lazy
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import ORJSONParser, ORJSONRenderer
+
+        data = {
+            'id': uuid.uuid4(), 'price': Decimal('1.50'), 'label': gettext_lazy('Hello'),
+            'at': datetime(2026, 10, 1, 8, 30, 15, 123456, tzinfo=dt_timezone.utc), 'day': date(2026, 10, 1),
+            1: ['Hà Nội', None, True],
+        }
+        rendered = ORJSONRenderer().render(data)
+
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data)))
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(rendered))['at'], '2026-10-01T08:30:15.123456Z')
+
+    def test_parse_error(self):
+        import io
+        from rest_framework.exceptions import ParseError
+        from .renderers import ORJSONParser
+
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"a": NaN}'))
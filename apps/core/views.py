@@ -9,6 +9,9 @@ from rest_framework import status
 import os
 
 from apps.jobs.models import Job
+from apps.core.conditional import conditional_response, content_etag
+from apps.core.locations import LocationDirectory
+from apps.core.models import Location
 from apps.core.websocket_ticket import WebSocketTicketService
 from apps.resumes.models import Resume
 from apps.applications.models import Application
@@ -137,19 +140,36 @@ class GeneralConfigView(APIView):
     API trả về các cấu hình chung, danh sách lựa chọn (Choices)
     để Frontend hiển thị Dropdown/Filter.
     URL: GET /api/v1/config/
+    Dữ liệu đọc từ code + cache (LocationDirectory) => ETag theo nội dung, poll lại khi không đổi trả 304
     """
     permission_classes = [AllowAny]
 
     def get(self, request):
-        return Response({
+        data = self.get_config()
+        return conditional_response(request, content_etag(request, data), None, lambda: Response(data))
+
+    @staticmethod
+    def get_config():
+        locations = [
+            location for location in LocationDirectory.all()
+            if location['kind'] != Location.Kind.DISTRICT
+        ]
+        return {
             "job_types": [
                 {"value": k, "label": v} for k, v in Job.JobType.choices
             ],
             "job_statuses": [
                 {"value": k, "label": v} for k, v in Job.Status.choices
             ],
-            # Bạn có thể thêm danh sách tỉnh thành ở đây nếu có model Location
-            "locations": [
-                "Hà Nội", "Hồ Chí Minh", "Đà Nẵng", "Cần Thơ", "Remote"
-            ]
-        })
\ No newline at end of file
+            # Danh mục Location (cache, xem apps/core/locations.py) - chỉ cấp tỉnh/thành + Remote
+            "locations": [location['name'] for location in locations],
+            "location_options": [
+                {
+                    "value": location['slug'],
+                    "label": location['name'],
+                    "lat": location['lat'],
+                    "lon": location['lon'],
+                }
+                for location in locations
+            ],
+        }
\ No newline at end of file
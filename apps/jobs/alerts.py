@@ -0,0 +1,257 @@
+"""
+Job Alerts (Percolator)
+Đảo chiều bài toán gửi email việc làm mới: thay vì mỗi ngày chạy 1 search cho mỗi ứng viên,
+lưu tiêu chí của ứng viên thành percolator query và "search ngược" mỗi job mới 1 lần.
+
+HOW IT WORKS:
+- JobAlertSubscription lưu/sửa/xóa -> index_subscription / delete_subscription (index job_alerts)
+- Job được đăng/sửa -> percolate(job): ES trả về các subscription khớp
+  -> ZADD job pk vào jobs:alerts:pending:<user pk> (score = thời điểm đăng)
+- Mỗi job chỉ vào hàng đợi của 1 user 1 lần (set jobs:alerts:notified:<job pk>),
+  sửa job sau đó không làm user nhận lại job cũ
+- Digest hằng ngày chỉ đọc hàng đợi (pending_job_pks) => chi phí theo số job mới, không theo số ứng viên
+  rồi chỉ ZREM các job đã đọc (clear_pending) => job mới xếp vào trong lúc gửi không bị mất
+
+- Digest chia lô theo khoảng pk, tiến độ mỗi lần chạy lưu ở JobAlertRun (chạy lại bỏ qua lô đã xong)
+  Danh sách khoảng chốt ở lần chạy đầu của run => ứng viên đăng ký/hủy giữa chừng không làm dịch batch id
+
+USAGE:
+    from apps.jobs.alerts import JobAlertPercolator, JobAlertRun
+
+    JobAlertPercolator.percolate(job)
+    JobAlertPercolator.pending_job_pks([user.pk])  # {user_pk: [job_pk, ...]}
+    JobAlertRun.progress('2025-01-31')  # {'total': 20, 'done': 12, 'sent': 4810, 'failed': 0, ...}
+"""
+import json
+import time
+
+from django.conf import settings
+from elasticsearch_dsl import Q as ES_Q
+
+from apps.core.locations import LocationDirectory
+from apps.core.redis_client import get_redis
+from apps.users.models import User
+from .documents import JobAlertQueryDocument, JobDocument
+
+
+class JobAlertPercolator:
+    """Lưu subscription thành percolator query + hàng đợi job khớp theo user"""
+
+    PENDING_PREFIX = 'jobs:alerts:pending:'
+    NOTIFIED_PREFIX = 'jobs:alerts:notified:'
+
+    @staticmethod
+    def subscribers():
+        """Ứng viên đang hoạt động có ít nhất 1 subscription bật"""
+        return User.objects.filter(
+            user_type=User.UserType.CANDIDATE,
+            is_active=True,
+            job_alert_subscriptions__is_active=True,
+        ).distinct()
+
+    @staticmethod
+    def build_query(subscription):
+        """Tiêu chí subscription -> ES query (các điều kiện AND với nhau)"""
+        must, filters = [], []
+
+        if subscription.keywords:
+            must.append(ES_Q(
+                'multi_match',
+                query=subscription.keywords,
+                fields=['title^3', 'requirements', 'description'],
+                fuzziness='AUTO',
+            ))
+        if subscription.location:
+            # Địa điểm nhận ra được => keyword filter (job ở quận thuộc tỉnh cũng khớp)
+            resolved = LocationDirectory.resolve(subscription.location)
+            if resolved:
+                filters.append(ES_Q('term', location_slugs=resolved['slug']))
+            else:
+                must.append(ES_Q('match', location={'query': subscription.location, 'fuzziness': 'AUTO'}))
+        if subscription.job_type:
+            filters.append(ES_Q('term', job_type=subscription.job_type))
+        if subscription.salary_min:
+            filters.append(ES_Q('range', salary_max={'gte': subscription.salary_min}))
+
+        if not must and not filters:
+            return ES_Q('match_all')
+        return ES_Q('bool', must=must, filter=filters)
+
+    @classmethod
+    def index_subscription(cls, subscription):
+        """Tạo/cập nhật percolator query (subscription tắt => xóa khỏi index)"""
+        if not subscription.is_active:
+            return cls.delete_subscription(subscription.pk)
+
+        JobAlertQueryDocument.init()  # Tạo index + mapping nếu chưa có (idempotent)
+        JobAlertQueryDocument(
+            meta={'id': subscription.pk},
+            query=cls.build_query(subscription).to_dict(),
+            user_id=subscription.user_id,
+        ).save()
+
+    @staticmethod
+    def delete_subscription(subscription_pk):
+        JobAlertQueryDocument._get_connection().options(ignore_status=404).delete(
+            index=JobAlertQueryDocument._index._name, id=subscription_pk,
+        )
+
+    @staticmethod
+    def job_document(job):
+        """Document dùng để percolate (cùng tên field với mapping của job_alerts)"""
+        return {
+            'title': job.title,
+            'description': job.description,
+            'requirements': job.requirements,
+            'location': job.location,
+            'location_slugs': JobDocument().prepare_location_slugs(job),
+            'job_type': job.job_type,
+            'salary_max': job.salary_max,
+        }
+
+    @classmethod
+    def percolate(cls, job):
+        """
+        Tìm subscriber khớp với job, thêm job vào hàng đợi của họ
+
+        Returns:
+            int: số user mới được thêm job này vào hàng đợi
+        """
+        search = JobAlertQueryDocument.search().query(
+            'percolate', field='query', document=cls.job_document(job),
+        ).source(['user_id'])
+        user_pks = {hit.user_id for hit in search.scan()}
+        if not user_pks:
+            return 0
+
+        client = get_redis()
+        ttl = getattr(settings, 'JOB_ALERT_PENDING_TTL', 60 * 60 * 24 * 7)
+        notified_key = f"{cls.NOTIFIED_PREFIX}{job.pk}"
+
+        # SADD trả 1 nếu user chưa từng được xếp job này => chỉ những user đó mới thêm vào hàng đợi
+        pipe = client.pipeline(transaction=False)
+        ordered = sorted(user_pks)
+        for user_pk in ordered:
+            pipe.sadd(notified_key, user_pk)
+        pipe.expire(notified_key, ttl * 4)
+        added = [user_pk for user_pk, is_new in zip(ordered, pipe.execute()) if is_new]
+
+        published_at = job.created_at.timestamp() if job.created_at else time.time()
+        pipe = client.pipeline(transaction=False)
+        for user_pk in added:
+            pending_key = f"{cls.PENDING_PREFIX}{user_pk}"
+            pipe.zadd(pending_key, {job.pk: published_at})
+            pipe.expire(pending_key, ttl)
+        pipe.execute()
+        return len(added)
+
+    @classmethod
+    def pending_job_pks(cls, user_pks, limit=5):
+        """
+        Job đang chờ gửi của nhiều user trong 1 round-trip (mới nhất trước)
+
+        Returns:
+            {user_pk: [job_pk, ...]} chỉ gồm user có job chờ
+        """
+        pipe = get_redis().pipeline(transaction=False)
+        for user_pk in user_pks:
+            pipe.zrevrange(f"{cls.PENDING_PREFIX}{user_pk}", 0, limit - 1)
+        return {
+            user_pk: [int(pk) for pk in members]
+            for user_pk, members in zip(user_pks, pipe.execute())
+            if members
+        }
+
+    @classmethod
+    def clear_pending(cls, pending):
+        """
+        Bỏ khỏi hàng đợi đúng các job đã đọc cho digest (ZREM, không DEL cả key)
+        Job percolate vào giữa lúc đọc và lúc xóa, hay job vượt limit, còn lại cho digest sau
+
+        Args:
+            pending: {user_pk: [job_pk, ...]} như pending_job_pks trả về
+        """
+        if not pending:
+            return
+        pipe = get_redis().pipeline(transaction=False)
+        for user_pk, job_pks in pending.items():
+            pipe.zrem(f"{cls.PENDING_PREFIX}{user_pk}", *job_pks)
+        pipe.execute()
+
+
+class JobAlertRun:
+    """
+    Tiến độ 1 lần gửi digest (theo ngày): lô đã xong, số email đã gửi, số lô lỗi
+
+    Redis:
+        jobs:alerts:run:<run_id>       HASH  total/done/sent/failed/started_at/ranges (JSON)
+        jobs:alerts:run:<run_id>:done  SET   batch id ("low-high") đã xong
+    """
+
+    KEY_PREFIX = 'jobs:alerts:run:'
+    TTL = 60 * 60 * 24 * 3
+
+    @staticmethod
+    def batch_id(low, high):
+        return f"{low}-{high}"
+
+    @classmethod
+    def _keys(cls, run_id):
+        key = f"{cls.KEY_PREFIX}{run_id}"
+        return key, f"{key}:done"
+
+    @classmethod
+    def saved_ranges(cls, run_id):
+        """Danh sách khoảng (low, high] đã chốt của run, None nếu run chưa bắt đầu"""
+        raw = get_redis().hget(cls._keys(run_id)[0], 'ranges')
+        return [tuple(item) for item in json.loads(raw)] if raw else None
+
+    @classmethod
+    def start(cls, run_id, ranges):
+        """
+        Bắt đầu/chạy lại run, trả về danh sách khoảng của run
+
+        Lần đầu lưu `ranges`; chạy lại giữ nguyên danh sách đã lưu (batch id không đổi dù
+        tập subscriber đã thay đổi) - kể cả khi 2 dispatcher cùng start, chỉ 1 danh sách được dùng
+        """
+        key, done_key = cls._keys(run_id)
+        client = get_redis()
+        pipe = client.pipeline(transaction=True)
+        pipe.hsetnx(key, 'ranges', json.dumps(ranges))
+        pipe.hget(key, 'ranges')
+        pipe.hsetnx(key, 'started_at', time.time())  # Chạy lại giữ thời điểm bắt đầu lần đầu
+        pipe.hset(key, 'failed', 0)  # Lô lỗi lần trước sẽ được chạy lại
+        pipe.expire(key, cls.TTL)
+        pipe.expire(done_key, cls.TTL)
+        ranges = [tuple(item) for item in json.loads(pipe.execute()[1])]
+        client.hset(key, 'total', len(ranges))
+        return ranges
+
+    @classmethod
+    def done_batches(cls, run_id):
+        return get_redis().smembers(cls._keys(run_id)[1])
+
+    @classmethod
+    def is_done(cls, run_id, batch_id):
+        return bool(get_redis().sismember(cls._keys(run_id)[1], batch_id))
+
+    @classmethod
+    def mark_done(cls, run_id, batch_id, sent):
+        key, done_key = cls._keys(run_id)
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.sadd(done_key, batch_id)
+        pipe.hincrby(key, 'done', 1)
+        pipe.hincrby(key, 'sent', sent)
+        pipe.expire(done_key, cls.TTL)
+        pipe.execute()
+
+    @classmethod
+    def mark_failed(cls, run_id):
+        get_redis().hincrby(cls._keys(run_id)[0], 'failed', 1)
+
+    @classmethod
+    def progress(cls, run_id):
+        data = get_redis().hgetall(cls._keys(run_id)[0])
+        progress = {field: int(data.get(field, 0)) for field in ('total', 'done', 'sent', 'failed')}
+        progress['started_at'] = float(data['started_at']) if 'started_at' in data else None
+        return progress
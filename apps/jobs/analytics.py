@@ -0,0 +1,167 @@
+"""
+Job Analytics
+Số liệu theo ngày cho nhà tuyển dụng: lượt xem, đơn nộp, funnel trạng thái (PENDING -> VIEWED -> INTERVIEW -> ACCEPTED)
+
+WHY?
+- Tính tại chỗ từ Application.created_at + lịch sử trạng thái => quét cả bảng mỗi lần mở dashboard
+- Rollup sẵn theo (company, job, day) => khoảng N ngày chỉ đọc tối đa N bucket/job, không phụ thuộc số đơn
+
+HOW IT WORKS:
+- ApplicationStatusEvent: nộp đơn / đổi trạng thái ghi 1 dòng (append-only, signal cùng transaction)
+- JobDailyStats.views: JobViewCounter.apply_counts cộng delta lượt xem vào bucket hôm nay (cùng transaction flush)
+- Task rollup_job_daily_stats (5 phút/lần):
+    1. Lấy các cặp (job, ngày) có event mới từ lần chạy trước
+       (lùi thêm ROLLUP_OVERLAP: event của transaction commit muộn vẫn được tính)
+    2. Tính lại các cột đơn ứng tuyển của đúng các bucket đó từ event
+       => idempotent, chạy lại/chồng khoảng thời gian không cộng trùng
+    3. Upsert INSERT ... ON CONFLICT (job, day) DO UPDATE (không đụng cột views)
+- Báo cáo: SUM theo ngày trên index (company, day) / (job, day), ngày không có bucket điền 0
+
+USAGE:
+    from apps.jobs.analytics import JobAnalyticsService
+
+    JobAnalyticsService.rollup()  # Task định kỳ
+    JobAnalyticsService.report(owner_id, date(2026, 10, 1), date(2026, 10, 31), job_pk=None)
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.applications.models import Application, ApplicationStatusEvent
+from .models import Job, JobDailyStats
+
+# Cột tính lại từ ApplicationStatusEvent: (tên cột, điều kiện đếm)
+ROLLUP_COLUMNS = {
+    'applications': Q(from_status__isnull=True),
+    'viewed': Q(to_status=Application.Status.VIEWED),
+    'interview': Q(to_status=Application.Status.INTERVIEW),
+    'accepted': Q(to_status=Application.Status.ACCEPTED),
+    'rejected': Q(to_status=Application.Status.REJECTED),
+}
+SERIES_COLUMNS = ('views', *ROLLUP_COLUMNS)
+FUNNEL_STEPS = ('applications', 'viewed', 'interview', 'accepted')
+
+
+class JobAnalyticsService:
+    """Ghi / rollup / đọc JobDailyStats"""
+
+    ROLLED_UP_UNTIL_KEY = 'jobs:analytics:rolled_up_until'
+    ROLLUP_OVERLAP = timedelta(minutes=5)
+
+    @staticmethod
+    def record_views(counts):
+        """
+        Cộng lượt xem vừa flush vào bucket hôm nay (gọi trong transaction của JobViewCounter)
+
+        Args:
+            counts: {job pkid: số lượt xem}
+        """
+        if not counts:
+            return
+        day = timezone.localdate()
+        companies = dict(Job.all_objects.filter(pk__in=list(counts)).values_list('pk', 'company_id'))
+        if not companies:
+            return
+
+        # Tạo bucket còn thiếu trước (ignore_conflicts: task rollup có thể vừa tạo), rồi cộng bằng 1 câu UPDATE
+        JobDailyStats.objects.bulk_create(
+            [JobDailyStats(job_id=pk, company_id=company_id, day=day) for pk, company_id in companies.items()],
+            ignore_conflicts=True,
+        )
+        JobDailyStats.objects.filter(job_id__in=list(companies), day=day).update(
+            views=F('views') + Case(
+                *[When(job_id=pk, then=Value(counts[pk])) for pk in companies],
+                default=Value(0),
+            ),
+        )
+
+    @staticmethod
+    def compute_day(day, job_pks):
+        """Tính các cột đơn ứng tuyển của các job trong 1 ngày (giờ địa phương) từ event"""
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        events = ApplicationStatusEvent.objects.filter(
+            job_id__in=job_pks, created_at__gte=start, created_at__lt=start + timedelta(days=1),
+        )
+        rows = events.values('job_id').annotate(**{
+            # Nộp đơn: 1 event/đơn; chuyển trạng thái: đếm số đơn (đổi qua lại trong ngày chỉ tính 1)
+            column: Count('pk', filter=condition) if column == 'applications'
+            else Count('application_id', distinct=True, filter=condition)
+            for column, condition in ROLLUP_COLUMNS.items()
+        }).order_by()
+
+        companies = dict(Job.all_objects.filter(pk__in=job_pks).values_list('pk', 'company_id'))
+        return [
+            JobDailyStats(job_id=row['job_id'], company_id=companies[row['job_id']], day=day,
+                          **{column: row[column] for column in ROLLUP_COLUMNS})
+            for row in rows
+        ]
+
+    @classmethod
+    def rollup(cls, since=None):
+        """
+        Tính lại các bucket có event mới kể từ `since`
+        (mặc định: lần chạy trước - ROLLUP_OVERLAP; chưa chạy lần nào => JOB_ANALYTICS_ROLLUP_LOOKBACK_DAYS)
+
+        Returns:
+            int: số bucket đã upsert
+        """
+        now = timezone.now()
+        if since is None:
+            lookback = timedelta(days=getattr(settings, 'JOB_ANALYTICS_ROLLUP_LOOKBACK_DAYS', 2))
+            since = (cache.get(cls.ROLLED_UP_UNTIL_KEY) or now - lookback) - cls.ROLLUP_OVERLAP
+
+        dirty = (
+            ApplicationStatusEvent.objects.filter(created_at__gte=since, created_at__lt=now)
+            .annotate(day=TruncDate('created_at'))
+            .values_list('day', 'job_id')
+            .distinct()
+            .order_by()
+        )
+        jobs_by_day = {}
+        for day, job_pk in dirty:
+            jobs_by_day.setdefault(day, set()).add(job_pk)
+
+        rows = []
+        for day, job_pks in sorted(jobs_by_day.items()):
+            rows.extend(cls.compute_day(day, job_pks))
+        if rows:
+            JobDailyStats.objects.bulk_create(
+                rows, batch_size=500,
+                update_conflicts=True, unique_fields=['job', 'day'], update_fields=list(ROLLUP_COLUMNS),
+            )
+
+        cache.set(cls.ROLLED_UP_UNTIL_KEY, now, timeout=None)
+        return len(rows)
+
+    @staticmethod
+    def report(owner_id, start, end, job_pk=None):
+        """
+        Chuỗi số liệu theo ngày [start, end] + tổng + funnel của 1 nhà tuyển dụng (hoặc 1 job của họ)
+
+        Returns:
+            dict: {'series': [{'day', 'views', 'applications', ...}], 'totals': {...}, 'funnel': [{'step', 'count'}]}
+        """
+        buckets = JobDailyStats.objects.filter(company__owner_id=owner_id, day__range=(start, end))
+        if job_pk is not None:
+            buckets = buckets.filter(job_id=job_pk)
+        by_day = {
+            row.pop('day'): row
+            for row in buckets.values('day').annotate(**{c: Sum(c) for c in SERIES_COLUMNS}).order_by('day')
+        }
+
+        series = []
+        day = start
+        while day <= end:
+            series.append({'day': day, **by_day.get(day, dict.fromkeys(SERIES_COLUMNS, 0))})
+            day += timedelta(days=1)
+
+        totals = {column: sum(row[column] for row in series) for column in SERIES_COLUMNS}
+        return {
+            'series': series,
+            'totals': totals,
+            'funnel': [{'step': step, 'count': totals[step]} for step in FUNNEL_STEPS],
+        }
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.jobs'  # <--- BẮT BUỘC PHẢI CÓ 'apps.' ở trước
-    verbose_name = "Quản lý công việc"
\ No newline at end of file
+    verbose_name = "Quản lý công việc"
+
+    def ready(self):
+        """Import signals when app is ready"""
+        import apps.jobs.signals  # noqa
@@ -0,0 +1,249 @@
+"""
+Job Cache Layer
+- JobSearchCache: cache kết quả Elasticsearch theo "thế hệ" (generation) của index jobs
+- JobDetailCache: cache chi tiết job, invalidate theo tag job/company
+
+HOW IT WORKS:
+- Key = namespace + generation hiện tại + hash(query đã chuẩn hóa + filter)
+- Mỗi lần JobDocument được update -> generation += 1
+- Key của thế hệ cũ không bao giờ được đọc lại, tự hết hạn theo TTL
+  => Không cần enumerate/xóa key khi invalidate (O(1) invalidation)
+
+USAGE:
+    from apps.jobs.cache import JobSearchCache
+
+    page = JobSearchCache.get_or_set('search', {'q': 'python'}, lambda: run_es_query())
+    JobSearchCache.bump_generation()  # Gọi khi index thay đổi
+    JobSearchCache.stats()  # {'search': {'hits': 10, 'misses': 2, 'hit_ratio': 0.83}}
+
+    JobDetailCache.invalidate_job(job)  # Gọi khi Job thay đổi
+    JobCardCache.get_many(job_pks, loader)  # Job card theo pk (recommendations...)
+"""
+import hashlib
+import json
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.cache_tags import TaggedCache
+
+
+class JobSearchCache:
+    """Cache kết quả search/recommendation với invalidation theo generation"""
+
+    GENERATION_KEY = 'jobs:index_generation'
+    RESULT_PREFIX = 'jobs:search_result:'
+    STATS_PREFIX = 'jobs:search_cache_stats:'
+    NAMESPACES = ('search', 'recommendations')
+
+    @staticmethod
+    def normalize_query(text):
+        """
+        Chuẩn hóa từ khóa: Unicode NFC (tiếng Việt gõ tổ hợp/dựng sẵn như nhau),
+        lowercase, gộp khoảng trắng => "Kế  Toán" và "kế toán" dùng chung 1 key
+        """
+        return ' '.join(unicodedata.normalize('NFC', text or '').lower().split())
+
+    @classmethod
+    def get_generation(cls):
+        """Generation hiện tại của index jobs (khởi tạo = 1 nếu chưa có)"""
+        generation = cache.get(cls.GENERATION_KEY)
+        if generation is None:
+            cache.add(cls.GENERATION_KEY, 1, timeout=None)
+            generation = cache.get(cls.GENERATION_KEY, 1)
+        return generation
+
+    @classmethod
+    def bump_generation(cls):
+        """Invalidate toàn bộ kết quả đã cache (gọi khi JobDocument thay đổi)"""
+        try:
+            return cache.incr(cls.GENERATION_KEY)
+        except ValueError:
+            # Key chưa tồn tại (Redis restart / lần đầu)
+            cache.add(cls.GENERATION_KEY, 1, timeout=None)
+            return cache.incr(cls.GENERATION_KEY)
+
+    @classmethod
+    def make_key(cls, namespace, signature):
+        """Key = prefix + namespace + generation + sha1(signature JSON đã sort key)"""
+        raw = json.dumps(signature, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return f"{cls.RESULT_PREFIX}{namespace}:{cls.get_generation()}:{digest}"
+
+    @classmethod
+    def _record(cls, namespace, outcome):
+        """Tăng bộ đếm hit/miss (để đo hit ratio)"""
+        key = f"{cls.STATS_PREFIX}{namespace}:{outcome}"
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+
+    @classmethod
+    def get_or_set(cls, namespace, signature, compute):
+        """
+        Trả kết quả đã cache hoặc gọi compute() rồi cache lại
+
+        Args:
+            namespace: 'search' | 'recommendations'
+            signature: dict mô tả query (đã chuẩn hóa)
+            compute: callable chạy ES query, trả về giá trị JSON-serializable
+        """
+        if not getattr(settings, 'JOB_SEARCH_CACHE_ENABLED', True):
+            return compute()
+
+        key = cls.make_key(namespace, signature)
+        cached = cache.get(key)
+        if cached is not None:
+            cls._record(namespace, 'hits')
+            return cached
+
+        cls._record(namespace, 'misses')
+        value = compute()
+        cache.set(key, value, getattr(settings, 'JOB_SEARCH_CACHE_TTL', 300))
+        return value
+
+    @classmethod
+    def stats(cls):
+        """Hit/miss và hit ratio theo namespace"""
+        result = {}
+        for namespace in cls.NAMESPACES:
+            hits = cache.get(f"{cls.STATS_PREFIX}{namespace}:hits", 0)
+            misses = cache.get(f"{cls.STATS_PREFIX}{namespace}:misses", 0)
+            total = hits + misses
+            result[namespace] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / total, 4) if total else 0.0,
+            }
+        return result
+
+    @classmethod
+    def reset_stats(cls):
+        """Reset bộ đếm (ví dụ khi bắt đầu đo sau deploy)"""
+        cache.delete_many([
+            f"{cls.STATS_PREFIX}{namespace}:{outcome}"
+            for namespace in cls.NAMESPACES
+            for outcome in ('hits', 'misses')
+        ])
+
+
+def job_tag(job_pk):
+    return f"job:{job_pk}"
+
+
+def company_tag(company_pk):
+    return f"company:{company_pk}"
+
+
+class JobDetailCache:
+    """
+    Cache response chi tiết job (per-job entry, không phải cache_page theo URL)
+
+    Tags: 'job:<pk>' và 'company:<pk>' => Job save/soft delete và Company update
+    invalidate đúng entry liên quan, nên TTL có thể tính bằng giờ.
+    """
+
+    KEY_PREFIX = 'jobs:detail:'
+
+    @classmethod
+    def make_key(cls, lookup_value):
+        """Key theo giá trị lookup trên URL (pk hoặc slug tùy lookup_field)"""
+        return f"{cls.KEY_PREFIX}{lookup_value}"
+
+    @classmethod
+    def get(cls, lookup_value):
+        """Trả {'pk': job pk, 'data': response data, 'digest': hash của data} hoặc None"""
+        entry = TaggedCache.get(cls.make_key(lookup_value))
+        if entry is not None and 'digest' not in entry:  # Entry ghi trước khi có digest
+            entry['digest'] = cls.digest(entry['data'])
+        return entry
+
+    @staticmethod
+    def digest(data):
+        """Hash nội dung (ETag của response chi tiết - apps/core/conditional.py)"""
+        raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def tag_versions(job_pk, company_pk):
+        """Snapshot version tag của job, đọc TRƯỚC khi load job rồi truyền vào set()"""
+        return TaggedCache.get_tag_versions([job_tag(job_pk), company_tag(company_pk)])
+
+    @classmethod
+    def set(cls, lookup_value, job, data, versions=None):
+        """
+        Ghi entry và trả lại entry (cùng format với get())
+
+        Args:
+            versions: tag_versions() đọc trước khi load job => Job/Company save trong lúc
+                query + serialize làm entry hết hiệu lực ngay, không bị giữ bản cũ tới hết TTL
+        """
+        # Lưu kèm pk để cache hit vẫn đếm được lượt xem mà không query DB
+        entry = {'pk': job.pk, 'data': data, 'digest': cls.digest(data)}
+        TaggedCache.set(
+            cls.make_key(lookup_value),
+            entry,
+            tags=[job_tag(job.pk), company_tag(job.company_id)],
+            timeout=getattr(settings, 'JOB_DETAIL_CACHE_TTL', 60 * 60 * 6),
+            versions=versions,
+        )
+        return entry
+
+    @classmethod
+    def invalidate_job(cls, job_or_pk):
+        job_pk = getattr(job_or_pk, 'pk', job_or_pk)
+        TaggedCache.invalidate_tags(job_tag(job_pk))
+
+    @classmethod
+    def invalidate_jobs(cls, job_pks):
+        """Invalidate nhiều job (dùng cho bulk update bằng queryset - không có signal)"""
+        TaggedCache.invalidate_tags(*[job_tag(pk) for pk in job_pks])
+
+    @classmethod
+    def invalidate_company(cls, company_or_pk):
+        company_pk = getattr(company_or_pk, 'pk', company_or_pk)
+        TaggedCache.invalidate_tags(company_tag(company_pk))
+
+
+class JobCardCache:
+    """
+    Kho job card (JobSerializer data) theo pk, dùng chung tag với JobDetailCache
+    => Job/Company thay đổi tự invalidate qua signals sẵn có
+
+    Danh sách (recommendations...) chỉ lưu pk; card hydrate bằng 1 get_many,
+    job miss mới query DB (1 query cho cả batch).
+    """
+
+    KEY_PREFIX = 'jobs:card:'
+
+    @classmethod
+    def make_key(cls, job_pk):
+        return f"{cls.KEY_PREFIX}{job_pk}"
+
+    @classmethod
+    def get_many(cls, job_pks, loader):
+        """
+        Args:
+            job_pks: list pk cần lấy card
+            loader: callable(missing_pks) -> list[(job, card_data)] cho các pk miss
+
+        Returns:
+            {pk: card_data} (pk không load được thì không có trong dict)
+        """
+        keys = {cls.make_key(pk): pk for pk in job_pks}
+        cards = {keys[key]: value for key, value in TaggedCache.get_many(keys).items()}
+
+        missing = [pk for pk in job_pks if pk not in cards]
+        if missing:
+            timeout = getattr(settings, 'JOB_DETAIL_CACHE_TTL', 60 * 60 * 6)
+            for job, data in loader(missing):
+                TaggedCache.set(
+                    cls.make_key(job.pk), data,
+                    tags=[job_tag(job.pk), company_tag(job.company_id)],
+                    timeout=timeout,
+                )
+                cards[job.pk] = data
+        return cards
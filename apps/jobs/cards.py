@@ -0,0 +1,131 @@
+"""
+Job Card Snapshot
+Job card (tiêu đề, công ty, địa điểm, lương, hạn nộp, slug...) render sẵn thành JSON, lưu ở cột Job.card
+
+WHY?
+- Cùng 1 job card được dựng lại từ ORM ở mọi nơi: list job, search, email job alert, job đã lưu, đơn ứng tuyển
+  => mỗi lần JOIN company + serialize từng field, trong khi card chỉ đổi khi job/công ty được sửa
+- Snapshot: đọc 1 cột JSON (không JOIN company, không đọc cột TEXT lớn), không chạy serializer
+
+HOW IT WORKS:
+- build(job): output job card của JobSerializer (list mặc định, JOB_CARD_FIELDS) trừ live_fields,
+  logo công ty lưu URL tương đối (render() mới thêm domain theo request)
+- live_fields (status, views_count, is_deleted): đổi thường xuyên / bằng queryset.update() (counter flush,
+  đóng job hết hạn, xóa mềm) => không lưu trong snapshot, luôn đọc từ cột và ghép vào khi render
+- Làm mới:
+    * Job.save(): field trên card đổi (save(update_fields) chỉ đổi views_count/status... thì bỏ qua)
+    * Company đổi tên/slug/logo: signal render lại card của mọi job của công ty (bulk_update card + updated_at theo lô)
+    * Card rỗng (job tạo bằng bulk_create, dữ liệu trước migration): load() dựng + lưu lại khi có người đọc
+- Nơi đọc: list job / job đã lưu (FieldPlan), đơn ứng tuyển (DynamicFieldsMixin), search Postgres/memory,
+  `_source` của Elasticsearch (JobDocument.card), email job alert
+
+USAGE:
+    from apps.jobs.cards import JobCardSnapshot
+
+    JobCardSnapshot.render(job.card, request, job)   # dict card đầy đủ (kèm live_fields)
+    JobCardSnapshot.load([job_pk, ...])              # {pk: card} (dựng card còn thiếu)
+    JobCardSnapshot.refresh_company(company_pk)      # Công ty đổi logo/tên
+"""
+from django.utils import timezone
+
+from apps.core.fieldsets import parse_field_paths
+from .models import Job
+
+
+class JobCardSnapshot:
+    """Build / làm mới / render job card lưu trong cột Job.card"""
+
+    column = 'card'
+    # Đọc trực tiếp từ cột khi render (không nằm trong snapshot)
+    live_fields = ('status', 'views_count', 'is_deleted')
+    # Field của Job mà snapshot phụ thuộc (save(update_fields) không đụng tới => khỏi render lại)
+    SOURCE_FIELDS = frozenset({
+        'slug', 'title', 'location', 'job_type', 'salary_min', 'salary_max', 'is_negotiable', 'deadline', 'company',
+    })
+    BATCH_SIZE = 500
+
+    @classmethod
+    def build(cls, job):
+        """Card (chưa có live_fields) của 1 job - cần job.company"""
+        from .serializers import JOB_CARD_FIELDS, JobSerializer
+
+        # Chọn field tường minh (không phải mặc định của list) => serializer không tự đọc lại snapshot
+        selection = {
+            'only': parse_field_paths([field for field in JOB_CARD_FIELDS if field not in cls.live_fields]),
+            'expand': {},
+            'compact': True,
+        }
+        return dict(JobSerializer(job, context={'field_selection': selection}).data)
+
+    @classmethod
+    def render(cls, card, request=None, live=None):
+        """
+        Card để trả cho client: copy snapshot + live_fields, logo thành URL tuyệt đối nếu có request
+
+        Args:
+            live: object (Job / Row của values_list) hoặc dict chứa live_fields
+        """
+        data = dict(card)
+        company = data.get('company_info')
+        if company and request is not None and company.get('logo') and not company['logo'].startswith('http'):
+            data['company_info'] = {**company, 'logo': request.build_absolute_uri(company['logo'])}
+        if live is not None:
+            get = live.get if isinstance(live, dict) else (lambda name: getattr(live, name))
+            for name in cls.live_fields:
+                data[name] = get(name)
+        return data
+
+    @classmethod
+    def save_cards(cls, jobs, touch=False):
+        """
+        Build + ghi card cho các job (đã select_related company)
+
+        Args:
+            touch: nội dung card đổi => cập nhật cả updated_at (ETag của list job, apps/core/conditional.py)
+        """
+        fields = ['card']
+        now = timezone.now()
+        for job in jobs:
+            job.card = cls.build(job)
+            if touch:
+                job.updated_at = now
+        if touch:
+            fields.append('updated_at')
+        Job.all_objects.bulk_update(jobs, fields, batch_size=cls.BATCH_SIZE)
+        return jobs
+
+    @classmethod
+    def load(cls, job_pks):
+        """{pk: card} - card còn thiếu thì dựng và lưu luôn (lần đọc sau chỉ còn đọc cột)"""
+        cards = dict(Job.all_objects.filter(pk__in=job_pks).values_list('pk', cls.column))
+        missing = [pk for pk, card in cards.items() if not card]
+        if missing:
+            jobs = list(Job.all_objects.filter(pk__in=missing).select_related('company'))
+            cards.update({job.pk: job.card for job in cls.save_cards(jobs)})
+        return cards
+
+    @classmethod
+    def refresh_company(cls, company_pk):
+        """Render lại card của mọi job (kể cả đã xóa mềm) của 1 công ty, theo lô"""
+        queryset = Job.all_objects.filter(company_id=company_pk).select_related('company').order_by('pk')
+        refreshed, last_pk = 0, None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            jobs = list(batch[:cls.BATCH_SIZE])
+            if not jobs:
+                return refreshed
+            cls.save_cards(jobs, touch=True)
+            refreshed += len(jobs)
+            last_pk = jobs[-1].pk
+
+    @classmethod
+    def backfill(cls, batch_size=None):
+        """Dựng card cho mọi job chưa có (sau migration / import bằng bulk_create) - python manage.py build_job_cards"""
+        queryset = Job.all_objects.filter(card__isnull=True).select_related('company')
+        total = 0
+        while True:
+            jobs = list(queryset.order_by('pk')[:batch_size or cls.BATCH_SIZE])
+            if not jobs:
+                return total
+            cls.save_cards(jobs)
+            total += len(jobs)
@@ -0,0 +1,212 @@
+"""
+Job View Counter
+Đếm lượt xem job qua buffer Redis, flush định kỳ xuống Postgres + Elasticsearch
+
+WHY?
+- UPDATE views_count = views_count + 1 mỗi lượt xem => row lock trên job hot,
+  các request xem cùng job phải xếp hàng chờ nhau
+- HINCRBY trên Redis là O(1), không đụng DB => request detail không còn ghi DB
+
+HOW IT WORKS:
+- record(): HINCRBY jobs:views:pending <pkid> 1
+- flush() (Celery beat, mỗi phút), giữ lock Redis (SET NX EX) suốt lần flush => không có 2 flush chồng nhau:
+    1. RENAME pending -> flushing (atomic: lượt xem mới ghi vào hash pending mới),
+       gắn batch id cho hash flushing (HSETNX field __batch__)
+    2. 1 câu UPDATE ... FROM (VALUES ...) RETURNING cho cả batch
+       (+ cộng total_views của RecruiterStats, views của bucket JobDailyStats hôm nay)
+       + ghi JobViewFlushBatch(batch id) trong cùng transaction
+    3. DEL flushing + invalidate JobDetailCache của các job vừa cộng
+       (views_count trong bản cache chi tiết và ETag tính từ nó không bị đứng tới hết TTL)
+    4. 1 request ES _bulk partial update (chỉ field views_count)
+- Nếu lần flush trước chết giữa chừng, hash flushing còn lại sẽ được xử lý trước:
+    * chết trước khi commit DB => áp dụng lại bình thường
+    * chết sau commit, trước DEL => batch id đã có JobViewFlushBatch => bỏ qua, chỉ DEL (không cộng 2 lần)
+- Lock hết hạn giữa 1 lần flush quá chậm => 2 flush có thể cùng đọc 1 hash flushing,
+  batch id (unique) vẫn bảo đảm chỉ 1 lần được commit
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django_elasticsearch_dsl.apps import DEDConfig
+
+from apps.companies.stats import RecruiterStatsService
+from apps.core.redis_client import get_redis
+from .analytics import JobAnalyticsService
+from .cache import JobDetailCache
+from .models import Job, JobViewFlushBatch
+
+logger = logging.getLogger(__name__)
+
+
+class JobViewCounter:
+    """Buffer lượt xem job trên Redis"""
+
+    PENDING_KEY = 'jobs:views:pending'
+    FLUSHING_KEY = 'jobs:views:flushing'
+    LOCK_KEY = 'jobs:views:flush_lock'
+    BATCH_FIELD = '__batch__'  # Field trong hash flushing chứa batch id
+
+    @classmethod
+    def record(cls, job_pk):
+        """Ghi nhận 1 lượt xem (lỗi Redis không được làm hỏng request xem job)"""
+        try:
+            get_redis().hincrby(cls.PENDING_KEY, str(job_pk), 1)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to record view for job {job_pk}: {e}")
+
+    @classmethod
+    def _claim_pending(cls):
+        """Chuyển hash pending sang flushing (gọi khi đang giữ lock), trả về (batch id, {pkid: delta})"""
+        client = get_redis()
+        if not client.exists(cls.FLUSHING_KEY):
+            try:
+                client.rename(cls.PENDING_KEY, cls.FLUSHING_KEY)
+            except redis.ResponseError:
+                # Không có lượt xem nào kể từ lần flush trước
+                return None, {}
+        # HSETNX: hash flushing còn sót từ lần trước giữ nguyên batch id cũ
+        client.hsetnx(cls.FLUSHING_KEY, cls.BATCH_FIELD, uuid.uuid4().hex)
+        data = client.hgetall(cls.FLUSHING_KEY)
+        batch_id = data.pop(cls.BATCH_FIELD)
+        return batch_id, {int(pk): int(delta) for pk, delta in data.items()}
+
+    @staticmethod
+    def apply_counts(counts, batch_id=None):
+        """
+        Cộng dồn lượt xem vào DB
+
+        Args:
+            counts: {job pkid: số lượt xem cần cộng thêm}
+            batch_id: id của lô; lô đã áp dụng (JobViewFlushBatch) => không cộng lại
+
+        Returns:
+            list[(pkid, views_count mới)]
+        """
+        if not counts:
+            return []
+
+        batch_size = getattr(settings, 'JOB_VIEW_FLUSH_BATCH_SIZE', 1000)
+        items = sorted(counts.items())  # Sort pkid => lock row theo thứ tự cố định, tránh deadlock
+        updated = []
+
+        try:
+            with transaction.atomic():
+                if batch_id is not None:
+                    # batch_id unique: lô đã commit (hoặc flush khác vừa commit) => IntegrityError, rollback cả lô
+                    JobViewFlushBatch.objects.create(batch_id=batch_id)
+
+                for i in range(0, len(items), batch_size):
+                    batch = items[i:i + batch_size]
+                    JobAnalyticsService.record_views(dict(batch))
+
+                    if connection.vendor != 'postgresql':
+                        # Fallback (sqlite khi dev/test): update từng row
+                        for pk, delta in batch:
+                            Job.all_objects.filter(pk=pk).update(views_count=F('views_count') + delta)
+                        updated.extend(
+                            Job.all_objects.filter(pk__in=[pk for pk, _ in batch])
+                            .values_list('pk', 'views_count')
+                        )
+                        continue
+
+                    values = ', '.join(['(%s::bigint, %s::integer)'] * len(batch))
+                    params = [value for item in batch for value in item]
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            f"""
+                            UPDATE {Job._meta.db_table} AS j
+                            SET views_count = j.views_count + v.delta
+                            FROM (VALUES {values}) AS v(pkid, delta)
+                            WHERE j.pkid = v.pkid
+                            RETURNING j.pkid, j.views_count
+                            """,
+                            params,
+                        )
+                        updated.extend(cursor.fetchall())
+
+                # Cùng transaction: tổng lượt xem trên dashboard recruiter không lệch với views_count
+                RecruiterStatsService.add_views(counts)
+        except IntegrityError:
+            if batch_id is None or not JobViewFlushBatch.objects.filter(batch_id=batch_id).exists():
+                raise
+            logger.info(f"View count batch {batch_id} was already applied, skipping")
+            # Vẫn trả giá trị hiện tại để sync ES (lần trước có thể chết trước bước ES)
+            return list(Job.all_objects.filter(pk__in=list(counts)).values_list('pk', 'views_count'))
+
+        return updated
+
+    @staticmethod
+    def prune_batches():
+        """Xóa đánh dấu lô cũ (hash flushing không tồn tại lâu hơn vài phút)"""
+        days = getattr(settings, 'JOB_VIEW_FLUSH_MARKER_DAYS', 7)
+        JobViewFlushBatch.objects.filter(applied_at__lt=timezone.now() - timedelta(days=days)).delete()
+
+    @staticmethod
+    def sync_search_index(rows):
+        """Partial update views_count trên ES bằng 1 request _bulk (không reindex cả document)"""
+        if not rows or not DEDConfig.autosync_enabled():
+            return 0
+
+        from elasticsearch.helpers import bulk
+        from .documents import JobDocument
+
+        index_name = JobDocument._index._name
+        actions = (
+            {
+                '_op_type': 'update',
+                '_index': index_name,
+                '_id': pk,
+                'doc': {'views_count': views_count},
+            }
+            for pk, views_count in rows
+        )
+        # Job chưa có trong index (DRAFT/lỗi sync) => 404, bỏ qua thay vì fail cả batch
+        success, errors = bulk(
+            JobDocument._get_connection(), actions,
+            raise_on_error=False, stats_only=True,
+        )
+        if errors:
+            logger.warning(f"View count sync: {errors} documents failed to update in Elasticsearch")
+        return success
+
+    @classmethod
+    def flush(cls):
+        """Flush buffer xuống DB + ES, trả về số job đã cập nhật (flush khác đang chạy => 0)"""
+        client = get_redis()
+        lock = client.lock(
+            cls.LOCK_KEY, timeout=getattr(settings, 'JOB_VIEW_FLUSH_LOCK_TIMEOUT', 300), blocking=False,
+        )
+        if not lock.acquire():
+            logger.info("View count flush already running, skipping")
+            return 0
+        try:
+            batch_id, counts = cls._claim_pending()
+            if not counts:
+                if batch_id is not None:
+                    client.delete(cls.FLUSHING_KEY)
+                return 0
+            rows = cls.apply_counts(counts, batch_id=batch_id)
+            # DB đã commit => xóa buffer ngay, tránh cộng 2 lần nếu bước ES lỗi
+            client.delete(cls.FLUSHING_KEY)
+            JobDetailCache.invalidate_jobs([pk for pk, _ in rows])
+            cls.prune_batches()
+        finally:
+            try:
+                lock.release()
+            except redis.exceptions.LockError:
+                # Lock đã hết hạn (flush quá chậm): batch id vẫn chặn việc cộng 2 lần
+                logger.warning("View count flush lock expired before release")
+
+        try:
+            cls.sync_search_index(rows)
+        except Exception as e:
+            # views_count trên ES sẽ đúng lại ở lần flush/reindex sau
+            logger.error(f"Failed to sync view counts to Elasticsearch: {e}")
+
+        return len(rows)
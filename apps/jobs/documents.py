@@ -1,16 +1,43 @@
 # apps/jobs/documents.py
 
+from django.conf import settings
+import elasticsearch_dsl as dsl
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
+from apps.companies.models import Company
+from .cache import JobSearchCache
+from .cards import JobCardSnapshot
 from .models import Job
 
+
+# Context dùng cho autocomplete (completion suggester)
+# ES OR các context với nhau => gộp mọi filter vào 1 context 'scope' dạng tổ hợp
+# để query 1 giá trị duy nhất mà vẫn lọc đúng (live + job_type + location)
+SUGGEST_SCOPE_LIVE = 'live'
+SUGGEST_SCOPE_HIDDEN = 'hidden'
+# Số từ đầu tiêu đề được bỏ để gợi ý theo từ giữa câu ("dev" -> "Python Developer")
+SUGGEST_MAX_WORD_OFFSETS = 3
+
+
+def suggest_scope(job_type=None, location=None):
+    """Build giá trị context 'scope' cho 1 tổ hợp filter (dùng khi index lẫn khi query)"""
+    parts = [SUGGEST_SCOPE_LIVE]
+    if job_type:
+        parts.append(f"type:{job_type}")
+    if location:
+        parts.append(f"loc:{' '.join(location.lower().split())}")
+    return '|'.join(parts)
+
+
 @registry.register_document
 class JobDocument(Document):
     # Index thông tin Company để tìm kiếm (Nested Field)
+    # Denormalized đủ để render job card trực tiếp từ `_source` (không cần JOIN Postgres)
     company = fields.ObjectField(properties={
         'name': fields.TextField(),
-        'id': fields.IntegerField(),
+        'id': fields.KeywordField(),  # UUID - không phải integer
         'slug': fields.KeywordField(),
+        'logo': fields.KeywordField(index=False),  # Chỉ để hiển thị, không search
     })
 
     # Các trường Text hỗ trợ tìm kiếm mờ (fuzzy), đồng nghĩa...
@@ -21,14 +48,29 @@ class JobDocument(Document):
             'suggest': fields.CompletionField(), # Để làm tính năng Auto-complete
         }
     )
+    # Completion có context: lọc job đã đóng/xóa + job_type/location ngay trong suggester
+    # (`title.suggest` không có context nên không lọc được status)
+    suggest = fields.CompletionField(contexts=[
+        {'name': 'scope', 'type': 'category'},
+    ])
     description = fields.TextField()
     requirements = fields.TextField()
-    location = fields.TextField()
+    location = fields.TextField(
+        fields={
+            'raw': fields.KeywordField(),  # Filter chính xác + terms aggregation (facet)
+        }
+    )
+    # Địa điểm chuẩn hóa (Job.location_ref): slug của địa điểm + tỉnh cha => lọc theo tỉnh khớp cả quận
+    location_slugs = fields.KeywordField(multi=True)
+    geo = fields.GeoPointField()  # Tọa độ địa điểm, cho ?near=lat,lon&radius=
     
     # Các trường Filter
     job_type = fields.KeywordField()
     status = fields.KeywordField()
+    salary_min = fields.IntegerField()
     salary_max = fields.IntegerField()
+    is_negotiable = fields.BooleanField()
+    deadline = fields.DateField()
     created_at = fields.DateField()
     views_count = fields.IntegerField()
     
@@ -36,13 +78,17 @@ class JobDocument(Document):
     # Lọc ở search thay vì queryset để ES có thể xóa record khi soft delete
     is_deleted = fields.BooleanField()
 
+    # Job card render sẵn (Job.card, apps/jobs/cards.py): chỉ lưu trong `_source`, không index
+    card = fields.ObjectField(enabled=False)
+
     class Index:
-        # Tên index trong Elasticsearch
+        # Tên alias trong Elasticsearch, trỏ tới index thật `jobs_v{n}`
+        # (build index mới + swap alias: python manage.py reindex_jobs)
         name = 'jobs'
         # Cấu hình replicas/shards (tùy chọn)
         settings = {
-            'number_of_shards': 1,
-            'number_of_replicas': 0
+            'number_of_shards': getattr(settings, 'ES_JOBS_INDEX_SHARDS', 1),
+            'number_of_replicas': getattr(settings, 'ES_JOBS_INDEX_REPLICAS', 0),
         }
 
     class Django:
@@ -55,6 +101,9 @@ class JobDocument(Document):
         ]
         
         queryset_pagination = 10000
+
+        # Company đổi tên/logo -> cập nhật lại các job card trong index
+        related_models = [Company]
         
         # CRITICAL FIX #1: Phải dùng all_objects để ES có thể update/delete soft-deleted jobs
         # Nếu dùng default manager (SoftDeleteManager), khi job.delete() được gọi:
@@ -67,4 +116,109 @@ class JobDocument(Document):
             return self.model.all_objects.all()
         
         # Tự động cập nhật ES khi model thay đổi
-        # ignore_signals = True # Bật lên nếu muốn update thủ công bằng Cronjob để tối ưu write DB
\ No newline at end of file
+        # ignore_signals = True # Bật lên nếu muốn update thủ công bằng Cronjob để tối ưu write DB
+
+    def update(self, thing, refresh=None, action='index', parallel=False, **kwargs):
+        """
+        Mọi thay đổi index (signal, rebuild) đi qua đây
+        => tăng generation để cache kết quả search cũ tự hết hiệu lực
+        """
+        result = super().update(thing, refresh=refresh, action=action, parallel=parallel, **kwargs)
+        JobSearchCache.bump_generation()
+        return result
+
+    def get_queryset(self):
+        """
+        Queryset dùng khi rebuild index.
+        Document.get_queryset() mặc định dùng _default_manager (SoftDeleteManager)
+        nên phải override ở đây (hàm trong class Django không được thư viện đọc).
+        select_related company/location để prepare_* không sinh N+1.
+        """
+        return self.django.model.all_objects.select_related('company', 'location_ref__parent')
+
+    def get_instances_from_related(self, related_instance):
+        """Company thay đổi -> trả về các Job (kể cả đã xóa mềm) cần reindex"""
+        if isinstance(related_instance, Company):
+            return Job.all_objects.filter(company=related_instance).select_related(
+                'company', 'location_ref__parent',
+            )
+
+    def prepare_location_slugs(self, instance):
+        location = instance.location_ref
+        if location is None:
+            return []
+        return [location.slug] + ([location.parent.slug] if location.parent_id else [])
+
+    def prepare_geo(self, instance):
+        """Tọa độ của địa điểm; quận chưa có tọa độ thì lấy của tỉnh"""
+        location = instance.location_ref
+        while location is not None and location.latitude is None:
+            location = location.parent
+        if location is None:
+            return None
+        return {'lat': location.latitude, 'lon': location.longitude}
+
+    def prepare_suggest(self, instance):
+        """
+        Input: tiêu đề + các hậu tố theo từ để match prefix giữa câu
+        Weight: views_count để job phổ biến lên trước
+        """
+        words = instance.title.split()
+        inputs = [' '.join(words[i:]) for i in range(min(len(words), SUGGEST_MAX_WORD_OFFSETS + 1))]
+
+        if instance.status == Job.Status.PUBLISHED and not instance.is_deleted:
+            scopes = [
+                suggest_scope(),
+                suggest_scope(job_type=instance.job_type),
+                suggest_scope(location=instance.location),
+                suggest_scope(job_type=instance.job_type, location=instance.location),
+            ]
+        else:
+            scopes = [SUGGEST_SCOPE_HIDDEN]
+
+        return {
+            'input': inputs or [instance.title],
+            'weight': min(instance.views_count or 0, 2 ** 31 - 1),
+            'contexts': {'scope': scopes},
+        }
+
+    def prepare_card(self, instance):
+        return instance.card or JobCardSnapshot.build(instance)
+
+    def prepare_company(self, instance):
+        """Company block dùng cho cả search (`company.name`) và job card (`_source`)"""
+        company = instance.company
+        if company is None:
+            return {}
+        return {
+            'id': str(company.id),
+            'name': company.name,
+            'slug': company.slug,
+            'logo': company.logo.url if company.logo else None,
+        }
+
+class JobAlertQueryDocument(dsl.Document):
+    """
+    Percolator index cho JobAlertSubscription (không qua registry của django_elasticsearch_dsl:
+    thư viện không có PercolatorField và document này không map 1-1 với field của model)
+
+    Index lưu query của subscription; các field mà query tham chiếu phải được map
+    giống JobDocument để percolate (job -> danh sách subscription khớp).
+    """
+    query = dsl.Percolator()
+    user_id = dsl.Long()
+
+    title = dsl.Text()
+    description = dsl.Text()
+    requirements = dsl.Text()
+    location = dsl.Text(fields={'raw': dsl.Keyword()})
+    location_slugs = dsl.Keyword(multi=True)
+    job_type = dsl.Keyword()
+    salary_max = dsl.Integer()
+
+    class Index:
+        name = 'job_alerts'
+        settings = {
+            'number_of_shards': 1,
+            'number_of_replicas': getattr(settings, 'ES_JOBS_INDEX_REPLICAS', 0),
+        }
@@ -0,0 +1,149 @@
+"""
+Job Expiry
+Tự động đóng job PUBLISHED đã quá hạn nộp hồ sơ (deadline < hôm nay)
+
+HOW IT WORKS:
+- Mỗi lô: SELECT pk ... FOR UPDATE SKIP LOCKED LIMIT n rồi 1 câu UPDATE status='CLOSED'
+  (set-based, lô có giới hạn => lock ngắn, không ôm cả bảng trong 1 transaction)
+  + trừ active_jobs của RecruiterStats trong cùng transaction
+  + notification cho recruiter trong cùng transaction: 1 notification / công ty / lô, tổng hợp các job vừa đóng
+    => job đã đóng (đã commit) luôn được báo, kể cả khi lô sau, bước ES hay lần retry của task lỗi
+- Sau mỗi lô: partial update `status` trên ES bằng 1 request _bulk + invalidate cache chi tiết/card
+  (queryset.update() không bắn signal nên phải tự đồng bộ)
+
+USAGE:
+    from apps.jobs.expiry import JobExpiryService
+
+    JobExpiryService.close_expired()  # {'closed': 120, 'recruiters': 8}
+"""
+import logging
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from django_elasticsearch_dsl.apps import DEDConfig
+
+from apps.companies.models import Company
+from apps.companies.stats import RecruiterStatsService
+from apps.notifications.models import Notification
+from .cache import JobDetailCache, JobSearchCache
+from .models import Job
+from .signal_processors import JobIndexQueue
+
+logger = logging.getLogger(__name__)
+
+# Số tiêu đề job liệt kê trong notification (còn lại gộp thành "+N")
+NOTIFICATION_MAX_TITLES = 5
+
+
+class JobExpiryService:
+    """Đóng job hết hạn theo lô + đồng bộ ES/cache + thông báo recruiter"""
+
+    @classmethod
+    def close_batch(cls, today, batch_size):
+        """
+        Đóng tối đa batch_size job hết hạn (+ notification cho recruiter) trong 1 transaction
+
+        Returns:
+            list[dict]: {'pk', 'title', 'company_uuid', 'owner_id'} của các job vừa đóng
+        """
+        with transaction.atomic():
+            rows = list(
+                Job.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(status=Job.Status.PUBLISHED, deadline__lt=today)
+                .order_by('pkid')
+                .values('pk', 'title', company_uuid=F('company__id'), owner_id=F('company__owner_id'))
+                [:batch_size]
+            )
+            if rows:
+                Job.objects.filter(pk__in=[row['pk'] for row in rows]).update(
+                    status=Job.Status.CLOSED, updated_at=timezone.now(),
+                )
+                # queryset.update() không bắn signal => tự trừ active_jobs trên dashboard recruiter
+                closed_by_owner = Counter(row['owner_id'] for row in rows)
+                RecruiterStatsService.apply({
+                    owner_id: {'active_jobs': -count} for owner_id, count in closed_by_owner.items()
+                })
+                # Cuối transaction: lỗi ở bước trước => không có notification cho job chưa đóng
+                cls.notify_recruiters(rows)
+        return rows
+
+    @staticmethod
+    def sync_search_index(job_pks):
+        """Partial update status (+ suggest context) trên ES; ES lỗi => để hàng đợi index retry"""
+        if not DEDConfig.autosync_enabled():
+            return
+
+        from elasticsearch.helpers import bulk
+        from .documents import JobDocument
+
+        try:
+            success, errors = bulk(
+                JobDocument._get_connection(),
+                JobIndexQueue.build_actions(set(), set(job_pks), set()),
+                raise_on_error=False, stats_only=True,
+            )
+            if errors:
+                logger.warning(f"Expired jobs: {errors} documents failed to update in Elasticsearch")
+        except Exception as e:
+            logger.warning(f"Expired jobs: Elasticsearch sync failed ({e}), queued for the index flush")
+            for job_pk in job_pks:
+                JobIndexQueue.enqueue(JobIndexQueue.PARTIAL_KEY, job_pk)
+
+    @staticmethod
+    def notify_recruiters(rows):
+        """
+        1 notification cho mỗi công ty (gửi chủ công ty) có job vừa đóng, trỏ tới chính công ty đó
+
+        Args:
+            rows: các job vừa đóng (như close_batch trả về)
+        """
+        company_type = ContentType.objects.get_for_model(Company)
+        closed_by_company = {}
+        for row in rows:
+            closed_by_company.setdefault((row['owner_id'], row['company_uuid']), []).append(row)
+
+        for (owner_id, company_uuid), rows in closed_by_company.items():
+            titles = [row['title'] for row in rows[:NOTIFICATION_MAX_TITLES]]
+            if len(rows) > NOTIFICATION_MAX_TITLES:
+                titles.append(f"+{len(rows) - NOTIFICATION_MAX_TITLES}")
+            # create() từng cái (không bulk_create) để signal đẩy notification qua WebSocket
+            Notification.objects.create(
+                recipient_id=owner_id,
+                verb=_("closed expired jobs"),
+                description=_("{count} job postings passed their deadline and were closed: {titles}").format(
+                    count=len(rows), titles=', '.join(titles),
+                ),
+                content_type=company_type,
+                object_id=company_uuid,
+            )
+
+    @classmethod
+    def close_expired(cls, batch_size=None):
+        """Đóng mọi job hết hạn (theo từng lô), trả về thống kê"""
+        batch_size = batch_size or getattr(settings, 'JOB_EXPIRY_BATCH_SIZE', 1000)
+        today = timezone.localdate()
+        recruiters = set()
+        closed = 0
+
+        while True:
+            rows = cls.close_batch(today, batch_size)
+            if not rows:
+                break
+            closed += len(rows)
+
+            job_pks = [row['pk'] for row in rows]
+            cls.sync_search_index(job_pks)
+            JobDetailCache.invalidate_jobs(job_pks)
+            recruiters.update(row['owner_id'] for row in rows)
+
+            if len(rows) < batch_size:
+                break
+
+        if closed:
+            JobSearchCache.bump_generation()
+        return {'closed': closed, 'recruiters': len(recruiters)}
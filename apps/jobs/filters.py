@@ -0,0 +1,23 @@
+import django_filters
+
+from apps.core.locations import LocationDirectory
+from .models import Job
+
+
+class JobFilter(django_filters.FilterSet):
+    """
+    Filter cho list job trên DB (không có ?search=)
+    location: map sang Location chuẩn hóa => lọc theo FK có index (tỉnh khớp cả các quận con),
+    không nhận ra thì so khớp text như trước
+    """
+    location = django_filters.CharFilter(method='filter_location')
+
+    class Meta:
+        model = Job
+        fields = ['job_type', 'location']
+
+    def filter_location(self, queryset, name, value):
+        resolved = LocationDirectory.resolve(value)
+        if resolved:
+            return queryset.filter(location_ref__in=LocationDirectory.expand_pks(resolved['pk']))
+        return queryset.filter(location=value)
@@ -0,0 +1,67 @@
+"""
+So sánh độ trễ search giữa các backend (Elasticsearch / Postgres / memory) trên dữ liệu thật
+
+Gọi thẳng backend (bỏ qua JobSearchCache và circuit breaker) => đo đúng chi phí 1 lần cache miss.
+Backend không dùng được (ES chưa chạy, DB không phải Postgres...) được báo lỗi và bỏ qua.
+
+Usage:
+    python manage.py benchmark_search
+    python manage.py benchmark_search --backends memory,postgres --repeat 50
+    python manage.py benchmark_search --queries "python,kế toán,nhân viên kinh doanh"
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs.memory_search import MemoryJobIndex, np
+from apps.jobs.search_backends import get_search_backend
+
+DEFAULT_QUERIES = [
+    'python', 'java developer', 'kế toán', 'marketing', 'nhân viên kinh doanh',
+    'lập trình viên', 'remote', 'data analyst', 'thực tập', 'quản lý dự án',
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark job search latency of each search backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', default='memory,postgres,elasticsearch')
+        parser.add_argument('--queries', help="Comma separated search terms")
+        parser.add_argument('--repeat', type=int, default=20, help="Runs per query")
+        parser.add_argument('--size', type=int, default=20, help="Page size")
+
+    def handle(self, *args, **options):
+        queries = [q.strip() for q in (options['queries'] or '').split(',') if q.strip()] or DEFAULT_QUERIES
+        backends = [name.strip() for name in options['backends'].split(',') if name.strip()]
+
+        if 'memory' in backends:
+            MemoryJobIndex.reset()
+            started = time.perf_counter()
+            index = MemoryJobIndex.get()
+            self.stdout.write(
+                f"memory index: {index.live} jobs, {len(index.postings)} terms, "
+                f"built in {(time.perf_counter() - started) * 1000:.0f} ms "
+                f"(scoring: {'numpy' if np is not None else 'python'})"
+            )
+
+        self.stdout.write(f"{'backend':<14}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}  (ms, first page)")
+        for name in backends:
+            timings = []
+            try:
+                backend = get_search_backend(name)
+                for _ in range(options['repeat']):
+                    for query in queries:
+                        started = time.perf_counter()
+                        backend.search_page(query, None, options['size'], {})
+                        timings.append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"{name:<14}unavailable: {type(e).__name__}: {e}"))
+                continue
+
+            timings.sort()
+            self.stdout.write(
+                f"{name:<14}{statistics.mean(timings):>10.2f}{timings[len(timings) // 2]:>10.2f}"
+                f"{timings[int(len(timings) * 0.95) - 1]:>10.2f}{timings[-1]:>10.2f}"
+            )
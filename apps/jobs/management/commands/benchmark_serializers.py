@@ -0,0 +1,122 @@
+"""
+So sánh serializer DRF với đường serialize nhanh (FieldPlan + values_list) và renderer json / orjson
+trên dữ liệu thật của các list endpoint nóng
+
+- Request/s: gọi thẳng view list (APIRequestFactory, không qua middleware/network), đã render ra bytes
+    * drf:         serializer DRF + JSONRenderer (json stdlib) - như trước khi có đường nhanh
+    * drf+orjson:  serializer DRF + ORJSONRenderer
+    * fast+orjson: FieldPlan + ORJSONRenderer (mặc định hiện tại)
+- Chi phí mỗi dòng (µs): đọc DB (model instance / Row của values_list) và serialize, tách riêng
+Endpoint không có dữ liệu (chưa có user nào lưu job / có notification) được bỏ qua.
+
+Usage:
+    python manage.py benchmark_serializers
+    python manage.py benchmark_serializers --endpoints jobs,notifications --repeat 200 --size 50
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.core.fast_serializers import FieldPlan
+from apps.core.renderers import ORJSONRenderer, orjson
+from apps.notifications.views import NotificationViewSet
+from apps.jobs.views import JobViewSet, SavedJobViewSet
+
+User = get_user_model()
+
+# endpoint -> (viewset, related_name để chọn user có nhiều dữ liệu nhất; None = anonymous)
+ENDPOINTS = {
+    'jobs': (JobViewSet, None),
+    'saved': (SavedJobViewSet, 'saved_jobs'),
+    'notifications': (NotificationViewSet, 'notifications'),
+}
+VARIANTS = [
+    ('drf', False, JSONRenderer),
+    ('drf+orjson', False, ORJSONRenderer),
+    ('fast+orjson', True, ORJSONRenderer),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark list serialization: DRF serializers vs compiled field plans, json vs orjson"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+        parser.add_argument('--repeat', type=int, default=50, help="Requests per variant")
+        parser.add_argument('--size', type=int, default=20, help="Page size")
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        size = options['size']
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson chưa được cài: ORJSONRenderer dùng json stdlib"))
+
+        for name in [e.strip() for e in options['endpoints'].split(',') if e.strip()]:
+            viewset_class, related_name = ENDPOINTS[name]
+            user = AnonymousUser()
+            if related_name:
+                user = (User.objects.annotate(n=Count(related_name)).filter(n__gt=0).order_by('-n').first())
+                if user is None:
+                    self.stdout.write(self.style.WARNING(f"{name}: không có dữ liệu, bỏ qua"))
+                    continue
+
+            def make_request():
+                request = factory.get('/', {'page_size': size})
+                force_authenticate(request, user=user)
+                return request
+
+            self.stdout.write(f"\n{name} (page_size={size}, user={getattr(user, 'email', 'anonymous')})")
+            self.per_row_cost(viewset_class, make_request())
+
+            self.stdout.write(f"  {'variant':<14}{'req/s':>10}{'ms/req':>10}{'bytes':>10}")
+            for label, fast, renderer in VARIANTS:
+                view = viewset_class.as_view({'get': 'list'}, renderer_classes=[renderer])
+                with override_settings(API_FAST_SERIALIZATION=fast):
+                    view(make_request()).render()  # Warm-up (compile plan, cache ContentType...)
+                    started = time.perf_counter()
+                    for _ in range(options['repeat']):
+                        response = view(make_request()).render()
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"  {label:<14}{options['repeat'] / elapsed:>10.0f}"
+                    f"{elapsed * 1000 / options['repeat']:>10.2f}{len(response.content):>10}"
+                )
+
+    def per_row_cost(self, viewset_class, request):
+        """µs/dòng của bước đọc DB và bước serialize, serializer DRF vs FieldPlan, trên cùng 1 trang"""
+        viewset = viewset_class(action_map={'get': 'list'}, args=(), kwargs={}, format_kwarg=None, headers={})
+        viewset.request = viewset.initialize_request(request)
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        size = int(request.GET['page_size'])
+
+        def timed(fn, repeat=20):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                result = fn()
+            return result, (time.perf_counter() - started) / repeat
+
+        instances, fetch_drf = timed(lambda: list(queryset[:size]))
+        _, serialize_drf = timed(lambda: viewset.get_serializer(instances, many=True).data)
+        rows_count = max(len(instances), 1)
+        self.stdout.write(f"  {'per row (µs)':<14}{'fetch':>10}{'serialize':>10}")
+        self.stdout.write(
+            f"  {'drf':<14}{fetch_drf * 1e6 / rows_count:>10.1f}{serialize_drf * 1e6 / rows_count:>10.1f}"
+        )
+
+        plan = FieldPlan.for_serializer(viewset.get_serializer())
+        if plan is None:
+            self.stdout.write(self.style.WARNING(f"  {'fast':<14}serializer không dùng được đường nhanh"))
+            return
+        values = queryset.values_list(*plan.columns, named=True)
+        rows, fetch_fast = timed(lambda: list(values[:size]))
+        context = viewset.get_serializer_context()
+        _, serialize_fast = timed(lambda: plan.emit(rows, context))
+        self.stdout.write(
+            f"  {'fast':<14}{fetch_fast * 1e6 / rows_count:>10.1f}{serialize_fast * 1e6 / rows_count:>10.1f}"
+        )
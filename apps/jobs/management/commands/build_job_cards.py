@@ -0,0 +1,28 @@
+"""
+Dựng job card snapshot (Job.card) cho các job chưa có
+
+Card còn thiếu vẫn được dựng khi có người đọc; dùng lệnh này sau migration thêm cột card,
+sau khi import job bằng bulk_create, hoặc với --all khi format card (JOB_CARD_FIELDS) thay đổi.
+
+Usage:
+    python manage.py build_job_cards
+    python manage.py build_job_cards --all
+"""
+from django.core.management.base import BaseCommand
+
+from apps.jobs.cards import JobCardSnapshot
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Build the denormalized job card snapshot of jobs that do not have one"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Rebuild every card, not only missing ones")
+        parser.add_argument('--batch-size', type=int, default=JobCardSnapshot.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['all']:
+            Job.all_objects.update(card=None)
+        built = JobCardSnapshot.backfill(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Built {built} job cards."))
@@ -0,0 +1,41 @@
+"""
+Build inverted index trong process (JOB_SEARCH_BACKEND=memory) và ghi snapshot
+
+Chạy lúc deploy (hoặc cron) để worker khởi động chỉ cần load file + refresh phần thay đổi.
+
+Usage:
+    python manage.py memory_search_index
+    python manage.py memory_search_index --path /app/var/job_search_index.pkl
+"""
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.memory_search import MemoryJobIndex, np
+
+
+class Command(BaseCommand):
+    help = "Build the in-process job search index and write its snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help="Snapshot file (default: JOB_MEMORY_INDEX_PATH)")
+
+    def handle(self, *args, **options):
+        path = options['path'] or getattr(settings, 'JOB_MEMORY_INDEX_PATH', '')
+        if not path:
+            raise CommandError("Set JOB_MEMORY_INDEX_PATH or pass --path.")
+
+        started = time.perf_counter()
+        index = MemoryJobIndex().build()
+        built = time.perf_counter() - started
+        index.save_snapshot(path)
+
+        self.stdout.write(
+            f"Indexed {index.live} jobs, {len(index.postings)} terms in {built:.2f}s "
+            f"(scoring: {'numpy' if np is not None else 'python'})"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot written to {path} ({os.path.getsize(path) / 1024:.0f} KiB)."
+        ))
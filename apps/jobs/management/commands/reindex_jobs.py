@@ -0,0 +1,231 @@
+"""
+Reindex jobs không downtime: build index mới theo version rồi swap alias
+
+HOW IT WORKS:
+1. Tạo index `jobs_v{n}` (mapping lấy từ JobDocument), tắt refresh + replicas khi nạp
+2. Chia Job.all_objects thành các khoảng pkid (keyset, không OFFSET lớn)
+3. Process pool: mỗi worker stream 1 khoảng bằng iterator() + parallel_bulk
+4. Catch-up: index lại các job có updated_at >= lúc bắt đầu (bị sửa trong lúc build)
+5. Bật lại refresh/replicas, refresh, rồi swap alias `jobs` sang index mới (atomic)
+6. Catch-up lần 2 trên alias mới cho các job sửa trong lúc swap
+
+Tiến độ (các khoảng đã xong) lưu trong cache => bị ngắt giữa chừng thì chạy lại với --resume.
+
+Usage:
+    python manage.py reindex_jobs
+    python manage.py reindex_jobs --workers 4 --chunk-size 5000
+    python manage.py reindex_jobs --resume
+    python manage.py reindex_jobs --delete-old
+
+NOTE: Dùng lệnh này thay cho `search_index --rebuild` (lệnh đó xóa index/alias `jobs` trước
+khi nạp lại => search trả rỗng trong lúc rebuild).
+"""
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from apps.core.keyset import keyset_ranges
+from apps.jobs.cache import JobSearchCache
+from apps.jobs.documents import JobDocument
+from apps.jobs.models import Job
+
+STATE_KEY = 'jobs:reindex:state'
+
+
+def _init_worker():
+    """Process con (spawn) phải tự setup Django: connection DB/ES riêng, không share với process cha"""
+    import django
+    django.setup()
+
+
+def _bulk_index(index_name, queryset, bulk_size, thread_count):
+    """Index queryset vào index_name bằng parallel_bulk, trả về (số doc thành công, số lỗi)"""
+    from elasticsearch.helpers import parallel_bulk
+
+    document = JobDocument()
+
+    def actions():
+        for action in document.get_actions(queryset.iterator(chunk_size=bulk_size), 'index'):
+            action['_index'] = index_name  # Ghi thẳng vào index mới, không qua alias
+            yield action
+
+    indexed = failed = 0
+    for ok, _ in parallel_bulk(
+        JobDocument._get_connection(), actions(),
+        thread_count=thread_count, chunk_size=bulk_size, raise_on_error=False,
+    ):
+        if ok:
+            indexed += 1
+        else:
+            failed += 1
+    return indexed, failed
+
+
+def index_range(index_name, low, high, bulk_size, thread_count):
+    """Worker: index các job có low < pkid <= high"""
+    queryset = JobDocument().get_queryset().filter(pkid__gt=low, pkid__lte=high).order_by('pkid')
+    indexed, failed = _bulk_index(index_name, queryset, bulk_size, thread_count)
+    return low, high, indexed, failed
+
+
+class Command(BaseCommand):
+    help = "Rebuild the jobs Elasticsearch index into a new versioned index and swap the alias"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=min(4, multiprocessing.cpu_count()),
+                            help="Number of worker processes")
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Jobs per keyset range handed to a worker")
+        parser.add_argument('--bulk-size', type=int, default=500,
+                            help="Documents per _bulk request")
+        parser.add_argument('--threads', type=int, default=2,
+                            help="parallel_bulk threads per worker")
+        parser.add_argument('--resume', action='store_true',
+                            help="Continue the last interrupted reindex")
+        parser.add_argument('--delete-old', action='store_true',
+                            help="Delete previous jobs_v* indices after the swap")
+
+    def handle(self, *args, **options):
+        self.alias = JobDocument._index._name
+        self.client = JobDocument._get_connection()
+
+        state = cache.get(STATE_KEY)
+        if options['resume']:
+            if not state:
+                raise CommandError("Nothing to resume.")
+            self.stdout.write(f"Resuming into {state['index']} ({len(state['done'])}/{len(state['ranges'])} ranges done)")
+        else:
+            state = self.start(options['chunk_size'])
+
+        started = time.monotonic()
+        indexed = self.load(state, options)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"Indexed {indexed} jobs in {elapsed:.1f}s ({indexed / elapsed if elapsed else 0:.0f} docs/s)"
+        )
+
+        # Job bị sửa trong lúc build (signal vẫn ghi vào index cũ qua alias)
+        caught_up_at = timezone.now()
+        self.catch_up(state['index'], state['started_at'], options)
+
+        self.finalize_settings(state['index'])
+        old_indices = self.swap_alias(state['index'])
+
+        # Job bị sửa giữa lúc catch-up và swap, giờ ghi qua alias mới
+        self.catch_up(self.alias, caught_up_at, options)
+        JobSearchCache.bump_generation()
+        cache.delete(STATE_KEY)
+
+        if options['delete_old']:
+            for name in old_indices:
+                self.client.indices.delete(index=name)
+                self.stdout.write(f"Deleted old index {name}")
+
+        self.stdout.write(self.style.SUCCESS(f"Alias '{self.alias}' now points to {state['index']}"))
+
+    def next_index_name(self):
+        """jobs_v{n} với n = version lớn nhất hiện có + 1"""
+        existing = self.client.indices.get(index=f"{self.alias}_v*", expand_wildcards='all')
+        pattern = re.compile(rf"^{re.escape(self.alias)}_v(\d+)$")
+        versions = [int(m.group(1)) for m in map(pattern.match, existing) if m]
+        return f"{self.alias}_v{max(versions, default=0) + 1}"
+
+    def start(self, chunk_size):
+        """Tạo index mới + chia khoảng pkid, lưu state để resume"""
+        name = self.next_index_name()
+        index = JobDocument._index.clone(name=name)
+        # Nạp nhanh: không refresh định kỳ, không ghi replica (bật lại trước khi swap)
+        index.settings(refresh_interval='-1', number_of_replicas=0)
+        index.create()
+        self.stdout.write(f"Created index {name}")
+
+        state = {
+            'index': name,
+            'started_at': timezone.now(),
+            'ranges': self.keyset_ranges(chunk_size),
+            'done': [],
+        }
+        cache.set(STATE_KEY, state, timeout=None)
+        return state
+
+    @staticmethod
+    def keyset_ranges(chunk_size):
+        """Các khoảng (low, high] theo pkid, mỗi khoảng ~chunk_size job"""
+        return list(keyset_ranges(Job.all_objects.all(), chunk_size, field='pkid'))
+
+    def load(self, state, options):
+        """Chạy các khoảng chưa xong trên process pool"""
+        done = set(state['done'])
+        pending = [r for r in state['ranges'] if r not in done]
+        if not pending:
+            return 0
+
+        # Process cha chỉ ngồi chờ worker => đóng connection DB, tránh bị server cắt vì idle lâu
+        connections.close_all()
+
+        total = failed_total = 0
+        started = time.monotonic()
+        with ProcessPoolExecutor(
+            max_workers=options['workers'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+        ) as pool:
+            futures = [
+                pool.submit(index_range, state['index'], low, high, options['bulk_size'], options['threads'])
+                for low, high in pending
+            ]
+            for future in as_completed(futures):
+                low, high, indexed, failed = future.result()
+                total += indexed
+                failed_total += failed
+
+                state['done'].append((low, high))
+                cache.set(STATE_KEY, state, timeout=None)
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"  pkid ({low}, {high}]: {indexed} docs"
+                    f" [{len(state['done'])}/{len(state['ranges'])}] {total / elapsed:.0f} docs/s"
+                )
+
+        if failed_total:
+            self.stderr.write(self.style.WARNING(f"{failed_total} documents failed to index"))
+        return total
+
+    def catch_up(self, index_name, since, options):
+        queryset = JobDocument().get_queryset().filter(updated_at__gte=since).order_by('pkid')
+        indexed, _ = _bulk_index(index_name, queryset, options['bulk_size'], options['threads'])
+        if indexed:
+            self.stdout.write(f"Caught up {indexed} jobs modified since {since:%H:%M:%S}")
+
+    def finalize_settings(self, index_name):
+        """Khôi phục replicas/refresh theo cấu hình chính thức rồi refresh để data searchable"""
+        self.client.indices.put_settings(index=index_name, settings={
+            'refresh_interval': '1s',
+            'number_of_replicas': getattr(settings, 'ES_JOBS_INDEX_REPLICAS', 0),
+        })
+        self.client.indices.refresh(index=index_name)
+
+    def swap_alias(self, index_name):
+        """
+        Chuyển alias sang index mới trong 1 request _aliases (atomic)
+        Lần đầu: `jobs` đang là index thật => remove_index cùng request với add alias
+        """
+        actions = [{'add': {'index': index_name, 'alias': self.alias}}]
+        old_indices = []
+
+        if self.client.indices.exists_alias(name=self.alias):
+            old_indices = list(self.client.indices.get_alias(name=self.alias))
+            actions = [{'remove': {'index': name, 'alias': self.alias}} for name in old_indices] + actions
+        elif self.client.indices.exists(index=self.alias):
+            actions = [{'remove_index': {'index': self.alias}}] + actions
+
+        self.client.indices.update_aliases(actions=actions)
+        return [name for name in old_indices if name != index_name]
@@ -0,0 +1,37 @@
+"""
+Tính lại bucket JobDailyStats (đơn nộp, funnel trạng thái) từ ApplicationStatusEvent cho cả 1 khoảng thời gian
+
+Task rollup_job_daily_stats chỉ quét event mới kể từ lần chạy trước; dùng lệnh này sau deploy lần đầu
+(event backfill từ đơn ứng tuyển cũ) hoặc khi task dừng lâu hơn JOB_ANALYTICS_ROLLUP_LOOKBACK_DAYS.
+
+Usage:
+    python manage.py rollup_job_stats --days 30
+    python manage.py rollup_job_stats --since 2025-01-01
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.jobs.analytics import JobAnalyticsService
+
+
+class Command(BaseCommand):
+    help = "Recompute job daily analytics buckets from application status events"
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('--since', help="First day to recompute (YYYY-MM-DD)")
+        group.add_argument('--days', type=int, help="Recompute the last N days")
+
+    def handle(self, *args, **options):
+        if options['since']:
+            day = parse_date(options['since'])
+            if day is None:
+                raise CommandError("--since must be a date in YYYY-MM-DD format.")
+        else:
+            day = timezone.localdate() - timedelta(days=options['days'])
+
+        buckets = JobAnalyticsService.rollup(since=timezone.make_aware(datetime.combine(day, time.min)))
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {buckets} buckets since {day}."))
@@ -0,0 +1,29 @@
+"""
+Xem hit ratio của cache kết quả search/recommendation
+
+Usage:
+    python manage.py search_cache_stats
+    python manage.py search_cache_stats --reset
+"""
+from django.core.management.base import BaseCommand
+
+from apps.jobs.cache import JobSearchCache
+
+
+class Command(BaseCommand):
+    help = "Show (or reset) hit/miss counters of the job search result cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Reset counters after printing")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Index generation: {JobSearchCache.get_generation()}")
+        for namespace, stats in JobSearchCache.stats().items():
+            self.stdout.write(
+                f"{namespace:<16} hits={stats['hits']:<8} misses={stats['misses']:<8} "
+                f"hit_ratio={stats['hit_ratio']:.2%}"
+            )
+
+        if options['reset']:
+            JobSearchCache.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,478 @@
+"""
+In-memory Job Search
+Inverted index trong process cho catalog nhỏ (vài nghìn job) và test suite: không cần JVM Elasticsearch
+
+HOW IT WORKS:
+- Mỗi job PUBLISHED = 1 slot; token = fold_text (bỏ dấu) của title/requirements/description
+- Posting list theo term: array('i') slot + array('f') tf (title nhân ES_SEARCH_TITLE_BOOST), gọn như mảng C
+- Chấm điểm BM25 bằng NumPy (requirements/base.txt): cộng điểm cả posting list 1 lần (vector hóa);
+  môi trường thiếu NumPy vẫn chạy được bằng vòng lặp Python (chậm hơn)
+- Từ khóa khớp prefix như Postgres backend ("pyth" khớp "python"): vocab sort sẵn + bisect
+- Cập nhật tăng dần:
+    * Job/Company signal (sau commit) -> cập nhật ngay trong process hiện tại
+    * Process khác: mỗi JOB_MEMORY_INDEX_REFRESH_INTERVAL giây đọc lại job có updated_at mới
+- Xóa/sửa = đánh dấu slot chết (tombstone), slot chết quá nửa thì build lại posting list
+  (job bị xóa cứng ở process khác chỉ biến mất khi build lại - Job dùng xóa mềm nên hiếm)
+- Snapshot ra JOB_MEMORY_INDEX_PATH (pickle): restart chỉ load file + refresh phần thay đổi
+
+USAGE:
+    # settings: JOB_SEARCH_BACKEND = 'memory'
+    from apps.jobs.memory_search import MemoryJobIndex
+
+    MemoryJobIndex.get().score('lap trinh python')  # {slot: bm25 score}
+    python manage.py memory_search_index --snapshot
+    python manage.py benchmark_search --backends memory,postgres,elasticsearch
+"""
+import bisect
+import logging
+import math
+import os
+import pickle
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.locations import LocationDirectory, fold_text
+from .models import Job
+from .search import InvalidCursor, JobSearchService
+from .search_backends import EARTH_RADIUS_KM, SearchBackend
+
+try:
+    import numpy as np
+except ImportError:  # Có trong requirements; thiếu (môi trường tối giản) thì chấm điểm bằng Python thuần
+    np = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+# BM25
+K1 = 1.2
+B = 0.75
+# Lệch đồng hồ/transaction dài: đọc lại cả khoảng này trước mốc refresh lần trước
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    half_chord = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(half_chord))
+
+
+class MemoryJobIndex:
+    """Inverted index + dữ liệu job card của các job đang đăng (1 instance mỗi process)"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.postings = {}        # term -> (array('i') slot, array('f') tf)
+        self.doc_freq = Counter()  # term -> số slot còn sống chứa term
+        self.slot_of = {}         # job pk -> slot
+        self.docs = []            # slot -> dict (card + field filter + terms) | None nếu đã chết
+        self.doc_len = array('f')
+        self.total_len = 0.0
+        self.live = 0
+        self.synced_at = None
+        self.refreshed_at = 0.0
+        self._vocab = None        # list term đã sort (cho prefix match), None = cần build lại
+
+    # ------------------------------------------------------------------ build / update
+
+    @staticmethod
+    def queryset():
+        return Job.objects.filter(status=Job.Status.PUBLISHED).select_related('company', 'location_ref__parent')
+
+    @staticmethod
+    def tokenize(job):
+        """term -> tf có trọng số (title nhân boost giống ES)"""
+        title_boost = getattr(settings, 'ES_SEARCH_TITLE_BOOST', 3)
+        frequencies = Counter()
+        for term in fold_text(job.title).split():
+            frequencies[term] += title_boost
+        for text in (job.requirements, job.description):
+            frequencies.update(fold_text(text).split())
+        return frequencies
+
+    @staticmethod
+    def make_doc(job):
+        """Những gì search cần về 1 job: job card, field để filter/sort, tf của từng term"""
+        location = job.location_ref
+        location_pks = set()
+        coordinates = None
+        if location is not None:
+            location_pks = {location.pk, location.parent_id} - {None}
+            source = location if location.latitude is not None else location.parent
+            if source is not None and source.latitude is not None:
+                coordinates = (source.latitude, source.longitude)
+        return {
+            'pk': job.pk,
+            'card': SearchBackend.job_to_card(job),
+            'terms': dict(MemoryJobIndex.tokenize(job)),
+            'job_type': job.job_type,
+            'location': job.location,
+            'location_pks': location_pks,
+            'coordinates': coordinates,
+            'salary_min': job.salary_min,
+            'salary_max': job.salary_max,
+            'deadline': job.deadline.isoformat() if job.deadline else None,
+            'created_ts': job.created_at.timestamp() if job.created_at else 0.0,
+            'id': str(job.id),
+        }
+
+    def _add(self, doc):
+        slot = len(self.docs)
+        self.docs.append(doc)
+        length = float(sum(doc['terms'].values()))
+        self.doc_len.append(length)
+        self.total_len += length
+        self.live += 1
+        self.slot_of[doc['pk']] = slot
+
+        for term, frequency in doc['terms'].items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array('i'), array('f'))
+                self._vocab = None
+            postings[0].append(slot)
+            postings[1].append(frequency)
+            self.doc_freq[term] += 1
+
+    def _remove(self, job_pk):
+        slot = self.slot_of.pop(job_pk, None)
+        if slot is None:
+            return
+        for term in self.docs[slot]['terms']:
+            self.doc_freq[term] -= 1
+        self.total_len -= self.doc_len[slot]
+        self.live -= 1
+        self.docs[slot] = None
+
+    def _reset(self, docs=()):
+        self.postings, self.slot_of, self.docs = {}, {}, []
+        self.doc_freq = Counter()
+        self.doc_len = array('f')
+        self.total_len, self.live = 0.0, 0
+        self._vocab = None
+        for doc in docs:
+            self._add(doc)
+
+    def upsert(self, jobs):
+        """Thêm/cập nhật job; job không còn PUBLISHED/đã xóa mềm thì gỡ khỏi index"""
+        with self.lock:
+            for job in jobs:
+                self._remove(job.pk)
+                if job.status == Job.Status.PUBLISHED and not job.is_deleted:
+                    self._add(self.make_doc(job))
+            self._maybe_compact()
+
+    def remove(self, job_pks):
+        with self.lock:
+            for job_pk in job_pks:
+                self._remove(job_pk)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        """Slot chết nhiều hơn slot sống => build lại posting list từ doc còn sống (không query DB)"""
+        if len(self.docs) - self.live > max(self.live, 1000):
+            self._reset([doc for doc in self.docs if doc is not None])
+
+    def build(self):
+        """Build toàn bộ từ DB"""
+        started_at = timezone.now()
+        with self.lock:
+            self._reset(self.make_doc(job) for job in self.queryset().iterator(chunk_size=2000))
+            self.synced_at = started_at
+            self.refreshed_at = time.monotonic()
+        return self
+
+    def refresh(self, force=False):
+        """Đọc lại job/company đổi từ lần sync trước (thay đổi đến từ process khác)"""
+        interval = getattr(settings, 'JOB_MEMORY_INDEX_REFRESH_INTERVAL', 5)
+        if not force and time.monotonic() - self.refreshed_at < interval:
+            return 0
+        started_at = timezone.now()
+        since = self.synced_at - REFRESH_OVERLAP
+        changed = list(
+            Job.all_objects.filter(Q(updated_at__gte=since) | Q(company__updated_at__gte=since))
+            .select_related('company', 'location_ref__parent')
+        )
+        self.upsert(changed)
+        self.synced_at = started_at
+        self.refreshed_at = time.monotonic()
+        return len(changed)
+
+    # ------------------------------------------------------------------ snapshot
+
+    def save_snapshot(self, path):
+        """Ghi atomic (file tạm + rename) để process khác không đọc phải file ghi dở"""
+        with self.lock:
+            state = {
+                'version': SNAPSHOT_VERSION,
+                'postings': self.postings,
+                'doc_freq': self.doc_freq,
+                'slot_of': self.slot_of,
+                'docs': self.docs,
+                'doc_len': self.doc_len,
+                'total_len': self.total_len,
+                'live': self.live,
+                'synced_at': self.synced_at,
+            }
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as handle:
+                pickle.dump(state, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(handle.name, path)
+
+    @classmethod
+    def load_snapshot(cls, path):
+        """Snapshot -> index (None nếu không có file/khác version); file do chính app ghi ra"""
+        try:
+            with open(path, 'rb') as handle:
+                state = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not load job search snapshot {path}: {e}")
+            return None
+        if state.pop('version', None) != SNAPSHOT_VERSION:
+            return None
+
+        index = cls()
+        for key, value in state.items():
+            setattr(index, key, value)
+        return index
+
+    @classmethod
+    def get(cls):
+        """Index của process: snapshot (nếu có) hoặc build từ DB ở lần gọi đầu, sau đó refresh định kỳ"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    path = getattr(settings, 'JOB_MEMORY_INDEX_PATH', '')
+                    index = cls.load_snapshot(path) if path else None
+                    if index is None:
+                        index = cls().build()
+                        if path:
+                            index.save_snapshot(path)
+                    else:
+                        index.refresh(force=True)
+                    cls._instance = index
+        else:
+            cls._instance.refresh()
+        return cls._instance
+
+    @classmethod
+    def loaded(cls):
+        """Index đã có trong process chưa (signal không tự build index chỉ để cập nhật)"""
+        return cls._instance
+
+    @classmethod
+    def reset(cls):
+        cls._instance = None
+
+    # ------------------------------------------------------------------ query
+
+    @property
+    def vocab(self):
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        return self._vocab
+
+    def expand(self, text):
+        """Từ khóa -> các term trong vocab có prefix tương ứng"""
+        vocab = self.vocab
+        terms = set()
+        for prefix in dict.fromkeys(fold_text(text).split()):
+            position = bisect.bisect_left(vocab, prefix)
+            while position < len(vocab) and vocab[position].startswith(prefix):
+                terms.add(vocab[position])
+                position += 1
+        return terms
+
+    def idf(self, term):
+        frequency = self.doc_freq[term]
+        return math.log(1 + (self.live - frequency + 0.5) / (frequency + 0.5))
+
+    def score(self, text):
+        """
+        BM25 của mọi slot khớp ít nhất 1 term
+
+        Returns:
+            dict: slot -> score (chỉ slot còn sống)
+        """
+        with self.lock:
+            terms = self.expand(text)
+            if not terms or not self.live:
+                return {}
+            average_len = self.total_len / self.live
+            if np is not None:
+                return self._score_numpy(terms, average_len)
+            return self._score_python(terms, average_len)
+
+    def _score_numpy(self, terms, average_len):
+        lengths = np.frombuffer(self.doc_len, dtype=np.float32)
+        scores = np.zeros(len(self.docs), dtype=np.float64)
+        for term in terms:
+            slots, frequencies = self.postings[term]
+            slots = np.frombuffer(slots, dtype=np.int32)
+            frequencies = np.frombuffer(frequencies, dtype=np.float32)
+            norm = K1 * (1 - B + B * lengths[slots] / average_len)
+            # Mỗi slot xuất hiện tối đa 1 lần trong 1 posting list => cộng theo index an toàn
+            scores[slots] += self.idf(term) * frequencies * (K1 + 1) / (frequencies + norm)
+        matched = np.nonzero(scores)[0]
+        return {int(slot): float(scores[slot]) for slot in matched if self.docs[slot] is not None}
+
+    def _score_python(self, terms, average_len):
+        scores = {}
+        lengths = self.doc_len
+        for term in terms:
+            idf = self.idf(term)
+            slots, frequencies = self.postings[term]
+            for slot, frequency in zip(slots, frequencies):
+                if self.docs[slot] is None:
+                    continue
+                norm = K1 * (1 - B + B * lengths[slot] / average_len)
+                scores[slot] = scores.get(slot, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+        return scores
+
+    def candidates(self, text):
+        """[(doc, score)]: có từ khóa => slot khớp; không có => mọi job (score 1.0 như match_all)"""
+        if fold_text(text):
+            return [(self.docs[slot], score) for slot, score in self.score(text).items()]
+        with self.lock:
+            return [(doc, 1.0) for doc in self.docs if doc is not None]
+
+
+class MemorySearchBackend(SearchBackend):
+    """SearchBackend trên MemoryJobIndex: cùng filter/facet/cursor/job card với Postgres backend"""
+
+    name = 'memory'
+
+    @staticmethod
+    def matches(doc, filters, location_pks):
+        if filters.get('job_type') and doc['job_type'] not in filters['job_type']:
+            return False
+        if filters.get('location'):
+            if location_pks is not None:
+                if not doc['location_pks'] & location_pks:
+                    return False
+            elif doc['location'] != filters['location']:
+                return False
+        if filters.get('salary_min') is not None:
+            if doc['salary_max'] is None or doc['salary_max'] < filters['salary_min']:
+                return False
+        if filters.get('salary_max') is not None:
+            if doc['salary_min'] is None or doc['salary_min'] > filters['salary_max']:
+                return False
+        if filters.get('deadline_after'):
+            if doc['deadline'] is None or doc['deadline'] < filters['deadline_after']:
+                return False
+        return True
+
+    @classmethod
+    def filtered(cls, candidates, filters):
+        """[(doc, score, distance | None)] sau khi áp filter"""
+        filters = filters or {}
+        location_pks = None
+        if filters.get('location'):
+            resolved = LocationDirectory.resolve(filters['location'])
+            if resolved:
+                location_pks = set(LocationDirectory.expand_pks(resolved['pk']))
+
+        results = []
+        near = filters.get('near')
+        for doc, score in candidates:
+            if not cls.matches(doc, filters, location_pks):
+                continue
+            distance = None
+            if near:
+                if doc['coordinates'] is None:
+                    continue
+                distance = haversine_km(near[0], near[1], *doc['coordinates'])
+                if distance > filters['radius']:
+                    continue
+            results.append((doc, score, distance))
+        return results
+
+    @staticmethod
+    def sort_key(doc, score, distance, near):
+        """Tăng dần theo đúng thứ tự JobSearchService.get_sort (score/created_at giảm dần)"""
+        key = (-score, -doc['created_ts'], doc['id'])
+        return (distance,) + key if near else key
+
+    @classmethod
+    def cursor_key(cls, search_after, near):
+        values = list(search_after)
+        try:
+            created_ts = cls.parse_created_at(values[-2]).timestamp()
+            key = (-float(values[-3]), -created_ts, str(values[-1]))
+            return (float(values[0]),) + key if near else key
+        except (TypeError, ValueError):
+            raise InvalidCursor(search_after)
+
+    @staticmethod
+    def facets(rows):
+        facet_size = getattr(settings, 'ES_SEARCH_FACET_SIZE', 20)
+        salary_interval = getattr(settings, 'ES_SEARCH_SALARY_HISTOGRAM_INTERVAL', 1000)
+
+        def terms(field):
+            counts = Counter(doc[field] for doc, _, _ in rows)
+            ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:facet_size]
+            return [{'key': key, 'count': count} for key, count in ordered]
+
+        salary = Counter(
+            doc['salary_max'] // salary_interval * salary_interval
+            for doc, _, _ in rows if doc['salary_max'] is not None
+        )
+        return {
+            'job_type': terms('job_type'),
+            'location': terms('location'),
+            'salary_max': [{'key': key, 'count': count} for key, count in sorted(salary.items())],
+        }
+
+    @classmethod
+    def search_page(cls, search_term, search_after, size, filters):
+        index = MemoryJobIndex.get()
+        near = bool(filters and filters.get('near'))
+        rows = cls.filtered(index.candidates(search_term), filters)
+        facets = None if search_after else cls.facets(rows)
+
+        keyed = [(cls.sort_key(doc, score, distance, near), doc, score, distance) for doc, score, distance in rows]
+        if search_after:
+            after = cls.cursor_key(search_after, near)
+            keyed = [row for row in keyed if row[0] > after]
+        keyed.sort(key=lambda row: row[0])
+        page = keyed[:size]
+
+        results = []
+        for _, doc, score, distance in page:
+            card = dict(doc['card'])
+            if near:
+                card['distance_km'] = round(distance, 1)
+            results.append(card)
+
+        next_cursor = None
+        if len(page) == size:
+            _, doc, score, distance = page[-1]
+            values = [score, doc['card']['created_at'], doc['id']]
+            next_cursor = JobSearchService.encode_cursor([distance] + values if near else values)
+        return {'results': results, 'next_cursor': next_cursor, 'facets': facets}
+
+    @classmethod
+    def recommend(cls, resume_title, skills, size):
+        index = MemoryJobIndex.get()
+        scores = index.score(' '.join([resume_title or '', *skills]))
+        docs = index.docs
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -docs[item[0]]['created_ts']))[:size]
+        return [[docs[slot]['pk'], score] for slot, score in ranked]
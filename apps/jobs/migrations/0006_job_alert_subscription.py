@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:03
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_alter_job_deadline_alter_job_location_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobAlertSubscription',
+            fields=[
+                ('pkid', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('keywords', models.CharField(blank=True, max_length=255)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('job_type', models.CharField(blank=True, choices=[('FULL_TIME', 'Toàn thời gian'), ('PART_TIME', 'Bán thời gian'), ('FREELANCE', 'Freelance'), ('INTERNSHIP', 'Thực tập')], max_length=20)),
+                ('salary_min', models.IntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_alert_subscriptions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Đăng ký thông báo việc làm',
+                'verbose_name_plural': 'Đăng ký thông báo việc làm',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
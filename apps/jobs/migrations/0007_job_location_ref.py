@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_location_ref(apps, schema_editor):
+    """Map Job.location (text) hiện có sang Location: 1 UPDATE cho mỗi giá trị location khác nhau"""
+    from apps.core.locations import LocationDirectory
+
+    Job = apps.get_model('jobs', 'Job')
+    LocationDirectory.invalidate()
+    for text in Job.objects.values_list('location', flat=True).distinct():
+        resolved = LocationDirectory.resolve(text)
+        if resolved:
+            Job.objects.filter(location=text).update(location_ref_id=resolved['pk'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_seed_locations'),
+        ('jobs', '0006_job_alert_subscription'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='location_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='core.location'),
+        ),
+        migrations.RunPython(backfill_location_ref, migrations.RunPython.noop),
+    ]
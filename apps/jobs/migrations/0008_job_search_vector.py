@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def backfill_search_vector(apps, schema_editor):
+    """Tính search_vector cho job hiện có (chỉ Postgres), theo lô pk"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from apps.jobs.models import SEARCH_VECTOR_WEIGHTS, build_search_vector
+
+    Job = apps.get_model('jobs', 'Job')
+    rows = Job.objects.order_by('pkid').values_list('pkid', *SEARCH_VECTOR_WEIGHTS)
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pkid__gt=last_pk)[:500])
+        if not batch:
+            return
+        for pk, *texts in batch:
+            Job.objects.filter(pkid=pk).update(
+                search_vector=build_search_vector(**dict(zip(SEARCH_VECTOR_WEIGHTS, texts))),
+            )
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_location_ref'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='job_search_vector_gin'),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
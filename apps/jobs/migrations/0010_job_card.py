@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_job_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='card',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
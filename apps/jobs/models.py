@@ -1,12 +1,37 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import connection, models
+from django.db.models import Value
 from django.utils.text import slugify
 from django.contrib.auth import get_user_model
-from apps.core.models import TimeStampedModel
+from apps.core.locations import LocationDirectory, fold_text
+from apps.core.models import Location, TimeStampedModel
 from apps.core.soft_delete import SoftDeleteMixin, SoftDeleteManager
 from apps.companies.models import Company
 
 User = get_user_model()
 
+# Field -> trọng số trong search_vector (full-text search trên Postgres, xem search_backends.py)
+SEARCH_VECTOR_WEIGHTS = {'title': 'A', 'requirements': 'B', 'description': 'B'}
+# Config 'simple': không stemming (tiếng Việt), chữ đã bỏ dấu bằng fold_text trước khi tách từ
+SEARCH_CONFIG = 'simple'
+
+
+def build_search_vector(**texts):
+    """
+    tsvector có trọng số từ text đã bỏ dấu (fold_text tương đương unaccent + lower,
+    tính trong Python nên không phụ thuộc extension unaccent của database)
+    """
+    vectors = [
+        SearchVector(Value(fold_text(texts.get(field))), weight=weight, config=SEARCH_CONFIG)
+        for field, weight in SEARCH_VECTOR_WEIGHTS.items()
+    ]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
 class Job(SoftDeleteMixin, TimeStampedModel):
     class JobType(models.TextChoices):
         FULL_TIME = 'FULL_TIME', 'Toàn thời gian'
@@ -33,6 +58,10 @@ class Job(SoftDeleteMixin, TimeStampedModel):
         max_length=100,
         db_index=True  # INDEX: Filter by location hay dùng
     )
+    # Địa điểm chuẩn hóa suy ra từ `location` khi save (filter theo khu vực + tọa độ cho geo search)
+    location_ref = models.ForeignKey(
+        Location, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs',
+    )
     job_type = models.CharField(max_length=20, choices=JobType.choices, default=JobType.FULL_TIME)
     
     # Mức lương (Có thể null nếu là Thỏa thuận)
@@ -57,6 +86,14 @@ class Job(SoftDeleteMixin, TimeStampedModel):
     # - deleted_at: DateTimeField
     
     views_count = models.IntegerField(default=0)
+
+    # Full-text (title: A, requirements/description: B) - fallback khi Elasticsearch không dùng được
+    # Chỉ Postgres mới có tsvector; DB khác để NULL
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    # Job card render sẵn (JSONB trên Postgres) cho list/search/email - xem apps/jobs/cards.py
+    # NULL: chưa dựng (bulk_create, dữ liệu cũ) => dựng khi đọc lần đầu
+    card = models.JSONField(null=True, blank=True, editable=False)
     
     # Managers
     objects = SoftDeleteManager()  # Default: exclude deleted
@@ -77,12 +114,52 @@ class Job(SoftDeleteMixin, TimeStampedModel):
                 name='unique_active_job_slug'
             ),
         ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='job_search_vector_gin'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             # Tạo slug dạng: tieu-de-cong-viec-8kytuID
             self.slug = f"{slugify(self.title)}-{str(self.id)[:8]}"
+
+        # Save chỉ đổi field nóng (status/views_count...) không cần map lại địa điểm
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'location' in update_fields:
+            resolved = LocationDirectory.resolve(self.location)
+            self.location_ref_id = resolved['pk'] if resolved else None
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'location_ref'}
+
+        # Chỉ tính lại tsvector khi text thay đổi (save status/views_count thì bỏ qua)
+        update_fields = kwargs.get('update_fields')
+        rebuild_vector = connection.vendor == 'postgresql' and (
+            update_fields is None or not SEARCH_VECTOR_WEIGHTS.keys().isdisjoint(update_fields)
+        )
+        if rebuild_vector:
+            self.search_vector = build_search_vector(
+                **{field: getattr(self, field) for field in SEARCH_VECTOR_WEIGHTS}
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_vector'}
+        # Job card snapshot: chỉ render lại khi field có trên card thay đổi
+        from .cards import JobCardSnapshot
+        update_fields = kwargs.get('update_fields')
+        adding = self._state.adding
+        refresh_card = update_fields is None or not JobCardSnapshot.SOURCE_FIELDS.isdisjoint(update_fields)
+        if refresh_card and not adding:
+            self.card = JobCardSnapshot.build(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'card'}
+
         super().save(*args, **kwargs)
+        if rebuild_vector:
+            # Giá trị thật nằm trong DB, bỏ expression khỏi instance (đọc lại khi cần)
+            self.__dict__.pop('search_vector', None)
+        if refresh_card and adding:
+            # created_at (auto_now_add) chỉ có sau INSERT
+            self.card = JobCardSnapshot.build(self)
+            type(self).all_objects.filter(pk=self.pk).update(card=self.card)
 
     def __str__(self):
         return f"{self.title} - {self.company.name}"
@@ -100,4 +177,69 @@ class SavedJob(TimeStampedModel):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.user.email} saved {self.job.title}"
\ No newline at end of file
+        return f"{self.user.email} saved {self.job.title}"
+
+class JobAlertSubscription(TimeStampedModel):
+    """
+    Tiêu chí nhận email việc làm mới (saved search)
+    Mỗi subscription được lưu thành 1 percolator query trên ES (index job_alerts),
+    job mới được percolate 1 lần để tìm subscriber phù hợp (apps/jobs/alerts.py)
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_alert_subscriptions')
+    keywords = models.CharField(max_length=255, blank=True)  # Match tiêu đề/yêu cầu/mô tả
+    location = models.CharField(max_length=100, blank=True)
+    job_type = models.CharField(max_length=20, choices=Job.JobType.choices, blank=True)
+    salary_min = models.IntegerField(null=True, blank=True)  # Lương tối đa của job phải >= mức này
+    is_active = models.BooleanField(default=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Đăng ký thông báo việc làm"
+        verbose_name_plural = "Đăng ký thông báo việc làm"
+
+    def __str__(self):
+        return f"{self.user.email}: {self.keywords or '*'} @ {self.location or '*'}"
+
+
+class JobDailyStats(models.Model):
+    """
+    Số liệu theo ngày của 1 job (rollup cho dashboard analytics, xem apps/jobs/analytics.py)
+    - views: cộng dồn mỗi lần flush lượt xem (JobViewCounter)
+    - các cột đơn ứng tuyển: task rollup tính lại từ ApplicationStatusEvent
+    """
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='daily_stats')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+
+    views = models.PositiveIntegerField(default=0)
+    applications = models.PositiveIntegerField(default=0)  # Đơn nộp trong ngày
+    # Số đơn chuyển sang từng trạng thái trong ngày (funnel PENDING -> VIEWED -> INTERVIEW -> ACCEPTED)
+    viewed = models.PositiveIntegerField(default=0)
+    interview = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'day'], name='unique_job_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['company', 'day'], name='job_daily_stats_company_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id} @ {self.day}"
+
+
+class JobViewFlushBatch(models.Model):
+    """
+    Đánh dấu 1 lô lượt xem (hash flushing của JobViewCounter) đã được cộng vào DB
+    Ghi cùng transaction với UPDATE views_count => chạy lại lô đã commit (crash trước DEL flushing,
+    2 lần flush chồng nhau) không cộng 2 lần
+    """
+    batch_id = models.CharField(max_length=64, unique=True)
+    applied_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.batch_id
@@ -0,0 +1,106 @@
+"""
+Recommendation Store
+Danh sách job gợi ý được tính sẵn cho từng ứng viên, lưu trong Redis sorted set
+
+HOW IT WORKS:
+- compute(user): CV chính + skills -> JobSearchService.recommend (top-K) -> ZSET jobs:recs:<user pk>
+- Endpoint chỉ đọc ZREVRANGE (O(K)) rồi hydrate job card từ JobCardCache
+- Tính lại khi:
+    * Resume/Skill của ứng viên thay đổi (signals -> task debounce)
+    * Có job mới sau lần tính gần nhất (đọc thấy list cũ => trả list cũ, hẹn tính lại)
+    * Nightly: refresh_all_recommendations (Celery beat)
+
+USAGE:
+    from apps.jobs.recommendations import RecommendationStore
+
+    pks = RecommendationStore.get(user.pk, limit=10)  # None nếu chưa tính
+    RecommendationStore.schedule(user.pk)  # Hẹn tính lại (debounce)
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.redis_client import get_redis
+from apps.resumes.models import Resume
+from .search import JobSearchService
+
+
+class RecommendationStore:
+    """Top-K job gợi ý theo ứng viên (Redis ZSET: member = job pk, score = ES score)"""
+
+    KEY_PREFIX = 'jobs:recs:'
+    COMPUTED_AT_PREFIX = 'jobs:recs_computed_at:'
+    LATEST_JOB_KEY = 'jobs:recs_latest_job_at'
+    SCHEDULED_PREFIX = 'jobs:recs_scheduled:'
+
+    @staticmethod
+    def get_resume(user_pk):
+        """CV chính, không có thì lấy CV mới nhất"""
+        resumes = Resume.objects.filter(user_id=user_pk)
+        return resumes.filter(is_primary=True).first() or resumes.order_by('-created_at').first()
+
+    @classmethod
+    def compute(cls, user_pk):
+        """
+        Tính và lưu top-K cho 1 ứng viên
+
+        Returns:
+            bool: False nếu ứng viên chưa có CV
+        """
+        resume = cls.get_resume(user_pk)
+        if resume is None:
+            return False
+
+        skills = list(resume.skills.values_list('name', flat=True))
+        ranked = JobSearchService.recommend(
+            resume.title, skills, size=getattr(settings, 'JOB_RECOMMENDATION_SIZE', 50),
+        )
+
+        ttl = getattr(settings, 'JOB_RECOMMENDATION_TTL', 60 * 60 * 48)
+        key = f"{cls.KEY_PREFIX}{user_pk}"
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.delete(key)
+        if ranked:
+            pipe.zadd(key, {pk: score for pk, score in ranked})
+            pipe.expire(key, ttl)
+        # Đánh dấu đã tính (kể cả list rỗng) để không tính lại mỗi request
+        pipe.set(f"{cls.COMPUTED_AT_PREFIX}{user_pk}", time.time(), ex=ttl)
+        pipe.execute()
+        return True
+
+    @classmethod
+    def get(cls, user_pk, limit=10):
+        """
+        Returns:
+            list[int] pk theo score giảm dần, hoặc None nếu chưa tính
+        """
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.get(f"{cls.COMPUTED_AT_PREFIX}{user_pk}")
+        pipe.get(cls.LATEST_JOB_KEY)
+        pipe.zrevrange(f"{cls.KEY_PREFIX}{user_pk}", 0, limit - 1)
+        computed_at, latest_job_at, members = pipe.execute()
+
+        if computed_at is None:
+            return None
+        if latest_job_at is not None and float(latest_job_at) > float(computed_at):
+            # Có job mới: vẫn trả list hiện tại, tính lại ở background
+            cls.schedule(user_pk)
+        return [int(pk) for pk in members]
+
+    @classmethod
+    def schedule(cls, user_pk):
+        """Hẹn tính lại (gộp nhiều thay đổi Resume/Skill liên tiếp thành 1 task)"""
+        delay = getattr(settings, 'JOB_RECOMMENDATION_RECOMPUTE_DELAY', 30)
+        if cache.add(f"{cls.SCHEDULED_PREFIX}{user_pk}", 1, timeout=delay * 10):
+            from .tasks import recompute_recommendations
+            recompute_recommendations.apply_async(args=[user_pk], countdown=delay)
+
+    @classmethod
+    def clear_scheduled(cls, user_pk):
+        cache.delete(f"{cls.SCHEDULED_PREFIX}{user_pk}")
+
+    @classmethod
+    def mark_new_job(cls):
+        """Gọi khi có job mới đăng => list tính trước thời điểm này bị coi là cũ"""
+        get_redis().set(cls.LATEST_JOB_KEY, time.time())
@@ -0,0 +1,430 @@
+"""
+Job Search Service (Elasticsearch)
+Trả kết quả tìm kiếm trực tiếp từ `_source` của ES - không hit Postgres
+(ES lỗi/chậm hoặc JOB_SEARCH_BACKEND=postgres => full-text search Postgres, xem search_backends.py)
+
+WHY?
+- Cách cũ: ES multi_match -> to_queryset() -> Postgres IN (...) -> serialize lại
+  => 1 round trip ES + 1 query DB cho mỗi trang, DB đọc lại dữ liệu ES đã có
+- Cách mới: ES trả luôn job card (company đã denormalize trong JobDocument)
+  và phân trang bằng search_after cursor => trang sâu vẫn rẻ như trang đầu
+"""
+import base64
+import binascii
+import hashlib
+import json
+
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from elasticsearch_dsl import Q as ES_Q
+from rest_framework.exceptions import ValidationError
+
+from apps.core.locations import LocationDirectory
+from .cache import JobSearchCache
+from .cards import JobCardSnapshot
+from .documents import JobDocument, suggest_scope
+
+
+# Các field của `_source` cần để render job card (bỏ description/requirements nặng)
+# `card` + live_fields: snapshot Job.card; các field còn lại cho document index trước khi có `card`
+CARD_SOURCE_FIELDS = [
+    'card', *JobCardSnapshot.live_fields,
+    'id', 'slug', 'title', 'location', 'job_type',
+    'salary_min', 'salary_max', 'is_negotiable', 'deadline',
+    'created_at', 'company',
+]
+
+# Sort ổn định cho search_after: score -> mới nhất -> id (tie-breaker duy nhất)
+SEARCH_SORT = [
+    '_score',
+    {'created_at': {'order': 'desc'}},
+    {'id': {'order': 'asc'}},
+]
+
+
+AUTOCOMPLETE_CACHE_PREFIX = 'jobs:autocomplete:'
+
+# Query params được chuyển thành ES `filter` clause (không ảnh hưởng score, được ES cache)
+SEARCH_FILTER_PARAMS = ['job_type', 'location', 'salary_min', 'salary_max', 'deadline_after', 'near', 'radius']
+
+
+class InvalidCursor(ValueError):
+    """Cursor không decode được (bị sửa tay hoặc hết hạn format)"""
+
+
+class JobSearchService:
+    """Service build query Elasticsearch và phân trang bằng search_after"""
+
+    @staticmethod
+    def build_query(search_term):
+        """
+        Multi-match query với boost/fuzziness lấy từ settings
+        (externalized để tuning relevance không cần deploy code)
+        Không có từ khóa (chỉ lọc theo vị trí ?near=) => match_all
+        """
+        if not search_term:
+            return ES_Q('match_all')
+
+        title_boost = getattr(settings, 'ES_SEARCH_TITLE_BOOST', 3)
+        fuzziness = getattr(settings, 'ES_SEARCH_FUZZINESS', 'AUTO')
+        search_fields = getattr(settings, 'ES_SEARCH_FIELDS', [
+            'title', 'requirements', 'description', 'company.name'
+        ])
+
+        # Build search fields with title boost
+        fields_with_boost = [f'{search_fields[0]}^{title_boost}'] + search_fields[1:]
+
+        return ES_Q(
+            "multi_match",
+            query=search_term,
+            fields=fields_with_boost,
+            fuzziness=fuzziness,
+        )
+
+    @staticmethod
+    def published_search():
+        """
+        Search gốc: chỉ job PUBLISHED và chưa xóa mềm
+        (filter ở search time vì index chứa cả job đã xóa - xem JobDocument)
+        """
+        return JobDocument.search().filter('term', status='PUBLISHED').filter('term', is_deleted=False)
+
+    @staticmethod
+    def parse_filters(params):
+        """
+        Lấy các filter hợp lệ từ query params
+
+        Args:
+            params: request.query_params (QueryDict) hoặc dict
+
+        Returns:
+            dict: Filter đã validate, key thuộc SEARCH_FILTER_PARAMS
+
+        Raises:
+            ValidationError: Nếu salary/deadline sai định dạng
+        """
+        filters = {}
+
+        job_types = [v for v in (params.get('job_type') or '').split(',') if v]
+        if job_types:
+            filters['job_type'] = sorted(set(job_types))
+
+        location = (params.get('location') or '').strip()
+        if location:
+            filters['location'] = location
+
+        for key in ('salary_min', 'salary_max'):
+            value = params.get(key)
+            if value in (None, ''):
+                continue
+            try:
+                filters[key] = int(value)
+            except (TypeError, ValueError):
+                raise ValidationError({key: _("A valid integer is required.")})
+
+        deadline_after = params.get('deadline_after')
+        if deadline_after:
+            try:
+                filters['deadline_after'] = date.fromisoformat(deadline_after).isoformat()
+            except ValueError:
+                raise ValidationError({'deadline_after': _("Date has wrong format. Use YYYY-MM-DD.")})
+
+        near = params.get('near')
+        if near:
+            filters['near'] = JobSearchService.parse_near(near)
+            filters['radius'] = JobSearchService.parse_radius(params.get('radius'))
+
+        return filters
+
+    @staticmethod
+    def parse_near(value):
+        """'lat,lon' -> [lat, lon] (làm tròn 3 chữ số ~100m để cache key không vỡ vụn theo GPS)"""
+        try:
+            lat, lon = (float(part) for part in value.split(','))
+        except (TypeError, ValueError):
+            raise ValidationError({'near': _("Use the format lat,lon.")})
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValidationError({'near': _("Coordinates are out of range.")})
+        return [round(lat, 3), round(lon, 3)]
+
+    @staticmethod
+    def parse_radius(value):
+        """Bán kính (km), '10' hoặc '10km'; mặc định/giới hạn theo settings"""
+        default_radius = getattr(settings, 'JOB_SEARCH_DEFAULT_RADIUS_KM', 25)
+        max_radius = getattr(settings, 'JOB_SEARCH_MAX_RADIUS_KM', 500)
+        if value in (None, ''):
+            return default_radius
+        try:
+            radius = float(str(value).lower().removesuffix('km'))
+        except ValueError:
+            raise ValidationError({'radius': _("A valid number of kilometers is required.")})
+        if radius <= 0:
+            raise ValidationError({'radius': _("Radius must be greater than zero.")})
+        return min(radius, max_radius)
+
+    @staticmethod
+    def get_sort(filters=None):
+        """Có ?near= => gần nhất trước (kèm score/mới nhất/id để search_after vẫn ổn định)"""
+        near = (filters or {}).get('near')
+        if not near:
+            return SEARCH_SORT
+        return [{
+            '_geo_distance': {
+                'geo': {'lat': near[0], 'lon': near[1]},
+                'order': 'asc',
+                'unit': 'km',
+            },
+        }] + SEARCH_SORT
+
+    @staticmethod
+    def apply_filters(search, filters):
+        """
+        Áp dụng filter dạng ES `filter` clause
+
+        Salary là khoảng giao nhau: job lương 10-20 khớp với yêu cầu salary_min=15
+        Location nhận ra được (LocationDirectory) => keyword filter trên location_slugs,
+        không thì so khớp chính xác text như cũ
+        """
+        if not filters:
+            return search
+        if filters.get('job_type'):
+            search = search.filter('terms', job_type=filters['job_type'])
+        if filters.get('location'):
+            resolved = LocationDirectory.resolve(filters['location'])
+            if resolved:
+                search = search.filter('term', location_slugs=resolved['slug'])
+            else:
+                search = search.filter('term', **{'location.raw': filters['location']})
+        if filters.get('near'):
+            lat, lon = filters['near']
+            search = search.filter('geo_distance', distance=f"{filters['radius']}km",
+                                   geo={'lat': lat, 'lon': lon})
+        if filters.get('salary_min') is not None:
+            search = search.filter('range', salary_max={'gte': filters['salary_min']})
+        if filters.get('salary_max') is not None:
+            search = search.filter('range', salary_min={'lte': filters['salary_max']})
+        if filters.get('deadline_after'):
+            search = search.filter('range', deadline={'gte': filters['deadline_after']})
+        return search
+
+    @staticmethod
+    def add_facets(search):
+        """
+        Thêm aggregations (facet counts) vào cùng request search
+        => Frontend không phải gọi list nhiều lần để đếm theo từng filter
+        """
+        facet_size = getattr(settings, 'ES_SEARCH_FACET_SIZE', 20)
+        salary_interval = getattr(settings, 'ES_SEARCH_SALARY_HISTOGRAM_INTERVAL', 1000)
+
+        search.aggs.bucket('job_type', 'terms', field='job_type', size=facet_size)
+        search.aggs.bucket('location', 'terms', field='location.raw', size=facet_size)
+        search.aggs.bucket('salary_max', 'histogram', field='salary_max',
+                           interval=salary_interval, min_doc_count=1)
+        return search
+
+    @staticmethod
+    def parse_facets(response):
+        """Aggregations ES -> dict facet gọn cho Frontend"""
+        aggregations = response.aggregations
+        return {
+            name: [
+                {'key': bucket.key, 'count': bucket.doc_count}
+                for bucket in getattr(aggregations, name).buckets
+            ]
+            for name in ('job_type', 'location', 'salary_max')
+        }
+
+    @staticmethod
+    def get_page_size(requested=None):
+        """Page size từ query param, giới hạn bởi ES_SEARCH_MAX_PAGE_SIZE"""
+        default_size = getattr(settings, 'ES_SEARCH_PAGE_SIZE', 20)
+        max_size = getattr(settings, 'ES_SEARCH_MAX_PAGE_SIZE', 100)
+        try:
+            size = int(requested) if requested else default_size
+        except (TypeError, ValueError):
+            size = default_size
+        return max(1, min(size, max_size))
+
+    @staticmethod
+    def encode_cursor(sort_values):
+        """sort values của hit cuối -> chuỗi opaque an toàn cho URL"""
+        raw = json.dumps(list(sort_values), separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor, sort=SEARCH_SORT):
+        """
+        Chuỗi cursor -> list sort values cho search_after
+
+        Raises:
+            InvalidCursor: Nếu cursor không hợp lệ
+        """
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, UnicodeError, binascii.Error):
+            raise InvalidCursor(cursor)
+        if not isinstance(values, list) or len(values) != len(sort):
+            raise InvalidCursor(cursor)
+        return values
+
+    @staticmethod
+    def hit_to_card(hit):
+        """Chuyển 1 hit ES (`_source`) thành job card cho response list"""
+        source = hit.to_dict()
+        if source.get('card'):
+            return JobCardSnapshot.render(source['card'], live={
+                'status': source.get('status'),
+                'views_count': source.get('views_count', 0),
+                'is_deleted': source.get('is_deleted', False),
+            })
+
+        company = source.get('company') or {}
+        return {
+            'id': source.get('id'),
+            'slug': source.get('slug'),
+            'title': source.get('title'),
+            'location': source.get('location'),
+            'job_type': source.get('job_type'),
+            'status': source.get('status'),
+            'salary_min': source.get('salary_min'),
+            'salary_max': source.get('salary_max'),
+            'is_negotiable': source.get('is_negotiable', False),
+            'deadline': source.get('deadline'),
+            'created_at': source.get('created_at'),
+            'views_count': source.get('views_count', 0),
+            'company_info': {
+                'id': company.get('id'),
+                'name': company.get('name'),
+                'slug': company.get('slug'),
+                'logo': company.get('logo'),
+            },
+        }
+
+    @staticmethod
+    def search_page(search_term, cursor=None, page_size=None, filters=None):
+        """
+        Thực thi 1 trang tìm kiếm, trả về job cards từ `_source`
+
+        Facets chỉ tính ở trang đầu (cursor=None): các trang sau dùng lại
+        facet Frontend đã có, không tốn thêm chi phí aggregation.
+
+        Args:
+            search_term: Từ khóa tìm kiếm
+            cursor: Cursor của trang trước (None = trang đầu)
+            page_size: Số kết quả/trang (đã giới hạn bởi settings)
+            filters: dict từ parse_filters()
+
+        Returns:
+            dict: {'results': [card, ...], 'next_cursor': str | None,
+                   'facets': dict | None}
+
+        Raises:
+            InvalidCursor: Nếu cursor không hợp lệ
+        """
+        size = JobSearchService.get_page_size(page_size)
+        search_after = JobSearchService.decode_cursor(cursor, JobSearchService.get_sort(filters))
+
+        # Từ khóa phổ biến ("python", "kế toán", "remote") phục vụ từ cache,
+        # tự invalidate khi index thay đổi (xem JobSearchCache)
+        signature = {
+            'q': JobSearchCache.normalize_query(search_term),
+            'filters': filters or {},
+            'after': search_after,
+            'size': size,
+        }
+        return JobSearchCache.get_or_set(
+            'search', signature,
+            lambda: JobSearchService._execute_page(search_term, search_after, size, filters),
+        )
+
+    @staticmethod
+    def _execute_page(search_term, search_after, size, filters):
+        """Chạy 1 trang (cache miss) trên backend hiện hành - ES, hoặc Postgres khi ES không dùng được"""
+        from .search_backends import SearchBackendRouter
+
+        return SearchBackendRouter.call('search_page', search_term, search_after, size, filters)
+
+    @staticmethod
+    def recommend(resume_title, skills, size=10):
+        """
+        Gợi ý job theo CV: càng khớp nhiều skill/title thì điểm (score) càng cao
+        (ES: Bool Query "SHOULD", Postgres: ts_rank - xem search_backends.py)
+
+        Returns:
+            list: [[job_pk, score], ...] theo thứ tự score giảm dần (đã cache)
+        """
+        skills = sorted({JobSearchCache.normalize_query(skill) for skill in skills if skill})
+        signature = {
+            'title': JobSearchCache.normalize_query(resume_title),
+            'skills': skills,
+            'size': size,
+        }
+
+        def compute():
+            from .search_backends import SearchBackendRouter
+
+            return SearchBackendRouter.call('recommend', resume_title, skills, size)
+
+        return JobSearchCache.get_or_set('recommendations', signature, compute)
+
+    @staticmethod
+    def normalize_prefix(prefix):
+        """Chuẩn hóa prefix autocomplete: lowercase + gộp khoảng trắng"""
+        return ' '.join((prefix or '').lower().split())
+
+    @staticmethod
+    def autocomplete(prefix, job_type=None, location=None, size=None):
+        """
+        Gợi ý tiêu đề job bằng completion suggester (FST in-memory của ES)
+        thay vì multi_match fuzzy trên mỗi lần gõ phím.
+
+        Kết quả cache ngắn hạn theo prefix đã chuẩn hóa + filter:
+        các prefix phổ biến ("dev", "kế") được phục vụ từ Redis.
+
+        Returns:
+            list: [{'title': ..., 'slug': ...}, ...]
+        """
+        normalized = JobSearchService.normalize_prefix(prefix)
+        min_chars = getattr(settings, 'JOB_AUTOCOMPLETE_MIN_CHARS', 2)
+        if len(normalized) < min_chars:
+            return []
+
+        max_size = getattr(settings, 'JOB_AUTOCOMPLETE_MAX_SIZE', 10)
+        try:
+            size = max(1, min(int(size), max_size)) if size else max_size
+        except (TypeError, ValueError):
+            size = max_size
+
+        scope = suggest_scope(job_type=job_type, location=location)
+        signature = f"{normalized}\x1f{scope}\x1f{size}"
+        cache_key = AUTOCOMPLETE_CACHE_PREFIX + hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        search = (
+            JobDocument.search()
+            .suggest('title_suggest', normalized, completion={
+                'field': 'suggest',
+                'size': size,
+                'skip_duplicates': True,
+                'contexts': {'scope': [scope]},
+            })
+            .source(['title', 'slug'])
+            .extra(size=0)
+        )
+        response = search.execute()
+
+        results = []
+        for option in response.suggest.title_suggest[0].options:
+            source = option._source
+            results.append({'title': source.title, 'slug': source.slug})
+
+        cache.set(cache_key, results, getattr(settings, 'JOB_AUTOCOMPLETE_CACHE_TTL', 60))
+        return results
@@ -0,0 +1,343 @@
+"""
+Job Search Backends
+Cùng 1 interface (search_page / recommend) cho Elasticsearch, Postgres full-text search
+và inverted index trong process
+
+WHY?
+- Elasticsearch chết/chậm => ?search= và recommendations không được 500
+- Deployment nhỏ (staging) chạy không cần Elasticsearch: JOB_SEARCH_BACKEND=postgres
+
+HOW IT WORKS:
+- JOB_SEARCH_BACKEND=memory: inverted index trong process (catalog nhỏ, test - xem memory_search.py)
+- JOB_SEARCH_BACKEND=elasticsearch (mặc định): gọi ES qua CircuitBreaker
+    * ES lỗi hoặc chậm quá JOB_SEARCH_CIRCUIT_LATENCY_BUDGET giây => tính 1 lần hỏng
+    * Hỏng JOB_SEARCH_CIRCUIT_FAILURE_THRESHOLD lần => mọi request đi thẳng Postgres
+      trong JOB_SEARCH_CIRCUIT_RESET_TIMEOUT giây rồi thử lại ES
+- Postgres: Job.search_vector (tsvector lưu sẵn, GIN index) + ts_rank, cùng filter/facet/cursor với ES
+  => Frontend không phân biệt được kết quả đến từ backend nào
+
+USAGE:
+    from apps.jobs.search_backends import SearchBackendRouter
+
+    page = SearchBackendRouter.call('search_page', 'python', None, 20, {'job_type': ['FULL_TIME']})
+    ranked = SearchBackendRouter.call('recommend', 'Backend Developer', ['django'], 50)
+"""
+import math
+from datetime import datetime, timezone as dt_timezone
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Count, F, FloatField, Q, Value
+from django.db.models.functions import ASin, Coalesce, Cos, Power, Radians, Sin, Sqrt
+from django.utils.dateparse import parse_datetime
+
+from apps.core.circuit_breaker import CircuitBreaker
+from apps.core.locations import LocationDirectory, fold_text
+from .cards import JobCardSnapshot
+from .models import SEARCH_CONFIG, Job
+from .search import JobSearchService, InvalidCursor, CARD_SOURCE_FIELDS
+
+EARTH_RADIUS_KM = 6371.0
+# Cột lớn mà job card không cần (card đọc từ Job.card)
+JOB_HEAVY_COLUMNS = ('description', 'requirements', 'benefits', 'search_vector')
+
+
+class SearchBackend:
+    """
+    Interface chung: mọi backend trả cùng format với JobSearchService
+    Cursor backend tự sinh: [score, created_at ISO, id] (có ?near= thì thêm khoảng cách ở đầu)
+    """
+
+    name = None
+
+    @classmethod
+    def search_page(cls, search_term, search_after, size, filters):
+        """
+        Returns:
+            dict: {'results': [card, ...], 'next_cursor': str | None, 'facets': dict | None}
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def recommend(cls, resume_title, skills, size):
+        """
+        Returns:
+            list: [[job_pk, score], ...] theo score giảm dần
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def parse_created_at(value):
+        """created_at trong cursor: epoch millis (cursor của ES) hoặc ISO 8601 (cursor của Postgres)"""
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value / 1000, tz=dt_timezone.utc)
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+        if parsed is None:
+            raise InvalidCursor(value)
+        return parsed
+
+    @staticmethod
+    def job_to_card(job):
+        """Job -> job card (snapshot Job.card + live_fields) cùng format với JobSearchService.hit_to_card"""
+        card = job.card or JobCardSnapshot.load([job.pk])[job.pk]
+        return JobCardSnapshot.render(card, live=job)
+
+
+class ElasticsearchSearchBackend(SearchBackend):
+    name = 'elasticsearch'
+
+    @classmethod
+    def search_page(cls, search_term, search_after, size, filters):
+        sort = JobSearchService.get_sort(filters)
+        search = (
+            JobSearchService.published_search()
+            .query(JobSearchService.build_query(search_term))
+            .sort(*sort)
+            .source(CARD_SOURCE_FIELDS)
+            .extra(size=size, track_total_hits=False)
+        )
+        search = JobSearchService.apply_filters(search, filters)
+        if search_after:
+            search = search.extra(search_after=search_after)
+        else:
+            search = JobSearchService.add_facets(search)
+
+        response = search.execute()
+        hits = list(response.hits)
+
+        next_cursor = None
+        if len(hits) == size:
+            next_cursor = JobSearchService.encode_cursor(hits[-1].meta.sort)
+
+        results = [JobSearchService.hit_to_card(hit) for hit in hits]
+        if filters and filters.get('near'):
+            # Sort value đầu tiên là khoảng cách (km) tới điểm ?near=
+            for card, hit in zip(results, hits):
+                card['distance_km'] = round(hit.meta.sort[0], 1)
+
+        return {
+            'results': results,
+            'next_cursor': next_cursor,
+            'facets': None if search_after else JobSearchService.parse_facets(response),
+        }
+
+    @classmethod
+    def recommend(cls, resume_title, skills, size):
+        """
+        Bool Query "SHOULD": càng thỏa mãn nhiều điều kiện skill/title thì điểm (score) càng cao
+        """
+        from elasticsearch_dsl import Q as ES_Q
+
+        should_conditions = []
+
+        # 1. Matching Tiêu đề CV (Boost 2.0 - Quan trọng)
+        if resume_title:
+            should_conditions.append(
+                ES_Q('match', title={'query': resume_title, 'boost': 2.0})
+            )
+
+        # 2. Matching Kỹ năng (Boost 1.0 - Bình thường)
+        # Tìm các skill của ứng viên trong phần Yêu cầu & Mô tả của Job
+        for skill in skills:
+            should_conditions.append(ES_Q('match', requirements=skill))
+            should_conditions.append(ES_Q('match', description=skill))
+
+        if not should_conditions:
+            return []
+
+        q = ES_Q('bool', should=should_conditions, minimum_should_match=1)
+        search = JobSearchService.published_search().query(q).source(False).extra(size=size)
+        return [[int(hit.meta.id), hit.meta.score] for hit in search.execute().hits]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Full-text search trên Job.search_vector
+
+    Từ khóa được fold_text (bỏ dấu) giống lúc build vector, mỗi từ là 1 prefix term OR với nhau
+    ("lap trinh py" khớp "Lập trình Python"); thứ tự theo ts_rank (title trọng số A) như score của ES.
+    Cursor cùng dạng với ES: [rank, created_at, id] (có ?near= thì thêm khoảng cách ở đầu).
+    """
+
+    name = 'postgres'
+
+    @staticmethod
+    def build_query(text):
+        """Text tự do -> tsquery dạng 'lap:* | trinh:*' (None nếu không còn từ nào)"""
+        terms = fold_text(text).split()
+        if not terms:
+            return None
+        # fold_text chỉ giữ [a-z0-9 ] => an toàn để ghép raw tsquery
+        return SearchQuery(' | '.join(f"{term}:*" for term in dict.fromkeys(terms)),
+                           search_type='raw', config=SEARCH_CONFIG)
+
+    @staticmethod
+    def published():
+        # Card đọc từ Job.card => không JOIN company, không đọc các cột TEXT lớn
+        return Job.objects.filter(status=Job.Status.PUBLISHED).defer(*JOB_HEAVY_COLUMNS)
+
+    @staticmethod
+    def distance_expression(lat, lon):
+        """Khoảng cách haversine (km) từ (lat, lon) tới tọa độ địa điểm của job (quận chưa có => của tỉnh)"""
+        job_lat = Radians(Coalesce(F('location_ref__latitude'), F('location_ref__parent__latitude')))
+        job_lon = Radians(Coalesce(F('location_ref__longitude'), F('location_ref__parent__longitude')))
+        origin_lat, origin_lon = math.radians(lat), math.radians(lon)
+        half_chord = (
+            Power(Sin((job_lat - Value(origin_lat)) / 2), 2)
+            + Value(math.cos(origin_lat)) * Cos(job_lat) * Power(Sin((job_lon - Value(origin_lon)) / 2), 2)
+        )
+        return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(half_chord))
+
+    @classmethod
+    def apply_filters(cls, queryset, filters):
+        """Cùng ngữ nghĩa với JobSearchService.apply_filters (ES)"""
+        if not filters:
+            return queryset
+        if filters.get('job_type'):
+            queryset = queryset.filter(job_type__in=filters['job_type'])
+        if filters.get('location'):
+            resolved = LocationDirectory.resolve(filters['location'])
+            if resolved:
+                queryset = queryset.filter(location_ref_id__in=LocationDirectory.expand_pks(resolved['pk']))
+            else:
+                queryset = queryset.filter(location=filters['location'])
+        if filters.get('near'):
+            queryset = queryset.annotate(
+                distance=cls.distance_expression(*filters['near']),
+            ).filter(distance__lte=filters['radius'])
+        if filters.get('salary_min') is not None:
+            queryset = queryset.filter(salary_max__gte=filters['salary_min'])
+        if filters.get('salary_max') is not None:
+            queryset = queryset.filter(salary_min__lte=filters['salary_max'])
+        if filters.get('deadline_after'):
+            queryset = queryset.filter(deadline__gte=filters['deadline_after'])
+        return queryset
+
+    @staticmethod
+    def sort_keys(filters):
+        """(field, giảm dần?) theo đúng thứ tự của JobSearchService.get_sort"""
+        keys = [('rank', True), ('created_at', True), ('id', False)]
+        if filters and filters.get('near'):
+            keys.insert(0, ('distance', False))
+        return keys
+
+    @classmethod
+    def after_cursor(cls, queryset, keys, search_after):
+        """Keyset: (k1 < v1) OR (k1 = v1 AND k2 < v2) OR ... theo chiều sort của từng key"""
+        values = list(search_after)
+        created_at_index = [field for field, _ in keys].index('created_at')
+        values[created_at_index] = cls.parse_created_at(values[created_at_index])
+
+        clauses, equal = [], {}
+        for (field, descending), value in zip(keys, values):
+            clauses.append(Q(**equal, **{f"{field}__{'lt' if descending else 'gt'}": value}))
+            equal[field] = value
+        return queryset.filter(reduce(or_, clauses))
+
+    @staticmethod
+    def facets(queryset):
+        """Facet counts giống aggregations của ES (job_type, location, histogram salary_max)"""
+        facet_size = getattr(settings, 'ES_SEARCH_FACET_SIZE', 20)
+        salary_interval = getattr(settings, 'ES_SEARCH_SALARY_HISTOGRAM_INTERVAL', 1000)
+        queryset = queryset.order_by()
+
+        def terms(field):
+            rows = queryset.values(field).annotate(count=Count('pk')).order_by('-count', field)[:facet_size]
+            return [{'key': row[field], 'count': row['count']} for row in rows]
+
+        salary_rows = (
+            queryset.filter(salary_max__isnull=False)
+            .annotate(bucket=F('salary_max') / salary_interval * salary_interval)
+            .values('bucket').annotate(count=Count('pk')).order_by('bucket')
+        )
+        return {
+            'job_type': terms('job_type'),
+            'location': terms('location'),
+            'salary_max': [{'key': row['bucket'], 'count': row['count']} for row in salary_rows],
+        }
+
+    @classmethod
+    def search_page(cls, search_term, search_after, size, filters):
+        queryset = cls.apply_filters(cls.published(), filters)
+        query = cls.build_query(search_term)
+        if query is not None:
+            queryset = queryset.filter(search_vector=query).annotate(
+                rank=SearchRank(F('search_vector'), query),
+            )
+        else:
+            # Không từ khóa (chỉ ?near=): mọi job cùng rank như match_all của ES
+            queryset = queryset.annotate(rank=Value(1.0, output_field=FloatField()))
+
+        keys = cls.sort_keys(filters)
+        facets = None if search_after else cls.facets(queryset)
+        if search_after:
+            queryset = cls.after_cursor(queryset, keys, search_after)
+        ordering = [f"-{field}" if descending else field for field, descending in keys]
+        jobs = list(queryset.order_by(*ordering)[:size])
+
+        next_cursor = None
+        if len(jobs) == size:
+            last = jobs[-1]
+            values = [getattr(last, field) for field, _ in keys]
+            values[-2] = last.created_at.isoformat()
+            values[-1] = str(last.id)
+            next_cursor = JobSearchService.encode_cursor(values)
+
+        results = [cls.job_to_card(job) for job in jobs]
+        if filters and filters.get('near'):
+            for card, job in zip(results, jobs):
+                card['distance_km'] = round(job.distance, 1)
+        return {'results': results, 'next_cursor': next_cursor, 'facets': facets}
+
+    @classmethod
+    def recommend(cls, resume_title, skills, size):
+        """Tiêu đề CV + skills thành 1 tsquery OR; title khớp được cộng điểm qua trọng số A"""
+        query = cls.build_query(' '.join([resume_title or '', *skills]))
+        if query is None:
+            return []
+        rows = (
+            cls.published().filter(search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank', '-created_at')
+            .values_list('pk', 'rank')[:size]
+        )
+        return [[pk, rank] for pk, rank in rows]
+
+
+SEARCH_BACKENDS = {
+    backend.name: backend for backend in (ElasticsearchSearchBackend, PostgresSearchBackend)
+}
+
+
+def get_search_backend(name=None):
+    """Backend theo tên (mặc định JOB_SEARCH_BACKEND); 'memory' chỉ import khi được dùng"""
+    name = name or getattr(settings, 'JOB_SEARCH_BACKEND', 'elasticsearch')
+    if name == 'memory':
+        from .memory_search import MemorySearchBackend
+        return MemorySearchBackend
+    return SEARCH_BACKENDS[name]
+
+
+class SearchBackendRouter:
+    """Chọn backend theo JOB_SEARCH_BACKEND; Elasticsearch đi qua circuit breaker, fallback Postgres"""
+
+    @staticmethod
+    def breaker():
+        return CircuitBreaker(
+            'elasticsearch',
+            failure_threshold=getattr(settings, 'JOB_SEARCH_CIRCUIT_FAILURE_THRESHOLD', 5),
+            reset_timeout=getattr(settings, 'JOB_SEARCH_CIRCUIT_RESET_TIMEOUT', 30),
+            latency_budget=getattr(settings, 'JOB_SEARCH_CIRCUIT_LATENCY_BUDGET', 2.0),
+        )
+
+    @classmethod
+    def call(cls, method, *args):
+        primary = get_search_backend()
+        if primary is not ElasticsearchSearchBackend:
+            return getattr(primary, method)(*args)
+        return cls.breaker().call(
+            lambda: getattr(primary, method)(*args),
+            fallback=lambda: getattr(PostgresSearchBackend, method)(*args),
+        )
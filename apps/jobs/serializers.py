@@ -1,44 +1,79 @@
 from rest_framework import serializers
-from .models import Job, SavedJob
+from .models import Job, SavedJob, JobAlertSubscription
 from apps.companies.serializers import CompanySerializer
+from apps.core.fieldsets import DynamicFieldsMixin
+from apps.core.soft_delete import SoftDeletePrefetchListSerializer, prefetch_soft_deleted
+from .cards import JobCardSnapshot
 
-class JobSerializer(serializers.ModelSerializer):
+# Job card: các field của card search (JobSearchService.hit_to_card) + is_deleted
+# (lịch sử ứng tuyển / job đã lưu hiển thị badge "Đã xóa"), không có các cột TEXT lớn
+JOB_CARD_FIELDS = (
+    'id', 'slug', 'title', 'location', 'job_type', 'status',
+    'salary_min', 'salary_max', 'is_negotiable', 'deadline', 'created_at', 'views_count', 'is_deleted',
+    'company_info.id', 'company_info.name', 'company_info.slug', 'company_info.logo',
+)
+
+class JobSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     company_info = CompanySerializer(source='company', read_only=True)
+
+    # Job card mặc định của list đọc từ cột Job.card render sẵn (apps/jobs/cards.py)
+    snapshot = JobCardSnapshot
     
     class Meta:
         model = Job
-        fields = '__all__'
+        # search_vector: tsvector nội bộ của full-text search, không phải dữ liệu API
+        # card: bản sao job card render sẵn, chỉ đọc qua JobCardSnapshot (list mặc định / FastListMixin)
+        exclude = ['search_vector', 'card']
         read_only_fields = ['id', 'slug', 'created_at', 'updated_at', 'views_count', 'is_deleted', 'deleted_at']
+        # List: job card (?expand=description,... để lấy thêm)
+        list_fields = JOB_CARD_FIELDS
+        # List serialize thẳng từ values_list() (apps/core/fast_serializers.py)
+        fast_read = True
 
-class SavedJobSerializer(serializers.ModelSerializer):
+class SavedJobSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Nhúng thông tin Job vào để hiển thị luôn
     job_info = JobSerializer(source='job', read_only=True)
 
+    # Job nạp qua all_objects (kể cả đã xóa mềm), list thì nạp 1 lần cho cả trang
+    soft_delete_related = {'job': Job.all_objects.select_related('company')}
+
     class Meta:
         model = SavedJob
         fields = ['id', 'user', 'job', 'job_info', 'created_at']
         read_only_fields = ['user']
+        list_serializer_class = SoftDeletePrefetchListSerializer
+        # Đường đọc nhanh JOIN thẳng bảng job (kể cả job đã xóa mềm), job xóa cứng thì SavedJob đã bị CASCADE
+        fast_read = True
     
     # CRITICAL FIX #2: Handle soft-deleted jobs for UX consistency
     # Giống logic trong ApplicationSerializer - tránh SavedJob "bay màu" khi Job bị xóa mềm
     def to_representation(self, instance):
+        # Đã có trong cache (select_related / list prefetch) => không query thêm
+        prefetch_soft_deleted([instance], 'job', self.soft_delete_related['job'])
         representation = super().to_representation(instance)
         
-        # Xử lý trường hợp Job bị Soft Delete
-        if instance.job_id:
-            try:
-                # Dùng all_objects để lấy cả job đã xóa mềm
-                job = Job.all_objects.get(pk=instance.job_id)
-                representation['job_info'] = JobSerializer(job).data
-                representation['job_info']['is_deleted'] = job.is_deleted
-                
-                # Frontend có thể hiển thị badge "Đã xóa" hoặc disable actions
-            except Job.DoesNotExist:
-                # Job bị xóa cứng (hard delete) - rất hiếm xảy ra
-                representation['job_info'] = {
-                    'id': instance.job_id,
-                    'title': 'Job not found',
-                    'is_deleted': True
-                }
+        # job_info đã gồm is_deleted => Frontend có thể hiển thị badge "Đã xóa" hoặc disable actions
+        if instance.job_id and 'job_info' in representation and representation['job_info'] is None:
+            # Job bị xóa cứng (hard delete) - rất hiếm xảy ra
+            representation['job_info'] = {
+                'id': instance.job_id,
+                'title': 'Job not found',
+                'is_deleted': True
+            }
         
-        return representation
\ No newline at end of file
+        return representation
+
+class JobAlertSubscriptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobAlertSubscription
+        fields = ['id', 'keywords', 'location', 'job_type', 'salary_min', 'is_active', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+    CRITERIA_FIELDS = ('keywords', 'location', 'job_type', 'salary_min')
+
+    def validate(self, attrs):
+        # Subscription không có tiêu chí nào = nhận mọi job mới => không cho phép
+        values = [attrs.get(field, getattr(self.instance, field, None)) for field in self.CRITERIA_FIELDS]
+        if not any(values):
+            raise serializers.ValidationError("Cần ít nhất 1 tiêu chí (từ khóa, địa điểm, loại hình hoặc mức lương).")
+        return attrs
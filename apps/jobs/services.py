@@ -11,6 +11,7 @@ from django.db import transaction  # CRITICAL FIX: For atomicity
 import logging
 
 from .models import Job
+from .cache import JobDetailCache
 from apps.companies.models import Company
 
 logger = logging.getLogger(__name__)
@@ -125,7 +126,10 @@ class JobService:
         for attr, value in validated_data.items():
             setattr(job, attr, value)
         
-        job.save()
+        # update_fields: sửa riêng status => signal processor chỉ gửi partial update lên ES
+        job.save(update_fields=[*validated_data, 'updated_at'])
+        # Invalidate ngay cả khi signal bị tắt (vd: raw save trong data migration)
+        transaction.on_commit(lambda: JobDetailCache.invalidate_job(job.pk))
         logger.info(f"Job {job.id} updated by user {user.id}")
         return job
     
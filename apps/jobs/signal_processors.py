@@ -0,0 +1,173 @@
+"""
+Coalescing Signal Processor
+Gom thay đổi Job trong 1 khoảng ngắn rồi đồng bộ Elasticsearch bằng 1 request _bulk
+
+WHY?
+- RealTimeSignalProcessor: mỗi Job.save() = 1 request index đồng bộ
+- CelerySignalProcessor: mỗi Job.save() = 1 task + 1 request index
+- Đóng hàng loạt job / flush lượt xem => hàng nghìn request nhỏ dồn vào ES
+
+HOW IT WORKS:
+- post_save/post_delete chỉ SADD pk vào Redis set (sau commit):
+    jobs:es:full     -> reindex toàn bộ document
+    jobs:es:partial  -> chỉ đổi field "nóng" (status/views_count/is_deleted) => partial update
+    jobs:es:delete   -> xóa document (hard delete)
+- Lần thay đổi đầu tiên trong cửa sổ debounce hẹn 1 task flush (countdown)
+- Task flush lấy hết pk, dựng 1 request _bulk (index + update + delete), bump cache generation 1 lần
+
+SETUP (settings / .env):
+    ELASTICSEARCH_DSL_SIGNAL_PROCESSOR=apps.jobs.signal_processors.CoalescingSignalProcessor
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django_elasticsearch_dsl.apps import DEDConfig
+from django_elasticsearch_dsl.signals import RealTimeSignalProcessor
+
+from apps.core.redis_client import get_redis
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Field thay đổi thường xuyên nhưng không ảnh hưởng phần text đã analyze
+HOT_FIELDS = ('status', 'views_count', 'is_deleted')
+# Field không có trong index, save kèm hot field vẫn được coi là partial
+UNINDEXED_FIELDS = ('updated_at', 'deleted_at')
+
+
+class JobIndexQueue:
+    """Hàng đợi pk Job cần đồng bộ ES (Redis set => tự dedupe)"""
+
+    FULL_KEY = 'jobs:es:full'
+    PARTIAL_KEY = 'jobs:es:partial'
+    DELETE_KEY = 'jobs:es:delete'
+    DEBOUNCE_KEY = 'jobs:es:flush_scheduled'
+
+    @classmethod
+    def enqueue(cls, key, job_pk):
+        """Thêm pk vào hàng đợi + hẹn flush nếu chưa có lần flush nào đang chờ"""
+        get_redis().sadd(key, job_pk)
+
+        delay = getattr(settings, 'JOB_INDEX_FLUSH_DELAY', 2)
+        if cache.add(cls.DEBOUNCE_KEY, 1, timeout=delay * 10):
+            from .tasks import flush_job_index_queue
+            flush_job_index_queue.apply_async(countdown=delay)
+
+    @classmethod
+    def _claim(cls):
+        """Lấy + xóa 3 set trong 1 MULTI (pk thêm vào sau đó thuộc lần flush kế tiếp)"""
+        pipe = get_redis().pipeline(transaction=True)
+        for key in (cls.FULL_KEY, cls.PARTIAL_KEY, cls.DELETE_KEY):
+            pipe.smembers(key)
+            pipe.delete(key)
+        # Kết quả xen kẽ [smembers, delete, ...] => lấy phần tử chẵn
+        full, partial, deleted = ({int(pk) for pk in members} for members in pipe.execute()[::2])
+
+        full -= deleted
+        partial -= full | deleted
+        return full, partial, deleted
+
+    @classmethod
+    def _requeue(cls, full, partial, deleted):
+        """Flush lỗi => trả pk về hàng đợi cho lần retry"""
+        pipe = get_redis().pipeline()
+        for key, pks in ((cls.FULL_KEY, full), (cls.PARTIAL_KEY, partial), (cls.DELETE_KEY, deleted)):
+            if pks:
+                pipe.sadd(key, *pks)
+        pipe.execute()
+
+    @staticmethod
+    def build_actions(full, partial, deleted):
+        """Dựng action _bulk: index (full), update chỉ field nóng (partial), delete"""
+        from .documents import JobDocument
+
+        document = JobDocument()
+        index_name = JobDocument._index._name
+
+        if full:
+            queryset = document.get_queryset().filter(pk__in=full)
+            yield from document.get_actions(queryset.iterator(), 'index')
+
+        if partial:
+            # Suggest context phụ thuộc status/is_deleted (live/hidden) => gửi kèm
+            queryset = Job.all_objects.filter(pk__in=partial).only(
+                *HOT_FIELDS, 'title', 'job_type', 'location',
+            )
+            for job in queryset.iterator():
+                doc = {field: getattr(job, field) for field in HOT_FIELDS}
+                doc['suggest'] = document.prepare_suggest(job)
+                yield {
+                    '_op_type': 'update',
+                    '_index': index_name,
+                    '_id': document.generate_id(job),
+                    'doc': doc,
+                }
+
+        for pk in deleted:
+            yield {'_op_type': 'delete', '_index': index_name, '_id': pk}
+
+    @classmethod
+    def flush(cls):
+        """Đồng bộ mọi thay đổi đang chờ bằng 1 request _bulk, trả về số action"""
+        from elasticsearch.helpers import bulk
+        from .cache import JobSearchCache
+        from .documents import JobDocument
+
+        # Xóa cờ debounce trước: thay đổi xảy ra trong lúc flush sẽ hẹn lần flush mới
+        cache.delete(cls.DEBOUNCE_KEY)
+
+        full, partial, deleted = cls._claim()
+        if not (full or partial or deleted):
+            return 0
+
+        try:
+            # 404 (update/delete doc chưa từng index) không làm fail cả batch
+            success, errors = bulk(
+                JobDocument._get_connection(),
+                cls.build_actions(full, partial, deleted),
+                raise_on_error=False, stats_only=True,
+            )
+        except Exception:
+            cls._requeue(full, partial, deleted)
+            raise
+
+        if errors:
+            logger.warning(f"Job index flush: {errors} actions failed")
+        JobSearchCache.bump_generation()
+        return success + errors
+
+
+class CoalescingSignalProcessor(RealTimeSignalProcessor):
+    """
+    Signal processor gom thay đổi Job vào JobIndexQueue
+    Model khác (Company -> related jobs) vẫn xử lý như RealTimeSignalProcessor
+    """
+
+    def handle_save(self, sender, instance, update_fields=None, **kwargs):
+        if sender is not Job:
+            return super().handle_save(sender, instance, **kwargs)
+        if not DEDConfig.autosync_enabled():
+            return
+
+        partial = update_fields is not None and set(update_fields) <= {*HOT_FIELDS, *UNINDEXED_FIELDS}
+        key = JobIndexQueue.PARTIAL_KEY if partial else JobIndexQueue.FULL_KEY
+        job_pk = instance.pk
+        # Sau commit: rollback thì không cần index, và task flush chắc chắn đọc được dữ liệu mới
+        transaction.on_commit(lambda: JobIndexQueue.enqueue(key, job_pk))
+
+    def handle_pre_delete(self, sender, instance, **kwargs):
+        # Job không phải related model của document nào => không có gì để dọn trước khi xóa
+        if sender is not Job:
+            super().handle_pre_delete(sender, instance, **kwargs)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if sender is not Job:
+            return super().handle_delete(sender, instance, **kwargs)
+        if not DEDConfig.autosync_enabled():
+            return
+
+        # Chỉ cần pk (= _id trên ES) nên xử lý bất đồng bộ được, khác CelerySignalProcessor
+        job_pk = instance.pk
+        transaction.on_commit(lambda: JobIndexQueue.enqueue(JobIndexQueue.DELETE_KEY, job_pk))
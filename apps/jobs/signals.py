@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django_elasticsearch_dsl.apps import DEDConfig
+
+from apps.companies.models import Company
+from apps.resumes.models import Resume, Skill
+from .cache import JobDetailCache, JobSearchCache
+from .cards import JobCardSnapshot
+from .models import Job, JobAlertSubscription
+from .recommendations import RecommendationStore
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_detail_cache(sender, instance, **kwargs):
+    """
+    Job save / soft delete (save update_fields) / hard delete -> xóa cache chi tiết
+
+    Invalidate SAU khi commit: nếu invalidate ngay trong transaction, request khác
+    có thể đọc dữ liệu cũ (chưa commit) và ghi lại vào cache.
+    """
+    job_pk = instance.pk
+    transaction.on_commit(lambda: JobDetailCache.invalidate_job(job_pk))
+
+
+@receiver(post_save, sender=Company)
+def invalidate_company_jobs_detail_cache(sender, instance, **kwargs):
+    """Company đổi tên/logo/xóa mềm -> mọi job detail nhúng company_info đều cũ"""
+    company_pk = instance.pk
+    transaction.on_commit(lambda: JobDetailCache.invalidate_company(company_pk))
+
+
+def company_card_fields(name, slug, logo):
+    """(tên, slug, file logo) - các field của Company có trên job card"""
+    return name, slug, logo or ''
+
+
+@receiver(pre_save, sender=Company)
+def remember_company_card_fields(sender, instance, raw=False, **kwargs):
+    """Đọc tên/slug/logo cũ để biết job card của công ty có cần render lại không"""
+    instance._card_fields_before = None
+    if raw or instance._state.adding:
+        return
+    row = Company.all_objects.filter(pk=instance.pk).values_list('name', 'slug', 'logo').first()
+    if row is not None:
+        instance._card_fields_before = company_card_fields(*row)
+
+
+@receiver(post_save, sender=Company)
+def refresh_company_job_cards(sender, instance, created, raw=False, **kwargs):
+    """
+    Company đổi tên/slug/logo -> render lại job card của mọi job của công ty
+    Chạy trong cùng transaction (trước các hook on_commit reindex ES / memory index)
+    """
+    if raw or created:
+        return
+    after = company_card_fields(instance.name, instance.slug, instance.logo.name)
+    if instance._card_fields_before != after:
+        JobCardSnapshot.refresh_company(instance.pk)
+
+
+@receiver(post_save, sender=Job)
+def mark_recommendations_stale(sender, instance, created, **kwargs):
+    """Job mới đăng => danh sách gợi ý tính trước đó được tính lại khi ứng viên mở ra"""
+    if created and instance.status == Job.Status.PUBLISHED:
+        transaction.on_commit(RecommendationStore.mark_new_job)
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_delete, sender=Resume)
+def recompute_recommendations_on_resume_change(sender, instance, **kwargs):
+    """Đổi tiêu đề CV / CV chính / xóa CV -> tính lại gợi ý của ứng viên"""
+    user_pk = instance.user_id
+    transaction.on_commit(lambda: RecommendationStore.schedule(user_pk))
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def recompute_recommendations_on_skill_change(sender, instance, **kwargs):
+    """Thêm/sửa/xóa skill -> tính lại gợi ý (debounce: nhiều skill chỉ 1 lần tính)"""
+    user_pk = Resume.objects.filter(pk=instance.resume_id).values_list('user_id', flat=True).first()
+    if user_pk is not None:  # Resume đã bị xóa (cascade) => signal của Resume đã lo
+        transaction.on_commit(lambda: RecommendationStore.schedule(user_pk))
+
+
+@receiver(post_save, sender=Job)
+def percolate_job_for_alerts(sender, instance, **kwargs):
+    """Job đang đăng (mới hoặc vừa sửa) -> percolate 1 lần tìm subscriber khớp"""
+    if not DEDConfig.autosync_enabled():  # Tắt đồng bộ ES (test, import dữ liệu) => bỏ qua
+        return
+    if instance.status == Job.Status.PUBLISHED and not instance.is_deleted:
+        from .tasks import percolate_job_alerts
+        job_pk = instance.pk
+        transaction.on_commit(lambda: percolate_job_alerts.delay(job_pk))
+
+
+@receiver(post_save, sender=JobAlertSubscription)
+@receiver(post_delete, sender=JobAlertSubscription)
+def sync_job_alert_subscription_query(sender, instance, **kwargs):
+    """Subscription đổi tiêu chí / tắt / xóa -> cập nhật percolator query"""
+    if not DEDConfig.autosync_enabled():
+        return
+    from .tasks import sync_job_alert_subscription
+    subscription_pk = instance.pk
+    transaction.on_commit(lambda: sync_job_alert_subscription.delay(subscription_pk))
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_search_cache_without_elasticsearch(sender, instance, **kwargs):
+    """
+    Backend Postgres/memory: không có JobDocument.update() để tăng generation
+    => tự invalidate cache kết quả search sau khi commit
+    """
+    if getattr(settings, 'JOB_SEARCH_BACKEND', 'elasticsearch') != 'elasticsearch':
+        transaction.on_commit(JobSearchCache.bump_generation)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_save, sender=Company)
+def sync_memory_search_index(sender, instance, **kwargs):
+    """Job/Company đổi -> cập nhật inverted index trong process (nếu process này đã load index)"""
+    if getattr(settings, 'JOB_SEARCH_BACKEND', 'elasticsearch') != 'memory':
+        return
+    from .memory_search import MemoryJobIndex
+
+    deleted = kwargs.get('signal') is post_delete
+    pk = instance.pk
+
+    def sync():
+        index = MemoryJobIndex.loaded()
+        if index is None:
+            return
+        if deleted:
+            return index.remove([pk])
+        jobs = Job.all_objects.filter(**{'company_id' if sender is Company else 'pk': pk})
+        index.upsert(jobs.select_related('company', 'location_ref__parent'))
+
+    transaction.on_commit(sync)
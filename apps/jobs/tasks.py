@@ -1,19 +1,21 @@
 # apps/jobs/tasks.py
 
 import logging
-from celery import shared_task, chain
+from celery import shared_task, chain, group
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils import timezone
+from django.db import transaction
+from django.template.loader import get_template, render_to_string
 from django.utils.html import strip_tags
-from datetime import timedelta
-# [NÂNG CẤP] Import các class xử lý email chuyên nghiệp
-from django.core.mail import get_connection, EmailMultiAlternatives
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from apps.core.keyset import keyset_ranges
+# Digest đi qua EmailOutbox: worker `emails` gửi bằng connection SMTP dùng chung, retry không gửi trùng
+from apps.notifications.outbox import EmailOutboxService
 from apps.users.models import User
-from .models import Job
-# [OPTIMIZATION] Import Elasticsearch để tìm kiếm nhanh
-from elasticsearch_dsl import Q as ES_Q, MultiSearch
-from .documents import JobDocument
+from .models import Job, JobAlertSubscription
+# [OPTIMIZATION] Job alert dùng percolator: search ngược 1 lần / job thay vì 1 lần / ứng viên / ngày
+from .alerts import JobAlertPercolator, JobAlertRun
+from .cards import JobCardSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -21,178 +23,301 @@ logger = logging.getLogger(__name__)
 BATCH_SIZE = getattr(settings, 'JOB_ALERT_BATCH_SIZE', 500)
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=300)
-def send_daily_job_alerts(self):
+def send_daily_job_alerts(self, run_id=None):
     """
-    Task điều phối: Xác định danh sách ID ứng viên và tạo chuỗi task xử lý lô.
+    Task điều phối: chia ứng viên có đăng ký nhận thông báo thành các khoảng pk và phát lô song song.
+    
+    - Lô = khoảng pk (low, high] (keyset, không load hết pk vào RAM)
+    - Các lô chia đều vào JOB_ALERT_CONCURRENCY "làn" (chain) chạy song song trong 1 group
+      => tối đa N lô chạy cùng lúc, lô lỗi không chặn các lô khác
+    - Chạy lại cùng run_id (mặc định: ngày hôm nay) dùng lại danh sách khoảng đã chốt ở lần đầu
+      và bỏ qua các lô đã xong (JobAlertRun)
     
     Retry configuration:
     - max_retries: 3 lần
     - default_retry_delay: 300 giây (5 phút)
-    - Retry khi gặp lỗi Redis, Elasticsearch, hoặc Database timeout
+    - Retry khi gặp lỗi Redis hoặc Database timeout
     """
     try:
-        logger.info("Starting daily job alert dispatch task...")
+        run_id = run_id or timezone.localdate().isoformat()
+        logger.info(f"Starting daily job alert dispatch task (run {run_id})...")
         
-        # Chỉ lấy ID để tiết kiệm bộ nhớ
-        candidate_ids = list(User.objects.filter(
-            user_type=User.UserType.CANDIDATE,
-            is_active=True
-            # is_verified=True # Bỏ comment nếu có trường này
-        ).values_list('id', flat=True))
-        
-        total_candidates = len(candidate_ids)
-        
-        if total_candidates == 0:
+        # Chạy lại: dùng đúng các khoảng lần đầu (khoảng đếm theo số row sẽ dịch khi subscriber thay đổi)
+        ranges = JobAlertRun.saved_ranges(run_id)
+        if ranges is None:
+            ranges = list(keyset_ranges(JobAlertPercolator.subscribers(), BATCH_SIZE))
+        if not ranges:
             logger.info("No candidates found to send alerts.")
             return "No candidates processed."
 
-        # Chia nhỏ task (Batching)
-        task_chain = []
-        for i in range(0, total_candidates, BATCH_SIZE):
-            batch_ids = candidate_ids[i:i + BATCH_SIZE]
-            task_chain.append(bulk_create_daily_job_alerts.s(batch_ids))
-
-        # Chạy chuỗi task bất đồng bộ
-        if task_chain:
-            chain(task_chain).apply_async()
-            return f"Dispatched {len(task_chain)} batches for {total_candidates} candidates."
+        ranges = JobAlertRun.start(run_id, ranges)
+        done = JobAlertRun.done_batches(run_id)
+        pending = [(low, high) for low, high in ranges if JobAlertRun.batch_id(low, high) not in done]
         
-        return "No candidates processed."
+        if not pending:
+            return f"Run {run_id} already completed ({len(ranges)} batches)."
+
+        lanes = max(1, min(getattr(settings, 'JOB_ALERT_CONCURRENCY', 4), len(pending)))
+        group([
+            chain([bulk_create_daily_job_alerts.si(run_id, low, high) for low, high in pending[lane::lanes]])
+            for lane in range(lanes)
+        ]).apply_async()
+        return f"Dispatched {len(pending)}/{len(ranges)} batches for run {run_id} on {lanes} lanes."
     
     except Exception as exc:
-        # Retry với backoff khi gặp lỗi (Redis timeout, ES unreachable, etc.)
+        # Retry với backoff khi gặp lỗi (Redis timeout, DB timeout, etc.)
         logger.error(f"Job alert dispatch failed: {exc}")
         raise self.retry(exc=exc, countdown=self.default_retry_delay)
 
 
 @shared_task(bind=True, max_retries=2, default_retry_delay=60)
-def bulk_create_daily_job_alerts(self, candidate_ids):
+def bulk_create_daily_job_alerts(self, run_id, low, high):
     """
-    Task xử lý lô: Tối ưu với Elasticsearch thay vì Python loop
+    Task xử lý lô: ứng viên có pk trong (low, high], đọc job đã được percolate sẵn vào hàng đợi
+    của từng người (JobAlertPercolator) - không còn chạy search nào lúc gửi mail
+    
+    - Digest ghi vào EmailOutbox trong 1 transaction / lô (dedupe_key theo run + ứng viên),
+      deliver_email_outbox gửi sau commit => retry lô không gửi trùng, SMTP lỗi không làm mất email
     
     Retry configuration:
     - max_retries: 2 lần (ít hơn parent task vì đã batch)
     - default_retry_delay: 60 giây
+    - Hết lượt retry: ghi nhận lỗi vào JobAlertRun và KHÔNG raise => làn (chain) chạy tiếp lô sau
     """
+    batch_id = JobAlertRun.batch_id(low, high)
+    if JobAlertRun.is_done(run_id, batch_id):
+        return f"Batch {batch_id} already completed."
+
     try:
-        logger.info(f"Processing batch of {len(candidate_ids)} candidates.")
+        candidate_ids = list(
+            JobAlertPercolator.subscribers().filter(pk__gt=low, pk__lte=high).values_list('pk', flat=True)
+        )
+        logger.info(f"Processing batch {batch_id} of {len(candidate_ids)} candidates.")
+        
+        # 1. Job chờ gửi của cả lô: 1 round-trip Redis
+        pending = JobAlertPercolator.pending_job_pks(candidate_ids, limit=5)
+        if not pending:
+            JobAlertRun.mark_done(run_id, batch_id, sent=0)
+            return "No pending alerts in batch."
         
-        # 1. Lấy danh sách Job mới trong 24h qua
-        one_day_ago = timezone.now() - timedelta(days=1)
+        candidates_batch = User.objects.filter(pk__in=list(pending)).only('pk', 'email', 'full_name')
         
-        candidates_batch = User.objects.filter(id__in=candidate_ids).only(
-            'id', 'email', 'full_name', 'desired_job_title', 'desired_location'
+        # 2. Job card (snapshot Job.card) của hợp các job cả lô bằng 1 query, không JOIN company
+        # Job có thể đã đóng/xóa sau khi được percolate => chỉ lấy job đang đăng
+        all_job_pks = {pk for job_pks in pending.values() for pk in job_pks}
+        rows = list(
+            Job.objects.filter(status=Job.Status.PUBLISHED, pk__in=all_job_pks).values_list('pk', 'card', 'created_at')
         )
+        created_at = {pk: created for pk, _, created in rows}
+        cards = {pk: card for pk, card, _ in rows}
+        missing = [pk for pk, card in cards.items() if not card]
+        if missing:
+            cards.update(JobCardSnapshot.load(missing))
         
-        # Danh sách chứa các đối tượng Email sẽ gửi
-        messages = []
-
-        # 2. CRITICAL FIX: Use MultiSearch to reduce N+1 queries (500 candidates = 1 ES request instead of 500)
-        # Build all search queries first without executing
-        ms = MultiSearch(index='jobs')
-        candidate_search_map = []  # Keep mapping between candidates and their searches
+        site_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:3000')
         
-        for candidate in candidates_batch.iterator():
-            # Lấy tiêu chí của ứng viên
-            target_title = getattr(candidate, 'desired_job_title', None) or ""
-            target_location = getattr(candidate, 'desired_location', None) or ""
-
-            if not target_title and not target_location:
-                continue 
+        # 3. Render fragment job card 1 lần / job / lô, email chỉ ghép các fragment đã render
+        job_cards = {
+            pk: render_to_string('emails/_job_alert_card.html', {'job': card, 'SITE_URL': site_url})
+            for pk, card in cards.items()
+        }
+        layout = get_template('emails/daily_job_alert.html')
+        
+        emails = []
 
-            # Tạo query Elasticsearch (but don't execute yet)
-            search = JobDocument.search()
-            
-            # Filter theo thời gian và status
-            search = search.filter('range', created_at={'gte': one_day_ago})
-            search = search.filter('term', status='PUBLISHED')
-            
-            # Build query điều kiện OR cho title và location
-            queries = []
-            if target_title:
-                # Match fuzzy cho title (cho phép sai chính tả nhẹ)
-                queries.append(ES_Q('match', title={'query': target_title, 'fuzziness': 'AUTO'}))
-            
-            if target_location:
-                # Match fuzzy cho location
-                queries.append(ES_Q('match', location={'query': target_location, 'fuzziness': 'AUTO'}))
-            
-            # Kết hợp queries với OR
-            if queries:
-                search = search.query('bool', should=queries, minimum_should_match=1)
-            
-            # Giới hạn 5 job/mail, sắp xếp theo created_at mới nhất
-            search = search.sort('-created_at')[:5]
+        for candidate in candidates_batch.iterator():
+            matched_jobs = sorted(
+                (pk for pk in pending[candidate.pk] if pk in job_cards),
+                key=created_at.__getitem__, reverse=True,
+            )
+            if not matched_jobs:
+                continue
             
-            # Add search to MultiSearch batch
-            ms = ms.add(search)
-            candidate_search_map.append(candidate)
-        
-        # Execute all searches in a single HTTP request to Elasticsearch
-        try:
-            if not candidate_search_map:
-                return "No candidates with search criteria processed."
+            # Tạo đối tượng Email
+            context = {
+                'user': candidate,
+                'job_count': len(matched_jobs),
+                'job_cards': mark_safe(''.join(job_cards[pk] for pk in matched_jobs)),
+                'SITE_URL': site_url,
+            }
             
-            responses = ms.execute()
-            logger.info(f"Executed MultiSearch for {len(candidate_search_map)} candidates in single ES request")
+            subject = "🔥 Việc làm mới phù hợp với bạn hôm nay!"
+            html_content = layout.render(context)
+            text_content = strip_tags(html_content)
             
-            # Process results
-            for candidate, response in zip(candidate_search_map, responses):
-                # Check if response has hits (some searches may return 0 results)
-                if not response.hits:
-                    continue
-                
-                # Convert Elasticsearch hits thành Job objects
-                job_ids = [hit.meta.id for hit in response.hits]
-                matched_jobs = Job.objects.filter(id__in=job_ids).select_related('company').only(
-                    'id', 'title', 'location', 'salary_min', 'salary_max', 'company__name', 'slug'
-                )
-                
-                if not matched_jobs:
-                    continue
-                
-                # 3. Tạo đối tượng Email
-                context = {
-                    'user': candidate,
-                    'jobs': matched_jobs,
-                    'SITE_URL': getattr(settings, 'FRONTEND_URL', 'http://localhost:3000') 
-                }
-                
-                subject = "🔥 Việc làm mới phù hợp với bạn hôm nay!"
-                html_content = render_to_string('emails/daily_job_alert.html', context)
-                text_content = strip_tags(html_content)
-                
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=text_content,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    to=[candidate.email]
-                )
-                email.attach_alternative(html_content, "text/html")
-                messages.append(email)
+            emails.append(EmailOutboxService.build(
+                to_email=candidate.email,
+                subject=subject,
+                body=text_content,
+                html_body=html_content,
+                dedupe_key=f"job-alert:{run_id}:{candidate.pk}",
+            ))
+
+        # 4. Ghi cả lô vào outbox (1 INSERT), worker `emails` gửi sau commit
+        with transaction.atomic():
+            EmailOutboxService.enqueue_many(emails)
+        if emails:
+            logger.info(f"Queued {len(emails)} job alert emails.")
         
-        except Exception as e:
-            logger.error(f"MultiSearch execution failed: {str(e)}")
-            raise self.retry(exc=e, countdown=self.default_retry_delay)
-
-        # 4. Gửi email hàng loạt qua 1 kết nối duy nhất
-        if messages:
-            try:
-                connection = get_connection()
-                connection.open()
-                sent_count = connection.send_messages(messages)
-                connection.close()
-                logger.info(f"Successfully sent {sent_count} job alert emails.")
-                return f"Processed batch. Sent {sent_count} emails."
-                
-            except Exception as e:
-                logger.error(f"Failed to send bulk emails: {str(e)}")
-                # Retry nếu lỗi network hoặc SMTP timeout
-                raise self.retry(exc=e, countdown=self.default_retry_delay)
+        # Xóa hàng đợi sau khi đã ghi outbox (kể cả user mà mọi job chờ đều đã đóng)
+        # Lỗi ở bước này => retry ghi lại outbox, dedupe_key bỏ qua email đã có
+        JobAlertPercolator.clear_pending(pending)
+        JobAlertRun.mark_done(run_id, batch_id, sent=len(emails))
         
-        return "Processed batch. No emails sent."
+        return f"Processed batch {batch_id}. Queued {len(emails)} emails."
     
     except Exception as exc:
-        # Retry nếu lỗi Elasticsearch hoặc Database
-        logger.error(f"Batch processing failed: {exc}")
-        raise self.retry(exc=exc, countdown=self.default_retry_delay)
\ No newline at end of file
+        # Lỗi Redis, Database... (hàng đợi chưa bị xóa => retry ghi lại được)
+        logger.error(f"Batch {batch_id} processing failed: {exc}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc, countdown=self.default_retry_delay)
+        JobAlertRun.mark_failed(run_id)
+        return f"Batch {batch_id} failed after {self.max_retries} retries."
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def percolate_job_alerts(self, job_pk):
+    """Job được đăng/sửa -> tìm subscription khớp, xếp job vào hàng đợi digest của user"""
+    job = Job.objects.select_related('location_ref__parent').filter(pk=job_pk, status=Job.Status.PUBLISHED).first()
+    if job is None:
+        return "Job not published."
+    try:
+        return f"Queued job for {JobAlertPercolator.percolate(job)} subscribers."
+    except Exception as exc:
+        logger.error(f"Percolation failed for job {job_pk}: {exc}")
+        raise self.retry(exc=exc, countdown=self.default_retry_delay)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def sync_job_alert_subscription(self, subscription_pk):
+    """Đồng bộ 1 JobAlertSubscription sang percolator index (xóa nếu không còn)"""
+    subscription = JobAlertSubscription.objects.filter(pk=subscription_pk).first()
+    try:
+        if subscription is None:
+            JobAlertPercolator.delete_subscription(subscription_pk)
+        else:
+            JobAlertPercolator.index_subscription(subscription)
+    except Exception as exc:
+        logger.error(f"Failed to sync job alert subscription {subscription_pk}: {exc}")
+        raise self.retry(exc=exc, countdown=self.default_retry_delay)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def flush_job_view_counts(self):
+    """
+    Flush lượt xem đang buffer trên Redis xuống Postgres + Elasticsearch
+    Chạy định kỳ bởi Celery beat (xem CELERY_BEAT_SCHEDULE)
+    """
+    from .counters import JobViewCounter
+
+    try:
+        updated = JobViewCounter.flush()
+        if updated:
+            logger.info(f"Flushed view counts for {updated} jobs.")
+        return f"Flushed view counts for {updated} jobs."
+    except Exception as exc:
+        logger.error(f"View count flush failed: {exc}")
+        raise self.retry(exc=exc, countdown=self.default_retry_delay)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=300)
+def close_expired_jobs(self):
+    """
+    Đóng job PUBLISHED đã quá deadline (UPDATE theo lô) + đồng bộ ES + báo recruiter
+    Chạy hằng ngày bởi Celery beat (xem CELERY_BEAT_SCHEDULE)
+    """
+    from .expiry import JobExpiryService
+
+    try:
+        stats = JobExpiryService.close_expired()
+        logger.info(f"Closed {stats['closed']} expired jobs of {stats['recruiters']} recruiters.")
+        return f"Closed {stats['closed']} expired jobs."
+    except Exception as exc:
+        logger.error(f"Closing expired jobs failed: {exc}")
+        raise self.retry(exc=exc, countdown=self.default_retry_delay)
+
+
+@shared_task
+def rollup_job_daily_stats():
+    """
+    Tính lại các bucket JobDailyStats có event đơn ứng tuyển mới (idempotent)
+    Chạy mỗi 5 phút bởi Celery beat (xem CELERY_BEAT_SCHEDULE)
+    """
+    from .analytics import JobAnalyticsService
+
+    buckets = JobAnalyticsService.rollup()
+    logger.info(f"Rolled up {buckets} job daily stats buckets.")
+    return f"Rolled up {buckets} buckets."
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=10)
+def flush_job_index_queue(self):
+    """
+    Đồng bộ các Job thay đổi gần đây lên Elasticsearch bằng 1 request _bulk
+    Được hẹn bởi CoalescingSignalProcessor (debounce), không chạy theo beat
+    """
+    from .signal_processors import JobIndexQueue
+
+    try:
+        return f"Flushed {JobIndexQueue.flush()} index actions."
+    except Exception as exc:
+        logger.error(f"Job index flush failed: {exc}")
+        raise self.retry(exc=exc, countdown=self.default_retry_delay)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def recompute_recommendations(self, user_pk):
+    """Tính lại danh sách gợi ý của 1 ứng viên (hẹn bởi RecommendationStore.schedule)"""
+    from .recommendations import RecommendationStore
+
+    # Xóa cờ trước khi tính: thay đổi trong lúc tính sẽ hẹn lần tính mới
+    RecommendationStore.clear_scheduled(user_pk)
+    try:
+        RecommendationStore.compute(user_pk)
+    except Exception as exc:
+        logger.error(f"Recommendation recompute failed for user {user_pk}: {exc}")
+        raise self.retry(exc=exc, countdown=self.default_retry_delay)
+
+
+def _recommendation_candidates():
+    """Ứng viên đang hoạt động có CV (subquery, không JOIN + DISTINCT)"""
+    from apps.resumes.models import Resume
+
+    return User.objects.filter(pk__in=Resume.objects.filter(user__is_active=True).values('user_id'))
+
+
+@shared_task
+def recompute_recommendations_batch(low, high):
+    """Tính lại gợi ý cho ứng viên có pk trong (low, high] (lỗi 1 người không làm hỏng cả lô)"""
+    from .recommendations import RecommendationStore
+
+    user_pks = list(
+        _recommendation_candidates().filter(pk__gt=low, pk__lte=high).order_by('pk').values_list('pk', flat=True)
+    )
+    computed = 0
+    for user_pk in user_pks:
+        try:
+            computed += RecommendationStore.compute(user_pk)
+        except Exception as e:
+            logger.error(f"Recommendation recompute failed for user {user_pk}: {e}")
+    return f"Computed recommendations for {computed}/{len(user_pks)} candidates."
+
+
+@shared_task
+def refresh_all_recommendations():
+    """
+    Nightly: tính lại gợi ý cho mọi ứng viên có CV
+    Chia khoảng pk (keyset, ~JOB_ALERT_BATCH_SIZE ứng viên / lô, không load hết pk vào RAM),
+    các lô chia vào JOB_ALERT_CONCURRENCY làn (chain) như send_daily_job_alerts
+    => tối đa N lô chạy cùng lúc, không dồn hết lên worker 1 lần
+    """
+    ranges = list(keyset_ranges(_recommendation_candidates(), BATCH_SIZE))
+    if not ranges:
+        return "No candidates to recompute."
+
+    lanes = max(1, min(getattr(settings, 'JOB_ALERT_CONCURRENCY', 4), len(ranges)))
+    group([
+        chain([recompute_recommendations_batch.si(low, high) for low, high in ranges[lane::lanes]])
+        for lane in range(lanes)
+    ]).apply_async()
+    return f"Dispatched {len(ranges)} recommendation batches on {lanes} lanes."
@@ -1,4 +1,5 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.template.loader import render_to_string
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
@@ -8,6 +9,7 @@ from datetime import datetime, timedelta
 
 from .models import Job, SavedJob
 from apps.companies.models import Company
+from apps.core.testing import LOCAL_TEST_SETTINGS
 
 User = get_user_model()
 
@@ -350,6 +352,50 @@ class JobAPITest(APITestCase):
         self.assertNotEqual(response.status_code, status.HTTP_201_CREATED)
 
 
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobCreateAPITest(APITestCase):
+    """Test POST /jobs/ trả 201 và payload không lộ cột nội bộ (search_vector)"""
+
+    def setUp(self):
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER',
+            job_posting_credits=5,
+            membership_expires_at=timezone.now() + timedelta(days=30)
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+
+    def test_create_job_returns_201(self):
+        self.client.force_authenticate(user=self.recruiter)
+        data = {
+            'title': 'New Job',
+            'company': self.company.pkid,
+            'location': 'TP.HCM',
+            'job_type': 'FULL_TIME',
+            'salary_min': 1500,
+            'salary_max': 2500,
+            'is_negotiable': False,
+            'description': 'New job description',
+            'requirements': 'Python, FastAPI',
+            'benefits': 'Benefits',
+            'deadline': (timezone.now().date() + timedelta(days=30)).isoformat()
+        }
+
+        response = self.client.post(reverse('v1:job-list'), data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('search_vector', response.data)
+        self.assertTrue(Job.objects.filter(title='New Job').exists())
+
+
 class SavedJobAPITest(APITestCase):
     """Test cho Saved Job API"""
 
@@ -429,7 +475,7 @@ class SavedJobAPITest(APITestCase):
         response = self.client.get(self.saved_jobs_url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_delete_saved_job(self):
         """Test xóa job đã lưu"""
@@ -452,3 +498,1393 @@ class SavedJobAPITest(APITestCase):
         response = self.client.post(self.saved_jobs_url, data)
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class SavedJobListQueryCountTest(APITestCase):
+    """Test list job đã lưu có số query cố định, job đã xóa mềm vẫn hiển thị"""
+
+    def setUp(self):
+        self.candidate = User.objects.create_user(
+            email='candidate@test.com',
+            username='candidate@test.com',
+            password='testpass123',
+            full_name='Test Candidate',
+            user_type='CANDIDATE'
+        )
+        recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=recruiter
+        )
+        self.saved_jobs_url = reverse('v1:saved-jobs-list')
+        self.client.force_authenticate(user=self.candidate)
+
+    def save_jobs(self, count):
+        for i in range(count):
+            job = Job.objects.create(
+                title=f'Python Developer {i}',
+                company=self.company,
+                location='Hà Nội',
+                description='Test job description',
+                requirements='Python, Django',
+                benefits='Competitive salary',
+                deadline=timezone.now().date() + timedelta(days=30),
+                status='PUBLISHED'
+            )
+            SavedJob.objects.create(user=self.candidate, job=job)
+        return job
+
+    def test_list_query_count_is_constant(self):
+        """Test số query không tăng theo số job đã lưu"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.save_jobs(2)
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(self.saved_jobs_url)
+
+        self.save_jobs(5).delete()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.saved_jobs_url)
+
+        self.assertEqual(len(queries), len(baseline))
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertEqual(sum(row['job_info']['is_deleted'] for row in response.data['results']), 1)
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobSparseFieldsetTest(APITestCase):
+    """Test list trả job card, ?fields=/?expand= và chỉ SELECT các cột cần"""
+
+    def setUp(self):
+        recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=recruiter
+        )
+        self.job = Job.objects.create(
+            title='Python Developer',
+            company=self.company,
+            location='Hà Nội',
+            description='Test job description',
+            requirements='Python, Django',
+            benefits='Competitive salary',
+            deadline=timezone.now().date() + timedelta(days=30),
+            status='PUBLISHED'
+        )
+        self.url = reverse('v1:job-list')
+
+    def test_list_returns_job_card_without_text_columns(self):
+        """Test list mặc định là job card, SQL không đọc description/requirements/benefits"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        card = response.data['results'][0]
+        self.assertEqual(card['title'], 'Python Developer')
+        self.assertNotIn('description', card)
+        self.assertEqual(set(card['company_info']), {'id', 'name', 'slug', 'logo'})
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        for column in ('"description"', '"requirements"', '"benefits"'):
+            self.assertNotIn(column, sql)
+
+    def test_fields_and_expand(self):
+        """Test ?fields= chỉ trả field được chọn (kể cả field lồng), ?expand= thêm field ngoài job card"""
+        response = self.client.get(self.url, {'fields': 'id,title,company_info.name'})
+        self.assertEqual(response.data['results'][0], {
+            'id': str(self.job.id), 'title': 'Python Developer', 'company_info': {'name': 'Test Company'},
+        })
+
+        response = self.client.get(self.url, {'expand': 'description'})
+        self.assertEqual(response.data['results'][0]['description'], 'Test job description')
+        self.assertIn('slug', response.data['results'][0])
+
+    def test_detail_fields_do_not_replace_cached_detail(self):
+        """Test detail với ?fields= không ghi đè bản đầy đủ trong JobDetailCache"""
+        url = reverse('v1:job-detail', args=[self.job.pk])
+
+        response = self.client.get(url, {'fields': 'id,title'})
+        self.assertEqual(set(response.data), {'id', 'title'})
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['description'], 'Test job description')
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobCardSnapshotTest(APITestCase):
+    """Test job card render sẵn ở cột Job.card"""
+
+    def setUp(self):
+        recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=recruiter
+        )
+        self.job = Job.objects.create(
+            title='Python Developer',
+            company=self.company,
+            location='Hà Nội',
+            description='Test job description',
+            requirements='Python, Django',
+            benefits='Competitive salary',
+            deadline=timezone.now().date() + timedelta(days=30),
+            status='PUBLISHED'
+        )
+        self.url = reverse('v1:job-list')
+
+    def test_card_refreshed_on_job_and_company_change(self):
+        """Test sửa job / đổi tên công ty => card được render lại"""
+        self.assertEqual(Job.objects.get(pk=self.job.pk).card['title'], 'Python Developer')
+
+        self.job.title = 'Senior Python Developer'
+        self.job.save()
+        self.company.name = 'Renamed Company'
+        self.company.save()
+
+        card = Job.objects.get(pk=self.job.pk).card
+        self.assertEqual(card['title'], 'Senior Python Developer')
+        self.assertEqual(card['company_info']['name'], 'Renamed Company')
+
+    def test_list_reads_card_without_company_join(self):
+        """Test list đọc card (không JOIN company), output giống serializer đầy đủ"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .serializers import JOB_CARD_FIELDS
+
+        Job.all_objects.filter(pk=self.job.pk).update(views_count=42)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        card = response.data['results'][0]
+        self.assertEqual(card['views_count'], 42)
+        self.assertNotIn(Company._meta.db_table, ' '.join(query['sql'] for query in queries.captured_queries))
+
+        serialized = self.client.get(self.url, {'fields': ','.join(JOB_CARD_FIELDS)}).data['results'][0]
+        self.assertEqual(card, serialized)
+
+    def test_missing_card_is_built_on_read(self):
+        """Test card rỗng (bulk_create, dữ liệu cũ) được dựng và lưu lại khi đọc"""
+        Job.all_objects.filter(pk=self.job.pk).update(card=None)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['results'][0]['title'], 'Python Developer')
+        self.assertIsNotNone(Job.objects.get(pk=self.job.pk).card)
+
+    def test_card_is_not_exposed_in_payloads(self):
+        """Test cột card nội bộ không xuất hiện trong chi tiết job / list có ?expand="""
+        response = self.client.get(reverse('v1:job-detail', args=[self.job.pk]))
+        self.assertNotIn('card', response.data)
+
+        response = self.client.get(self.url, {'expand': 'description'})
+        self.assertNotIn('card', response.data['results'][0])
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobConditionalGetTest(APITestCase):
+    """Test ETag / 304 cho list và chi tiết job"""
+
+    def setUp(self):
+        recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=recruiter
+        )
+        self.job = Job.objects.create(
+            title='Python Developer',
+            company=self.company,
+            location='Hà Nội',
+            description='Test job description',
+            requirements='Python, Django',
+            benefits='Competitive salary',
+            deadline=timezone.now().date() + timedelta(days=30),
+            status='PUBLISHED'
+        )
+        self.url = reverse('v1:job-list')
+
+    def test_unchanged_list_is_one_query_and_no_body(self):
+        """Test list không đổi: If-None-Match => 304, chỉ 1 query aggregate"""
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        # Query khác (filter, ?fields=) => ETag khác
+        self.assertNotEqual(self.client.get(self.url, {'fields': 'id,title'})['ETag'], etag)
+
+    def test_list_etag_changes_on_update_counter_flush_and_soft_delete(self):
+        """Test ETag của list đổi khi job sửa, views_count flush (update()) hoặc job bị xóa mềm"""
+        etags = [self.client.get(self.url)['ETag']]
+
+        Job.all_objects.filter(pk=self.job.pk).update(views_count=10)
+        etags.append(self.client.get(self.url)['ETag'])
+        self.company.name = 'Renamed Company'
+        self.company.save()
+        etags.append(self.client.get(self.url)['ETag'])
+        Job.objects.filter(pk=self.job.pk).delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags[-1])
+
+        self.assertEqual(response.status_code, 200)
+        etags.append(response['ETag'])
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_detail_not_modified_from_cache(self):
+        """Test chi tiết: ETag theo bản cache, 304 không query DB; job sửa => 200 với ETag mới"""
+        url = reverse('v1:job-detail', args=[self.job.pk])
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.job.title = 'Senior Python Developer'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Senior Python Developer')
+
+
+class JobSearchServiceTest(TestCase):
+    """Test cho search mode trả kết quả từ `_source` (không cần ES chạy thật)"""
+
+    def test_cursor_round_trip(self):
+        """Test cursor encode/decode giữ nguyên sort values"""
+        from .search import JobSearchService
+
+        sort_values = [3.14, 1735689600000, 'a1b2c3']
+        cursor = JobSearchService.encode_cursor(sort_values)
+
+        self.assertEqual(JobSearchService.decode_cursor(cursor), sort_values)
+        self.assertIsNone(JobSearchService.decode_cursor(None))
+
+    def test_invalid_cursor_rejected(self):
+        """Test cursor bị sửa tay -> InvalidCursor"""
+        from .search import JobSearchService, InvalidCursor
+
+        with self.assertRaises(InvalidCursor):
+            JobSearchService.decode_cursor('not-a-cursor')
+
+    def test_hit_to_card_uses_denormalized_company(self):
+        """Test job card build hoàn toàn từ `_source` (gồm company block)"""
+        from unittest.mock import MagicMock
+        from .search import JobSearchService
+
+        hit = MagicMock()
+        hit.to_dict.return_value = {
+            'id': 'job-uuid',
+            'slug': 'python-developer-1234',
+            'title': 'Python Developer',
+            'location': 'Hà Nội',
+            'job_type': 'FULL_TIME',
+            'status': 'PUBLISHED',
+            'salary_max': 2000,
+            'company': {'id': 'company-uuid', 'name': 'Test Company', 'slug': 'test-company', 'logo': None},
+        }
+
+        card = JobSearchService.hit_to_card(hit)
+
+        self.assertEqual(card['title'], 'Python Developer')
+        self.assertEqual(card['company_info']['name'], 'Test Company')
+        self.assertEqual(card['views_count'], 0)
+        self.assertNotIn('description', card)
+
+    def test_autocomplete_short_prefix_skips_es(self):
+        """Test prefix quá ngắn không gọi ES"""
+        from unittest.mock import patch
+        from .search import JobSearchService
+
+        with patch('apps.jobs.search.JobDocument.search') as mock_search:
+            self.assertEqual(JobSearchService.autocomplete(' p '), [])
+            mock_search.assert_not_called()
+
+    def test_autocomplete_served_from_cache(self):
+        """Test prefix đã cache (chuẩn hóa hoa/thường, khoảng trắng) không gọi lại ES"""
+        from unittest.mock import patch
+        from .search import JobSearchService
+
+        cached = [{'title': 'Python Developer', 'slug': 'python-developer-1234'}]
+        with patch('apps.jobs.search.cache.get', return_value=cached) as mock_get, \
+                patch('apps.jobs.search.JobDocument.search') as mock_search:
+            self.assertEqual(JobSearchService.autocomplete('  PyTh  '), cached)
+            mock_search.assert_not_called()
+            mock_get.assert_called_once()
+
+    def test_suggest_scope_combines_filters(self):
+        """Test context 'scope' gộp job_type + location đã chuẩn hóa"""
+        from .documents import suggest_scope
+
+        self.assertEqual(suggest_scope(), 'live')
+        self.assertEqual(
+            suggest_scope(job_type='FULL_TIME', location='  Hà   Nội '),
+            'live|type:FULL_TIME|loc:hà nội'
+        )
+
+    def test_parse_filters(self):
+        """Test query params -> filter ES (job_type nhiều giá trị, salary int, deadline ISO)"""
+        from .search import JobSearchService
+
+        filters = JobSearchService.parse_filters({
+            'job_type': 'FULL_TIME,PART_TIME',
+            'location': ' Hà Nội ',
+            'salary_min': '1000',
+            'deadline_after': '2030-01-31',
+            'search': 'python',
+        })
+
+        self.assertEqual(filters, {
+            'job_type': ['FULL_TIME', 'PART_TIME'],
+            'location': 'Hà Nội',
+            'salary_min': 1000,
+            'deadline_after': '2030-01-31',
+        })
+
+    def test_parse_filters_invalid_salary(self):
+        """Test salary sai định dạng -> ValidationError (400)"""
+        from rest_framework.exceptions import ValidationError
+        from .search import JobSearchService
+
+        with self.assertRaises(ValidationError):
+            JobSearchService.parse_filters({'salary_min': 'abc'})
+
+    def test_parse_filters_near(self):
+        """Test ?near=lat,lon&radius= -> tọa độ đã làm tròn + bán kính km (giới hạn theo settings)"""
+        from rest_framework.exceptions import ValidationError
+        from .search import JobSearchService
+
+        filters = JobSearchService.parse_filters({'near': '10.77689,106.70081', 'radius': '10km'})
+        self.assertEqual(filters, {'near': [10.777, 106.701], 'radius': 10.0})
+
+        with self.settings(JOB_SEARCH_DEFAULT_RADIUS_KM=25):
+            self.assertEqual(JobSearchService.parse_filters({'near': '21,105'})['radius'], 25)
+        for params in ({'near': 'abc'}, {'near': '91,105'}, {'near': '21,105', 'radius': '-1'}):
+            with self.assertRaises(ValidationError):
+                JobSearchService.parse_filters(params)
+
+    def test_geo_sort_cursor(self):
+        """Test có ?near= thì sort theo khoảng cách trước, cursor phải khớp số sort value"""
+        from .search import JobSearchService, InvalidCursor, SEARCH_SORT
+
+        sort = JobSearchService.get_sort({'near': [21.0, 105.8], 'radius': 25})
+        self.assertIn('_geo_distance', sort[0])
+        self.assertEqual(sort[1:], SEARCH_SORT)
+
+        cursor = JobSearchService.encode_cursor([1.5, 3.14, 1735689600000, 'a1b2c3'])
+        self.assertEqual(len(JobSearchService.decode_cursor(cursor, sort)), 4)
+        with self.assertRaises(InvalidCursor):
+            JobSearchService.decode_cursor(cursor)
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobSearchCacheTest(TestCase):
+    """Test cache kết quả search theo generation"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_hit_after_miss_with_normalized_query(self):
+        """Test query chuẩn hóa ("Kế  Toán" == "kế toán") dùng chung cache"""
+        from unittest.mock import MagicMock
+        from .cache import JobSearchCache
+
+        compute = MagicMock(return_value={'results': []})
+        signature = {'q': JobSearchCache.normalize_query('Kế  Toán')}
+        JobSearchCache.get_or_set('search', signature, compute)
+        JobSearchCache.get_or_set('search', {'q': JobSearchCache.normalize_query('kế toán')}, compute)
+
+        compute.assert_called_once()
+        stats = JobSearchCache.stats()['search']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_bump_generation_invalidates(self):
+        """Test index thay đổi -> kết quả cũ không còn được dùng"""
+        from unittest.mock import MagicMock
+        from .cache import JobSearchCache
+
+        compute = MagicMock(return_value=[[1, 2.5]])
+        JobSearchCache.get_or_set('recommendations', {'title': 'python'}, compute)
+        JobSearchCache.bump_generation()
+        JobSearchCache.get_or_set('recommendations', {'title': 'python'}, compute)
+
+        self.assertEqual(compute.call_count, 2)
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobDetailCacheTest(APITestCase):
+    """Test cache chi tiết job được invalidate khi Job/Company thay đổi"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+        self.job = Job.objects.create(
+            title='Python Developer',
+            company=self.company,
+            location='Hà Nội',
+            job_type='FULL_TIME',
+            description='Test job description',
+            requirements='Python, Django',
+            benefits='Competitive salary',
+            deadline=timezone.now().date() + timedelta(days=30),
+            status='PUBLISHED'
+        )
+        self.url = reverse('v1:job-detail', args=[self.job.pk])
+
+    def test_detail_served_from_cache(self):
+        """Test lần gọi thứ 2 không query DB"""
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Python Developer')
+
+    def test_job_update_invalidates_detail(self):
+        """Test sửa job -> detail trả dữ liệu mới ngay"""
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.title = 'Senior Python Developer'
+            self.job.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['title'], 'Senior Python Developer')
+
+    def test_soft_delete_invalidates_detail(self):
+        """Test xóa mềm -> detail trả 404 thay vì bản cache cũ"""
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_company_update_invalidates_detail(self):
+        """Test đổi tên công ty -> company_info trong detail được cập nhật"""
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company.name = 'Renamed Company'
+            self.company.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['company_info']['name'], 'Renamed Company')
+
+    def test_update_during_cache_fill_is_not_cached(self):
+        """Test job được sửa sau khi đọc DB nhưng trước khi ghi cache -> bản cũ không được phục vụ tiếp"""
+        from unittest import mock
+        from .cache import JobDetailCache
+        from .views import JobViewSet
+
+        original_get_object = JobViewSet.get_object
+
+        def get_object_then_concurrent_save(view):
+            instance = original_get_object(view)
+            Job.objects.filter(pk=self.job.pk).update(title='Senior Python Developer')
+            JobDetailCache.invalidate_job(self.job.pk)
+            return instance
+
+        with mock.patch.object(JobViewSet, 'get_object', get_object_then_concurrent_save):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['title'], 'Python Developer')
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['title'], 'Senior Python Developer')
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobViewCounterTest(APITestCase):
+    """Test lượt xem job được buffer rồi flush theo batch"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+        self.job = Job.objects.create(
+            title='Python Developer',
+            company=self.company,
+            location='Hà Nội',
+            job_type='FULL_TIME',
+            description='Test job description',
+            requirements='Python, Django',
+            benefits='Competitive salary',
+            deadline=timezone.now().date() + timedelta(days=30),
+            status='PUBLISHED'
+        )
+
+    def test_detail_records_view_without_db_write(self):
+        """Test xem job (kể cả cache hit) chỉ ghi buffer, không UPDATE DB"""
+        from unittest import mock
+        url = reverse('v1:job-detail', args=[self.job.pk])
+
+        with mock.patch('apps.jobs.views.JobViewCounter.record') as record:
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                self.client.get(url)
+
+        self.assertEqual(record.call_args_list, [mock.call(self.job.pk), mock.call(self.job.pk)])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.views_count, 0)
+
+    def test_apply_counts_adds_deltas(self):
+        """Test flush cộng dồn lượt xem và trả về giá trị mới để sync ES"""
+        from .counters import JobViewCounter
+        Job.objects.filter(pk=self.job.pk).update(views_count=5)
+
+        rows = JobViewCounter.apply_counts({self.job.pk: 3})
+
+        self.assertEqual(list(rows), [(self.job.pk, 8)])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.views_count, 8)
+
+    def test_apply_counts_is_idempotent_per_batch(self):
+        """Test cùng 1 lô (flush chạy lại sau khi DB đã commit) chỉ được cộng 1 lần"""
+        from .counters import JobViewCounter
+
+        JobViewCounter.apply_counts({self.job.pk: 3}, batch_id='batch-1')
+        rows = JobViewCounter.apply_counts({self.job.pk: 3}, batch_id='batch-1')
+
+        self.assertEqual(list(rows), [(self.job.pk, 3)])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.views_count, 3)
+
+    def test_flush_invalidates_cached_detail(self):
+        """Test flush xong -> detail (đang cache) trả views_count mới thay vì bản cũ tới hết TTL"""
+        from unittest import mock
+        from .counters import JobViewCounter
+        url = reverse('v1:job-detail', args=[self.job.pk])
+
+        with mock.patch('apps.jobs.views.JobViewCounter.record'):
+            self.assertEqual(self.client.get(url).data['views_count'], 0)
+
+            with mock.patch('apps.jobs.counters.get_redis'), \
+                    mock.patch.object(JobViewCounter, '_claim_pending', return_value=('batch-1', {self.job.pk: 4})), \
+                    mock.patch.object(JobViewCounter, 'sync_search_index'):
+                self.assertEqual(JobViewCounter.flush(), 1)
+
+            self.assertEqual(self.client.get(url).data['views_count'], 4)
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class ReindexJobsCommandTest(TestCase):
+    """Test chia khoảng keyset cho reindex_jobs"""
+
+    def setUp(self):
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+
+    def test_keyset_ranges_cover_all_jobs(self):
+        """Test các khoảng (low, high] phủ đủ mọi job, kể cả job đã xóa mềm"""
+        from .management.commands.reindex_jobs import Command
+
+        jobs = [
+            Job.objects.create(
+                title=f'Job {i}',
+                company=self.company,
+                location='Hà Nội',
+                description='Test',
+                requirements='Test',
+                benefits='Test',
+                deadline=timezone.now().date() + timedelta(days=30),
+            )
+            for i in range(5)
+        ]
+        jobs[0].delete()
+
+        ranges = Command.keyset_ranges(chunk_size=2)
+
+        self.assertEqual(len(ranges), 3)
+        covered = [
+            pk for low, high in ranges
+            for pk in Job.all_objects.filter(pkid__gt=low, pkid__lte=high).values_list('pkid', flat=True)
+        ]
+        self.assertEqual(sorted(covered), sorted(job.pk for job in jobs))
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class CoalescingSignalProcessorTest(TestCase):
+    """Test gom thay đổi Job thành full/partial/delete cho 1 request _bulk"""
+
+    def setUp(self):
+        from .signal_processors import CoalescingSignalProcessor
+
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+        self.job = Job.objects.create(
+            title='Python Developer',
+            company=self.company,
+            location='Hà Nội',
+            job_type='FULL_TIME',
+            description='Test job description',
+            requirements='Python, Django',
+            benefits='Competitive salary',
+            deadline=timezone.now().date() + timedelta(days=30),
+            status='PUBLISHED'
+        )
+        self.processor = CoalescingSignalProcessor(connections=None)
+        self.addCleanup(self.processor.teardown)
+
+    def _queued(self, **kwargs):
+        """Chạy handle_save, trả về [(key, pk)] đã enqueue"""
+        from unittest import mock
+
+        with override_settings(ELASTICSEARCH_DSL_AUTOSYNC=True), \
+                mock.patch('apps.jobs.signal_processors.JobIndexQueue.enqueue') as enqueue, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.processor.handle_save(Job, self.job, **kwargs)
+        return [c.args for c in enqueue.call_args_list]
+
+    def test_hot_field_save_is_partial(self):
+        """Test save chỉ status/is_deleted => partial update"""
+        from .signal_processors import JobIndexQueue
+
+        queued = self._queued(update_fields=frozenset({'status', 'updated_at'}))
+        self.assertEqual(queued, [(JobIndexQueue.PARTIAL_KEY, self.job.pk)])
+
+    def test_full_save_is_reindex(self):
+        """Test save không rõ field (hoặc có field text) => reindex cả document"""
+        from .signal_processors import JobIndexQueue
+
+        self.assertEqual(self._queued(), [(JobIndexQueue.FULL_KEY, self.job.pk)])
+        self.assertEqual(
+            self._queued(update_fields=frozenset({'title', 'status'})),
+            [(JobIndexQueue.FULL_KEY, self.job.pk)],
+        )
+
+    def test_partial_action_hides_closed_job_from_suggest(self):
+        """Test partial update gửi field nóng + suggest context 'hidden' khi job đóng"""
+        from .documents import SUGGEST_SCOPE_HIDDEN
+        from .signal_processors import JobIndexQueue
+
+        Job.objects.filter(pk=self.job.pk).update(status='CLOSED')
+
+        actions = list(JobIndexQueue.build_actions(set(), {self.job.pk}, {999}))
+
+        self.assertEqual(actions[0]['_op_type'], 'update')
+        self.assertEqual(actions[0]['doc']['status'], 'CLOSED')
+        self.assertEqual(actions[0]['doc']['suggest']['contexts'], {'scope': [SUGGEST_SCOPE_HIDDEN]})
+        self.assertEqual(actions[1], {'_op_type': 'delete', '_index': 'jobs', '_id': 999})
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class RecommendationsEndpointTest(APITestCase):
+    """Test endpoint gợi ý đọc list tính sẵn + job card cache"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.candidate = User.objects.create_user(
+            email='candidate@test.com',
+            username='candidate@test.com',
+            password='testpass123',
+            full_name='Test Candidate',
+            user_type='CANDIDATE'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+        self.jobs = [
+            Job.objects.create(
+                title=f'Python Developer {i}',
+                company=self.company,
+                location='Hà Nội',
+                description='Test',
+                requirements='Python',
+                benefits='Test',
+                deadline=timezone.now().date() + timedelta(days=30),
+                status='CLOSED' if i == 1 else 'PUBLISHED',
+            )
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.candidate)
+        self.url = reverse('v1:job-recommendations')
+
+    def test_returns_cards_in_ranked_order(self):
+        """Test giữ thứ tự score, bỏ job đã đóng, lần 2 chỉ đọc cache"""
+        from unittest import mock
+
+        ranked = [self.jobs[2].pk, self.jobs[1].pk, self.jobs[0].pk]
+        with mock.patch('apps.jobs.views.RecommendationStore.get', return_value=ranked):
+            response = self.client.get(self.url)
+            self.assertEqual(
+                [card['title'] for card in response.data],
+                ['Python Developer 2', 'Python Developer 0'],
+            )
+
+            # Chỉ job đã đóng (không có card) được query lại
+            with self.assertNumQueries(1):
+                self.client.get(self.url)
+
+    def test_requires_resume(self):
+        """Test ứng viên chưa có CV -> 400"""
+        from unittest import mock
+
+        with mock.patch('apps.jobs.views.RecommendationStore.get', return_value=None):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_nightly_refresh_dispatches_keyset_batches(self):
+        """Test nightly refresh chia khoảng pk theo lô, chạy trên số làn giới hạn, mỗi lô tính đúng ứng viên có CV"""
+        from unittest import mock
+        from apps.resumes.models import Resume
+        from . import tasks
+
+        candidates = [self.candidate] + [
+            User.objects.create_user(
+                email=f'candidate{i}@test.com',
+                username=f'candidate{i}@test.com',
+                password='testpass123',
+                full_name=f'Candidate {i}',
+                user_type='CANDIDATE'
+            )
+            for i in range(3)
+        ]
+        # candidate cuối chưa có CV, candidate đầu có 2 CV
+        for candidate in candidates[:1] + candidates[:3]:
+            Resume.objects.create(user=candidate, full_name=candidate.full_name, email=candidate.email, phone='0900')
+
+        with mock.patch.object(tasks, 'BATCH_SIZE', 2), \
+                mock.patch('apps.jobs.tasks.group') as group:
+            tasks.refresh_all_recommendations()
+
+        lanes = group.call_args.args[0]
+        ranges = [task.args for lane in lanes for task in lane.tasks]
+        self.assertEqual(ranges, [(0, candidates[1].pk), (candidates[1].pk, candidates[2].pk)])
+
+        with mock.patch('apps.jobs.recommendations.RecommendationStore.compute', return_value=1) as compute:
+            for low, high in ranges:
+                tasks.recompute_recommendations_batch(low, high)
+
+        self.assertEqual([call.args[0] for call in compute.call_args_list], [c.pk for c in candidates[:3]])
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobAlertSubscriptionTest(APITestCase):
+    """Test đăng ký job alert + percolator query"""
+
+    def setUp(self):
+        self.candidate = User.objects.create_user(
+            email='candidate@test.com',
+            username='candidate@test.com',
+            password='testpass123',
+            full_name='Test Candidate',
+            user_type='CANDIDATE'
+        )
+        self.client.force_authenticate(user=self.candidate)
+        self.url = reverse('v1:job-alerts-list')
+
+    def test_create_subscription(self):
+        """Test ứng viên tạo subscription"""
+        response = self.client.post(self.url, {'keywords': 'python', 'location': 'Hà Nội'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.candidate.job_alert_subscriptions.count(), 1)
+
+    def test_subscription_requires_criteria(self):
+        """Test subscription rỗng (nhận mọi job) bị từ chối"""
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_build_query_combines_criteria(self):
+        """Test các tiêu chí được AND: keywords/location là must, job_type/lương là filter"""
+        from .alerts import JobAlertPercolator
+        from .models import JobAlertSubscription
+
+        subscription = JobAlertSubscription(
+            user=self.candidate, keywords='python', job_type='FULL_TIME', salary_min=20000000,
+        )
+        query = JobAlertPercolator.build_query(subscription).to_dict()['bool']
+
+        self.assertEqual(query['must'][0]['multi_match']['query'], 'python')
+        self.assertEqual(query['filter'], [
+            {'term': {'job_type': 'FULL_TIME'}},
+            {'range': {'salary_max': {'gte': 20000000}}},
+        ])
+
+
+@override_settings(
+    **LOCAL_TEST_SETTINGS,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class DailyJobAlertDigestTest(TestCase):
+    """Test digest job alert: hydrate 1 query cho cả lô, mỗi job card render 1 lần"""
+
+    def setUp(self):
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company',
+            description='Test Description',
+            address='Test Address',
+            owner=self.recruiter
+        )
+        self.jobs = [
+            Job.objects.create(
+                title=f'Python Developer {i}',
+                company=self.company,
+                location='Hà Nội',
+                description='Test',
+                requirements='Python',
+                benefits='Test',
+                salary_min=10000000,
+                salary_max=20000000,
+                deadline=timezone.now().date() + timedelta(days=30),
+            )
+            for i in range(2)
+        ]
+        self.candidates = [
+            User.objects.create_user(
+                email=f'candidate{i}@test.com',
+                username=f'candidate{i}@test.com',
+                password='testpass123',
+                full_name=f'Candidate {i}',
+                user_type='CANDIDATE'
+            )
+            for i in range(3)
+        ]
+
+    def _subscribe(self):
+        from .models import JobAlertSubscription
+        for candidate in self.candidates:
+            JobAlertSubscription.objects.create(user=candidate, keywords='python')
+
+    def test_batch_renders_each_job_card_once(self):
+        """Test 3 ứng viên cùng 2 job => 3 query đọc + 1 INSERT outbox, 2 lần render fragment, 3 email"""
+        from unittest import mock
+        from django.core import mail
+        from apps.notifications.models import EmailOutbox
+        from .tasks import bulk_create_daily_job_alerts
+
+        self._subscribe()
+        pending = {candidate.pk: [job.pk for job in self.jobs] for candidate in self.candidates}
+
+        with mock.patch('apps.jobs.tasks.JobAlertPercolator.pending_job_pks', return_value=pending), \
+                mock.patch('apps.jobs.tasks.JobAlertPercolator.clear_pending') as clear_pending, \
+                mock.patch('apps.jobs.tasks.JobAlertRun.is_done', return_value=False), \
+                mock.patch('apps.jobs.tasks.JobAlertRun.mark_done') as mark_done, \
+                mock.patch('apps.jobs.tasks.render_to_string', wraps=render_to_string) as render:
+            # 1 query pk ứng viên trong khoảng + 1 query ứng viên + 1 query jobs cho cả lô
+            # + 1 INSERT outbox cho cả lô (trong savepoint: SAVEPOINT/RELEASE)
+            with self.assertNumQueries(6):
+                bulk_create_daily_job_alerts.apply(args=['2025-01-31', 0, self.candidates[-1].pk])
+
+        self.assertEqual(render.call_count, len(self.jobs))
+        # Digest vào outbox (worker `emails` gửi), không gửi SMTP trực tiếp
+        self.assertEqual(len(mail.outbox), 0)
+        queued = EmailOutbox.objects.order_by('to_email')
+        self.assertEqual(
+            [email.dedupe_key for email in queued],
+            [f'job-alert:2025-01-31:{candidate.pk}' for candidate in self.candidates],
+        )
+        self.assertIn('Python Developer 1', queued[0].html_body)
+        clear_pending.assert_called_once_with(pending)
+        mark_done.assert_called_once_with('2025-01-31', f'0-{self.candidates[-1].pk}', sent=3)
+
+    def test_clear_pending_removes_only_read_jobs(self):
+        """Test xóa hàng đợi = ZREM đúng các job đã đọc, không DEL cả key (job mới xếp vào không mất)"""
+        from unittest import mock
+        from .alerts import JobAlertPercolator
+
+        with mock.patch('apps.jobs.alerts.get_redis') as get_redis:
+            JobAlertPercolator.clear_pending({7: [3, 1], 9: [2]})
+
+        client = get_redis.return_value
+        pipe = client.pipeline.return_value
+        self.assertEqual(pipe.zrem.call_args_list, [
+            mock.call('jobs:alerts:pending:7', 3, 1),
+            mock.call('jobs:alerts:pending:9', 2),
+        ])
+        pipe.execute.assert_called_once()
+        client.delete.assert_not_called()
+
+    def test_retry_does_not_queue_duplicates(self):
+        """Test lô chạy lại (vd lỗi sau khi đã ghi outbox) không tạo email trùng"""
+        from unittest import mock
+        from apps.notifications.models import EmailOutbox
+        from .tasks import bulk_create_daily_job_alerts
+
+        self._subscribe()
+        pending = {candidate.pk: [self.jobs[0].pk] for candidate in self.candidates}
+
+        with mock.patch('apps.jobs.tasks.JobAlertPercolator.pending_job_pks', return_value=pending), \
+                mock.patch('apps.jobs.tasks.JobAlertPercolator.clear_pending'), \
+                mock.patch('apps.jobs.tasks.JobAlertRun.is_done', return_value=False), \
+                mock.patch('apps.jobs.tasks.JobAlertRun.mark_done'):
+            for _ in range(2):
+                bulk_create_daily_job_alerts.apply(args=['2025-01-31', 0, self.candidates[-1].pk])
+
+        self.assertEqual(EmailOutbox.objects.count(), 3)
+
+    def test_dispatch_skips_completed_batches(self):
+        """Test chạy lại cùng run_id chỉ phát các lô chưa xong"""
+        from unittest import mock
+        from . import tasks
+
+        self._subscribe()
+        last = self.candidates[-1].pk
+
+        with mock.patch.object(tasks, 'BATCH_SIZE', 2), \
+                mock.patch('apps.jobs.tasks.JobAlertRun.saved_ranges', return_value=None), \
+                mock.patch('apps.jobs.tasks.JobAlertRun.done_batches', return_value={f'0-{self.candidates[1].pk}'}), \
+                mock.patch('apps.jobs.tasks.JobAlertRun.start', side_effect=lambda run_id, ranges: ranges) as start, \
+                mock.patch('apps.jobs.tasks.group') as group:
+            tasks.send_daily_job_alerts.apply(args=['2025-01-31'])
+
+        start.assert_called_once_with('2025-01-31', [(0, self.candidates[1].pk), (self.candidates[1].pk, last)])
+        lanes = group.call_args.args[0]
+        self.assertEqual(len(lanes), 1)
+        self.assertEqual(
+            [task.args for task in lanes[0].tasks],
+            [('2025-01-31', self.candidates[1].pk, last)],
+        )
+
+    def test_resume_reuses_saved_ranges(self):
+        """Test chạy lại sau khi 1 ứng viên hủy đăng ký: giữ khoảng đã chốt, không chạy lại lô đã xong"""
+        from unittest import mock
+        from . import tasks
+
+        self._subscribe()
+        first, last = self.candidates[1].pk, self.candidates[-1].pk
+        saved = [(0, first), (first, last)]
+        # Khoảng đếm theo row sẽ dịch thành [(0, last)] => batch id đã xong không còn khớp
+        self.candidates[0].job_alert_subscriptions.update(is_active=False)
+
+        with mock.patch.object(tasks, 'BATCH_SIZE', 2), \
+                mock.patch('apps.jobs.tasks.JobAlertRun.saved_ranges', return_value=saved), \
+                mock.patch('apps.jobs.tasks.JobAlertRun.done_batches', return_value={f'0-{first}'}), \
+                mock.patch('apps.jobs.tasks.JobAlertRun.start', side_effect=lambda run_id, ranges: ranges) as start, \
+                mock.patch('apps.jobs.tasks.group') as group:
+            tasks.send_daily_job_alerts.apply(args=['2025-01-31'])
+
+        start.assert_called_once_with('2025-01-31', saved)
+        lanes = group.call_args.args[0]
+        self.assertEqual([task.args for task in lanes[0].tasks], [('2025-01-31', first, last)])
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobLocationTest(APITestCase):
+    """Test địa điểm chuẩn hóa: Job.location -> Location, filter theo tỉnh, percolator keyword filter"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # pytest chạy --nomigrations => seed danh mục địa điểm giống migration 0002
+        from importlib import import_module
+        from django.apps import apps
+        import_module('apps.core.migrations.0002_seed_locations').seed_locations(apps, None)
+
+    def setUp(self):
+        from django.core.cache import cache
+        from apps.core.models import Location
+
+        cache.clear()
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company', description='Test Description', address='Test Address', owner=self.recruiter,
+        )
+        self.hcm = Location.objects.get(slug='ho-chi-minh')
+        self.district = Location.objects.create(
+            name='Quận 1', slug='quan-1-ho-chi-minh', kind=Location.Kind.DISTRICT, parent=self.hcm,
+        )
+
+    def create_job(self, title, location):
+        return Job.objects.create(
+            title=title, company=self.company, location=location, job_type='FULL_TIME',
+            description='Test', requirements='Python', benefits='Test',
+            deadline=timezone.now().date() + timedelta(days=30), status='PUBLISHED',
+        )
+
+    def test_save_resolves_location(self):
+        """Test text tự do (viết tắt, không dấu, kèm quận) được map sang Location"""
+        self.assertEqual(self.create_job('A', 'TP. HCM').location_ref, self.hcm)
+        self.assertEqual(self.create_job('B', 'Quận 1, Hồ Chí Minh').location_ref, self.district)
+        self.assertIsNone(self.create_job('C', 'Sao Hỏa').location_ref)
+
+    def test_filter_by_province_includes_districts(self):
+        """Test ?location=Hồ Chí Minh khớp cả job ghi quận thuộc TP.HCM, không khớp tỉnh khác"""
+        self.create_job('Saigon Job', 'Sài Gòn')
+        self.create_job('District Job', 'Quận 1, TP.HCM')
+        self.create_job('Hanoi Job', 'Hà Nội')
+
+        response = self.client.get(reverse('v1:job-list'), {'location': 'Hồ Chí Minh'})
+
+        titles = {job['title'] for job in response.data['results']}
+        self.assertEqual(titles, {'Saigon Job', 'District Job'})
+
+    def test_document_location_fields(self):
+        """Test ES document: slug quận + tỉnh cha, tọa độ lấy từ tỉnh khi quận chưa có"""
+        from .documents import JobDocument
+
+        job = self.create_job('District Job', 'Quận 1, TP.HCM')
+        document = JobDocument()
+
+        self.assertEqual(document.prepare_location_slugs(job), ['quan-1-ho-chi-minh', 'ho-chi-minh'])
+        self.assertEqual(document.prepare_geo(job), {'lat': self.hcm.latitude, 'lon': self.hcm.longitude})
+
+    def test_alert_location_is_keyword_filter(self):
+        """Test subscription có địa điểm nhận ra được -> term filter thay vì fuzzy match"""
+        from .alerts import JobAlertPercolator
+        from .models import JobAlertSubscription
+
+        query = JobAlertPercolator.build_query(JobAlertSubscription(location='tp hcm')).to_dict()['bool']
+
+        self.assertEqual(query['filter'], [{'term': {'location_slugs': 'ho-chi-minh'}}])
+
+
+@override_settings(**LOCAL_TEST_SETTINGS)
+class JobExpiryTest(TestCase):
+    """Test tự đóng job quá deadline theo lô + đồng bộ ES + notification cho recruiter theo từng lô/công ty"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company', description='Test Description', address='Test Address', owner=self.recruiter,
+        )
+
+    def create_job(self, title, days_left, status='PUBLISHED'):
+        return Job.objects.create(
+            title=title, company=self.company, location='Hà Nội', job_type='FULL_TIME',
+            description='Test', requirements='Python', benefits='Test',
+            deadline=timezone.now().date() + timedelta(days=days_left), status=status,
+        )
+
+    def test_close_expired_in_batches(self):
+        """Test chỉ job PUBLISHED quá hạn bị đóng, ES nhận partial update, mỗi lô đã commit có 1 notification"""
+        from unittest import mock
+        from apps.notifications.models import Notification
+        from .expiry import JobExpiryService
+
+        expired = [self.create_job(f'Expired {index}', -1 - index) for index in range(3)]
+        active = self.create_job('Active', 10)
+        draft = self.create_job('Old Draft', -5, status='DRAFT')
+
+        with mock.patch('apps.jobs.expiry.JobExpiryService.sync_search_index') as sync, \
+                mock.patch('apps.notifications.signals.send_websocket_notification'):
+            stats = JobExpiryService.close_expired(batch_size=2)
+
+        self.assertEqual(stats, {'closed': 3, 'recruiters': 1})
+        self.assertEqual(
+            set(Job.objects.filter(status='CLOSED').values_list('pk', flat=True)),
+            {job.pk for job in expired},
+        )
+        active.refresh_from_db()
+        draft.refresh_from_db()
+        self.assertEqual((active.status, draft.status), ('PUBLISHED', 'DRAFT'))
+        self.assertEqual([len(call.args[0]) for call in sync.call_args_list], [2, 1])
+
+        notifications = Notification.objects.filter(recipient=self.recruiter).order_by('created_at')
+        self.assertEqual(notifications.count(), 2)
+        self.assertEqual([n.description.count('Expired') for n in notifications], [2, 1])
+        self.assertEqual({n.object_id for n in notifications}, {self.company.id})
+
+    def test_one_notification_per_company(self):
+        """Test recruiter có nhiều công ty: mỗi công ty 1 notification trỏ đúng công ty đó"""
+        from unittest import mock
+        from apps.notifications.models import Notification
+        from .expiry import JobExpiryService
+
+        other_company = Company.objects.create(
+            name='Other Company', description='Test Description', address='Test Address', owner=self.recruiter,
+        )
+        self.create_job('Expired A', -1)
+        Job.objects.create(
+            title='Expired B', company=other_company, location='Hà Nội', job_type='FULL_TIME',
+            description='Test', requirements='Python', benefits='Test',
+            deadline=timezone.now().date() - timedelta(days=2), status='PUBLISHED',
+        )
+
+        with mock.patch('apps.jobs.expiry.JobExpiryService.sync_search_index'), \
+                mock.patch('apps.notifications.signals.send_websocket_notification'):
+            stats = JobExpiryService.close_expired()
+
+        self.assertEqual(stats, {'closed': 2, 'recruiters': 1})
+        notifications = Notification.objects.filter(recipient=self.recruiter)
+        self.assertEqual(
+            {(n.object_id, 'Expired A' in n.description, 'Expired B' in n.description) for n in notifications},
+            {(self.company.id, True, False), (other_company.id, False, True)},
+        )
+
+    def test_committed_batch_notified_when_later_step_fails(self):
+        """Test lỗi sau khi lô đầu đã commit (ES sync): job đã đóng vẫn có notification"""
+        from unittest import mock
+        from apps.notifications.models import Notification
+        from .expiry import JobExpiryService
+
+        for index in range(3):
+            self.create_job(f'Expired {index}', -1 - index)
+
+        with mock.patch(
+            'apps.jobs.expiry.JobExpiryService.sync_search_index', side_effect=RuntimeError('ES down'),
+        ), mock.patch('apps.notifications.signals.send_websocket_notification'):
+            with self.assertRaises(RuntimeError):
+                JobExpiryService.close_expired(batch_size=2)
+
+        self.assertEqual(Job.objects.filter(status='CLOSED').count(), 2)
+        notification = Notification.objects.get(recipient=self.recruiter)
+        self.assertEqual(notification.description.count('Expired'), 2)
+
+    def test_nothing_expired(self):
+        """Test không có job hết hạn: không gọi ES, không tạo notification"""
+        from unittest import mock
+        from apps.notifications.models import Notification
+        from .expiry import JobExpiryService
+
+        self.create_job('Active', 10)
+
+        with mock.patch('apps.jobs.expiry.JobExpiryService.sync_search_index') as sync:
+            stats = JobExpiryService.close_expired()
+
+        self.assertEqual(stats, {'closed': 0, 'recruiters': 0})
+        sync.assert_not_called()
+        self.assertFalse(Notification.objects.exists())
+
+
+@override_settings(
+    **LOCAL_TEST_SETTINGS,
+    JOB_SEARCH_CIRCUIT_FAILURE_THRESHOLD=2,
+)
+class SearchBackendRouterTest(TestCase):
+    """Test search/recommendation tự chuyển sang Postgres khi ES lỗi, hoặc chạy hẳn không ES"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_falls_back_to_postgres_and_opens_circuit(self):
+        from unittest import mock
+        from .search_backends import ElasticsearchSearchBackend, PostgresSearchBackend, SearchBackendRouter
+
+        page = {'results': [], 'next_cursor': None, 'facets': None}
+        with mock.patch.object(ElasticsearchSearchBackend, 'search_page', side_effect=ConnectionError) as es, \
+                mock.patch.object(PostgresSearchBackend, 'search_page', return_value=page) as pg:
+            for _ in range(3):
+                self.assertEqual(SearchBackendRouter.call('search_page', 'python', None, 20, {}), page)
+
+        # 2 lần lỗi mở mạch => lần thứ 3 không gọi ES nữa
+        self.assertEqual(es.call_count, 2)
+        self.assertEqual(pg.call_count, 3)
+
+    @override_settings(JOB_SEARCH_BACKEND='postgres')
+    def test_postgres_only_never_calls_elasticsearch(self):
+        from unittest import mock
+        from .search import JobSearchService
+        from .search_backends import ElasticsearchSearchBackend, PostgresSearchBackend
+
+        with mock.patch.object(ElasticsearchSearchBackend, 'recommend') as es, \
+                mock.patch.object(PostgresSearchBackend, 'recommend', return_value=[[1, 0.5]]) as pg:
+            self.assertEqual(JobSearchService.recommend('Python Developer', ['Django']), [[1, 0.5]])
+
+        es.assert_not_called()
+        pg.assert_called_once_with('Python Developer', ['django'], 10)
+
+    def test_postgres_query_folds_accents(self):
+        """Test tsquery: bỏ dấu như lúc build search_vector, mỗi từ là prefix term OR"""
+        from .search_backends import PostgresSearchBackend
+
+        query = PostgresSearchBackend.build_query('Lập trình  Python lập')
+        self.assertEqual(query.source_expressions[-1].value, 'lap:* | trinh:* | python:*')
+        self.assertIsNone(PostgresSearchBackend.build_query(' - '))
+
+
+@override_settings(
+    **LOCAL_TEST_SETTINGS,
+    JOB_SEARCH_BACKEND='memory',
+)
+class MemorySearchBackendTest(APITestCase):
+    """Test inverted index trong process: BM25, filter + cursor qua API, cập nhật theo signal, snapshot"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .memory_search import MemoryJobIndex
+
+        cache.clear()
+        MemoryJobIndex.reset()
+        self.addCleanup(MemoryJobIndex.reset)
+
+        self.recruiter = User.objects.create_user(
+            email='recruiter@test.com',
+            username='recruiter@test.com',
+            password='testpass123',
+            full_name='Test Recruiter',
+            user_type='RECRUITER'
+        )
+        self.company = Company.objects.create(
+            name='Test Company', description='Test Description', address='Test Address', owner=self.recruiter,
+        )
+        self.python_job = self.create_job('Lập trình viên Python', 'Django, REST', 'FULL_TIME')
+        self.backend_job = self.create_job('Backend Developer', 'Python, Go', 'PART_TIME')
+        self.create_job('Kế toán tổng hợp', 'Excel', 'FULL_TIME')
+
+    def create_job(self, title, requirements, job_type):
+        return Job.objects.create(
+            title=title, company=self.company, location='Hà Nội', job_type=job_type,
+            description='Mô tả công việc', requirements=requirements, benefits='Test',
+            deadline=timezone.now().date() + timedelta(days=30), status='PUBLISHED',
+        )
+
+    def test_search_ranks_filters_and_paginates(self):
+        """Test từ khóa không dấu khớp tiêu đề có dấu, title xếp trên requirements, cursor sang trang 2"""
+        url = reverse('v1:job-list')
+
+        response = self.client.get(url, {'search': 'lap trinh python', 'page_size': 1})
+        self.assertEqual([job['title'] for job in response.data['results']], ['Lập trình viên Python'])
+        self.assertEqual(response.data['facets']['job_type'], [
+            {'key': 'FULL_TIME', 'count': 1}, {'key': 'PART_TIME', 'count': 1},
+        ])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([job['title'] for job in response.data['results']], ['Backend Developer'])
+
+        response = self.client.get(url, {'search': 'pyth', 'job_type': 'PART_TIME'})
+        self.assertEqual([job['id'] for job in response.data['results']], [str(self.backend_job.id)])
+
+    def test_signals_update_loaded_index(self):
+        """Test job đóng/sửa tiêu đề -> index của process cập nhật ngay sau commit"""
+        from .memory_search import MemorySearchBackend
+
+        MemorySearchBackend.search_page('python', None, 20, {})  # Load index
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python_job.status = 'CLOSED'
+            self.python_job.save(update_fields=['status'])
+            self.backend_job.title = 'Golang Engineer'
+            self.backend_job.save()
+
+        self.assertEqual(MemorySearchBackend.search_page('python', None, 20, {})['results'][0]['title'],
+                         'Golang Engineer')
+        self.assertEqual(len(MemorySearchBackend.search_page('lap trinh', None, 20, {})['results']), 0)
+
+    def test_snapshot_round_trip(self):
+        """Test snapshot ghi/đọc lại cho cùng kết quả, không cần build lại từ DB"""
+        import os
+        import tempfile
+        from .memory_search import MemoryJobIndex
+
+        index = MemoryJobIndex().build()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.pkl')
+            index.save_snapshot(path)
+            with self.assertNumQueries(0):
+                restored = MemoryJobIndex.load_snapshot(path)
+
+        self.assertEqual(restored.score('python developer'), index.score('python developer'))
+        self.assertEqual(restored.live, 3)
@@ -1,11 +1,13 @@
 # apps/jobs/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import JobViewSet, SavedJobViewSet
+from .views import JobViewSet, SavedJobViewSet, JobAlertSubscriptionViewSet
 
 router = DefaultRouter()
-router.register(r'', JobViewSet, basename='job')  # Fixed: Use empty string for cleaner URLs
+# Đăng ký trước JobViewSet: route detail của prefix rỗng sẽ nuốt mất 'alerts/', 'saved/'
+router.register(r'alerts', JobAlertSubscriptionViewSet, basename='job-alerts')
 router.register(r'saved', SavedJobViewSet, basename='saved-jobs')
+router.register(r'', JobViewSet, basename='job')  # Fixed: Use empty string for cleaner URLs
 
 urlpatterns = [
     path('', include(router.urls)),
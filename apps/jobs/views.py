@@ -1,35 +1,52 @@
 from rest_framework import viewsets, permissions, filters
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-# Import Q từ elasticsearch_dsl và đổi tên để tránh nhầm với Django Q
-from elasticsearch_dsl import Q as ES_Q
-
-from .models import Job, SavedJob
-from .serializers import JobSerializer, SavedJobSerializer
-# Import Document Elasticsearch đã định nghĩa
-from .documents import JobDocument
-from apps.resumes.models import Resume
+from django.db.models import Max, Sum
+
+from apps.core.conditional import ConditionalGetMixin, conditional_response, content_etag, make_etag
+from apps.core.fast_serializers import FastListMixin
+from apps.core.fieldsets import SparseFieldsetMixin
+from .filters import JobFilter
+from .models import Job, SavedJob, JobAlertSubscription
+from .serializers import JobSerializer, SavedJobSerializer, JobAlertSubscriptionSerializer
 from .services import JobService  # Import Service Layer
+from .search import JobSearchService, InvalidCursor
+from .cache import JobDetailCache, JobCardCache, JobSearchCache
+from .counters import JobViewCounter
+from .recommendations import RecommendationStore
 
 # ====================================================================
 # JOB VIEWSET (ELASTICSEARCH INTEGRATED)
 # ====================================================================
-class JobViewSet(viewsets.ModelViewSet):
+class JobViewSet(ConditionalGetMixin, FastListMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     # Queryset gốc vẫn dùng DB cho các tác vụ CRUD cơ bản
     queryset = Job.objects.select_related('company').filter(status='PUBLISHED').order_by('-created_at')
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    # ETag của list: views_count flush bằng update() (không đổi updated_at)
+    # Công ty đổi tên/logo => card được render lại kèm updated_at của job (apps/jobs/cards.py)
+    conditional_list_aggregates = {
+        **ConditionalGetMixin.conditional_list_aggregates,
+        'views': Sum('views_count'),
+    }
+
+    def get_list_aggregates(self):
+        aggregates = super().get_list_aggregates()
+        if self.has_custom_fieldset():
+            # ?fields= / ?expand= có thể chọn field công ty ngoài card
+            aggregates = {**aggregates, 'company_modified': Max('company__updated_at')}
+        return aggregates
     
     # Filter của DRF chỉ áp dụng khi không search hoặc search trên DB
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['job_type', 'location']
+    filterset_class = JobFilter
     ordering_fields = ['created_at', 'salary_max', 'views_count']
 
     def list(self, request, *args, **kwargs):
@@ -40,33 +57,22 @@ class JobViewSet(viewsets.ModelViewSet):
         search_term = request.query_params.get('search', '')
         
         # 1. Nếu KHÔNG có từ khóa -> Dùng logic mặc định của Django (DB)
-        if not search_term:
+        # (trừ tìm theo vị trí ?near=lat,lon: geo_distance chỉ có trên ES)
+        if not search_term and not request.query_params.get('near'):
             return super().list(request, *args, **kwargs)
 
         # 2. Nếu CÓ từ khóa -> Dùng Elasticsearch
-        # Get search config from settings (externalized for easy tuning)
-        title_boost = getattr(settings, 'ES_SEARCH_TITLE_BOOST', 3)
-        fuzziness = getattr(settings, 'ES_SEARCH_FUZZINESS', 'AUTO')
-        search_fields = getattr(settings, 'ES_SEARCH_FIELDS', [
-            'title', 'requirements', 'description', 'company.name'
-        ])
-        
-        # Build search fields with title boost
-        fields_with_boost = [f'{search_fields[0]}^{title_boost}'] + search_fields[1:]
-        
-        # Tìm kiếm trên nhiều trường với configurable boost
-        q = ES_Q("multi_match", 
-                query=search_term, 
-                fields=fields_with_boost,
-                fuzziness=fuzziness)
+        # Mặc định trả job card trực tiếp từ `_source` + search_after cursor (không hit DB)
+        if getattr(settings, 'ES_SEARCH_SERVE_FROM_SOURCE', True) or not search_term:
+            return self._search_from_source(request, search_term)
 
-        # CRITICAL FIX #2: Filter both PUBLISHED and NOT soft-deleted at search time
-        search = JobDocument.search().query(q).filter('term', status='PUBLISHED').filter('term', is_deleted=False)
+        # Legacy mode: ES -> to_queryset() -> Postgres (giữ lại để so sánh/rollback)
+        search = JobSearchService.published_search().query(JobSearchService.build_query(search_term))
 
         # Convert kết quả ES về Django QuerySet (giữ nguyên thứ tự Rank)
         qs = search.to_queryset()
 
-        # Phân trang kết quả
+        # Phân trang kết quả (thứ tự rank không keyset được => paginator tự dùng offset, xem apps/core/pagination.py)
         page = self.paginate_queryset(qs)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -75,6 +81,46 @@ class JobViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
+    def _search_from_source(self, request, search_term):
+        """
+        Search mode không dùng DB: build response từ hit `_source`,
+        phân trang bằng cursor (search_after) thay vì offset.
+        Filter (job_type, location, salary_min/max, deadline_after, near/radius) chạy như ES `filter`,
+        facet counts trả về trong cùng response.
+        Index chưa đổi (generation của JobSearchCache) => If-None-Match khớp trả 304, không chạy search.
+        """
+        etag = make_etag(request, 'search', JobSearchCache.get_generation())
+        return conditional_response(request, etag, None, lambda: Response(self._search_page(request, search_term)))
+
+    def _search_page(self, request, search_term):
+        try:
+            page = JobSearchService.search_page(
+                search_term,
+                cursor=request.query_params.get('cursor'),
+                page_size=request.query_params.get('page_size'),
+                filters=JobSearchService.parse_filters(request.query_params),
+            )
+        except InvalidCursor:
+            raise NotFound(_("Invalid cursor"))
+
+        for card in page['results']:
+            logo = card['company_info'].get('logo')
+            if logo and not logo.startswith('http'):
+                card['company_info']['logo'] = request.build_absolute_uri(logo)
+
+        next_url = None
+        if page['next_cursor']:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', page['next_cursor'])
+
+        data = {
+            'next': next_url,
+            'results': page['results'],
+        }
+        # Facets (job_type, location, salary_max) chỉ có ở trang đầu
+        if page['facets'] is not None:
+            data['facets'] = page['facets']
+        return data
+
     def perform_create(self, serializer):
         """
         Refactored: Sử dụng JobService thay vì xử lý logic trong View
@@ -86,65 +132,83 @@ class JobViewSet(viewsets.ModelViewSet):
             validated_data=serializer.validated_data
         )
     
-    @method_decorator(cache_page(60 * 15))  # CRITICAL FIX: Cache job detail for 15 minutes
     def retrieve(self, request, *args, **kwargs):
         """
-        Get single job detail - cached for performance
-        Cache invalidated on job update/delete via signals
+        Get single job detail - cached per job (JobDetailCache)
+        Cache invalidated theo tag khi Job save/soft delete hoặc Company update (apps/jobs/signals.py)
+        Lượt xem ghi vào buffer Redis (JobViewCounter), flush định kỳ => không ghi DB mỗi request
         """
-        return super().retrieve(request, *args, **kwargs)
+        lookup_value = kwargs[self.lookup_url_kwarg or self.lookup_field]
+
+        if self.has_custom_fieldset():
+            # ?fields= / ?expand=: response khác bản đầy đủ trong cache => serialize trực tiếp, không ghi cache
+            instance = self.get_object()
+            JobViewCounter.record(instance.pk)
+            data = self.get_serializer(instance).data
+            return conditional_response(request, content_etag(request, data), None, lambda: Response(data))
+
+        entry = JobDetailCache.get(lookup_value)
+        if entry is None:
+            # Version tag đọc trước khi load job: save xen vào giữa lúc đọc DB và lúc ghi cache
+            # => entry ghi ra đã lệch version (miss ở lần sau) thay vì giữ bản cũ tới hết TTL
+            keys = (
+                self.get_queryset().order_by()
+                .filter(**{self.lookup_field: lookup_value}).values_list('pk', 'company_id').first()
+            )
+            versions = JobDetailCache.tag_versions(*keys) if keys else None
+            instance = self.get_object()
+            entry = JobDetailCache.set(
+                lookup_value, instance, dict(self.get_serializer(instance).data), versions=versions,
+            )
+
+        JobViewCounter.record(entry['pk'])
+        # ETag theo hash nội dung lưu cùng bản cache: poll lại khi job chưa đổi => 304, chỉ tốn 1 lần đọc cache
+        etag = make_etag(request, entry['digest'])
+        return conditional_response(request, etag, None, lambda: Response(entry['data']))
+
+    @action(detail=False, methods=['get'], url_path='autocomplete', permission_classes=[permissions.AllowAny])
+    def autocomplete(self, request):
+        """
+        Gợi ý tiêu đề khi gõ (type-ahead) - dùng completion suggester, không chạy full search
+        GET /api/v1/jobs/autocomplete/?q=pyth&job_type=FULL_TIME&location=Hà Nội
+        """
+        results = JobSearchService.autocomplete(
+            request.query_params.get('q', ''),
+            job_type=request.query_params.get('job_type'),
+            location=request.query_params.get('location'),
+            size=request.query_params.get('size'),
+        )
+        return Response({'results': results})
 
     @action(detail=False, methods=['get'], url_path='recommendations')
     def recommendations(self, request):
         """
-        Gợi ý việc làm thông minh sử dụng Elasticsearch Bool Query
+        Gợi ý việc làm: đọc danh sách tính sẵn (RecommendationStore - Redis ZSET)
+        rồi hydrate job card từ JobCardCache (chỉ job miss mới query DB)
         """
         user = request.user
         if user.user_type != 'CANDIDATE':
             return Response({"detail": "Chỉ dành cho ứng viên."}, status=403)
 
-        # Lấy CV chính
-        resume = Resume.objects.filter(user=user, is_primary=True).first()
-        if not resume:
-            resume = Resume.objects.filter(user=user).order_by('-created_at').first()
-        
-        if not resume:
-            return Response({"detail": "Bạn cần tạo hồ sơ (CV) trước."}, status=400)
+        ranked_pks = RecommendationStore.get(user.pk, limit=10)
+        if ranked_pks is None:
+            # Lần đầu (hoặc list đã hết hạn): tính đồng bộ 1 lần
+            if not RecommendationStore.compute(user.pk):
+                return Response({"detail": "Bạn cần tạo hồ sơ (CV) trước."}, status=400)
+            ranked_pks = RecommendationStore.get(user.pk, limit=10)
 
-        # --- ELASTICSEARCH RECOMMENDATION LOGIC ---
-        should_conditions = []
-        
-        # 1. Matching Tiêu đề CV (Boost 2.0 - Quan trọng)
-        # Nếu CV là "Python Developer", ưu tiên Job có title chứa từ này
-        if resume.title:
-            should_conditions.append(
-                ES_Q('match', title={'query': resume.title, 'boost': 2.0})
-            )
-        
-        # 2. Matching Kỹ năng (Boost 1.0 - Bình thường)
-        # Tìm các skill của ứng viên trong phần Yêu cầu & Mô tả của Job
-        user_skills = list(resume.skills.values_list('name', flat=True))
-        for skill in user_skills:
-            should_conditions.append(ES_Q('match', requirements=skill))
-            should_conditions.append(ES_Q('match', description=skill))
-
-        # 3. Tạo Bool Query: "SHOULD" 
-        # Càng thỏa mãn nhiều điều kiện skill/title thì điểm (score) càng cao
-        q = ES_Q('bool', should=should_conditions, minimum_should_match=1)
-
-        # 4. Execute Search
-        search = JobDocument.search().query(q).filter('term', status='PUBLISHED')
-        
-        # Lấy 10 kết quả tốt nhất (ES tự động sort theo _score giảm dần)
-        qs = search.to_queryset()[:10]
+        def load_cards(missing_pks):
+            jobs = Job.objects.select_related('company').filter(status='PUBLISHED').in_bulk(missing_pks)
+            return [(job, dict(self.get_serializer(job).data)) for job in jobs.values()]
 
-        serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data)
+        # Giữ nguyên thứ tự score; job đã đóng/xóa không có card => bị bỏ qua
+        cards = JobCardCache.get_many(ranked_pks, load_cards)
+        return Response([cards[pk] for pk in ranked_pks if pk in cards])
 
 # ====================================================================
 # SAVED JOB VIEWSET
 # ====================================================================
-class SavedJobViewSet(viewsets.ModelViewSet):
+class SavedJobViewSet(FastListMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     API Quản lý việc làm đã lưu (Bookmarks) - Giữ nguyên dùng DB
     """
@@ -155,4 +219,21 @@ class SavedJobViewSet(viewsets.ModelViewSet):
         return SavedJob.objects.filter(user=self.request.user).select_related('job', 'job__company').order_by('-created_at')
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
\ No newline at end of file
+        serializer.save(user=self.request.user)
+# ====================================================================
+# JOB ALERT SUBSCRIPTION VIEWSET
+# ====================================================================
+class JobAlertSubscriptionViewSet(viewsets.ModelViewSet):
+    """
+    API Quản lý tiêu chí nhận email việc làm mới (percolator - xem apps/jobs/alerts.py)
+    """
+    serializer_class = JobAlertSubscriptionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return JobAlertSubscription.objects.filter(user=self.request.user).order_by('-created_at')
+
+    def perform_create(self, serializer):
+        if self.request.user.user_type != 'CANDIDATE':
+            raise PermissionDenied(_("Only candidates can subscribe to job alerts."))
+        serializer.save(user=self.request.user)
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth import get_user_model
@@ -18,4 +19,41 @@ class Notification(TimeStampedModel):
     is_read = models.BooleanField(default=False)
 
     def __str__(self):
-        return f"Noti for {self.recipient.email}: {self.verb}"
\ No newline at end of file
+        return f"Noti for {self.recipient.email}: {self.verb}"
+
+class EmailOutbox(TimeStampedModel):
+    """
+    Email chờ gửi (transactional outbox)
+    Ghi cùng transaction nghiệp vụ => rollback thì không có mail, commit thì chắc chắn được gửi
+    Worker `deliver_email_outbox` đọc bảng này và gửi theo lô (xem apps/notifications/outbox.py)
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    # Task retry / signal chạy lại ghi cùng key => INSERT bị bỏ qua, không gửi trùng
+    dedupe_key = models.CharField(max_length=255, unique=True)
+    to_email = models.EmailField()
+    domain = models.CharField(max_length=255, db_index=True)  # Rate limit theo domain người nhận
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    # [{'filename': ..., 'content': ..., 'mimetype': ..., 'base64': bool}]
+    attachments = models.JSONField(default=list, blank=True)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.status} {self.to_email}: {self.subject}"
@@ -0,0 +1,268 @@
+"""
+Email Outbox
+Mọi email giao dịch đi qua bảng EmailOutbox thay vì gọi send_mail trực tiếp
+
+WHY?
+- Mỗi send_mail/EmailMessage.send() = 1 connection SMTP (handshake + TLS + AUTH) cho 1 email
+- Task retry / signal chạy lại => gửi trùng
+- Gửi trong request/transaction => mail đi dù transaction rollback
+
+HOW IT WORKS:
+- enqueue(): INSERT vào EmailOutbox trong transaction hiện tại (dedupe_key unique => bỏ qua bản trùng)
+- Sau commit: hẹn task deliver_email_outbox (debounce, queue `emails`)
+- Worker claim 1 lô (SELECT ... FOR UPDATE SKIP LOCKED => nhiều worker không giành nhau)
+- Áp rate limit theo domain người nhận (đếm theo phút), phần vượt dời sang phút sau
+- Gửi qua connection SMTP giữ mở giữa các lô (mỗi worker process 1 connection)
+- Lỗi => retry với backoff lũy thừa, quá EMAIL_OUTBOX_MAX_ATTEMPTS thì FAILED
+
+USAGE:
+    from apps.notifications.outbox import EmailOutboxService
+
+    with transaction.atomic():
+        interview = serializer.save()
+        EmailOutboxService.enqueue(
+            to_email=candidate.email, subject=subject, body=body,
+            dedupe_key=f"interview-invite:{interview.pk}",
+        )
+"""
+import base64
+import logging
+import smtplib
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """
+    Connection SMTP sống lâu, dùng chung cho mọi lô trong 1 worker process
+    (worker chạy -c N => N connection). Mở lại khi quá EMAIL_OUTBOX_CONNECTION_MAX_AGE
+    hoặc khi server đã cắt.
+    """
+
+    _connection = None
+    _opened_at = 0.0
+
+    @classmethod
+    def get(cls):
+        max_age = getattr(settings, 'EMAIL_OUTBOX_CONNECTION_MAX_AGE', 300)
+        if cls._connection is not None and time.monotonic() - cls._opened_at > max_age:
+            cls.close()
+
+        if cls._connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            cls._connection, cls._opened_at = connection, time.monotonic()
+        return cls._connection
+
+    @classmethod
+    def close(cls):
+        if cls._connection is not None:
+            try:
+                cls._connection.close()
+            except Exception:
+                pass  # Server đã cắt trước đó
+            cls._connection = None
+
+
+class EmailOutboxService:
+    """Ghi email vào outbox + gửi theo lô"""
+
+    KICK_KEY = 'notifications:outbox:kick_scheduled'
+    RATE_PREFIX = 'notifications:outbox:rate:'
+    # Lỗi từ phía người nhận: retry cũng không gửi được
+    PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused,)
+
+    @staticmethod
+    def build(to_email, subject, body, dedupe_key=None, html_body='', attachments=()):
+        """
+        EmailOutbox chưa lưu
+
+        Args:
+            dedupe_key: định danh nghiệp vụ của email (vd: 'welcome:<user pk>'), None => không dedupe
+            attachments: [(filename, content str|bytes, mimetype), ...]
+        """
+        stored = []
+        for filename, content, mimetype in attachments:
+            is_binary = isinstance(content, bytes)
+            stored.append({
+                'filename': filename,
+                'content': base64.b64encode(content).decode() if is_binary else content,
+                'mimetype': mimetype,
+                'base64': is_binary,
+            })
+
+        return EmailOutbox(
+            dedupe_key=dedupe_key or f"uuid:{uuid.uuid4().hex}",
+            to_email=to_email,
+            domain=to_email.rsplit('@', 1)[-1].lower(),
+            subject=str(subject)[:255],
+            body=str(body),
+            html_body=html_body or '',
+            attachments=stored,
+        )
+
+    @classmethod
+    def enqueue(cls, to_email, subject, body, dedupe_key=None, html_body='', attachments=()):
+        """Ghi 1 email vào outbox (trong transaction hiện tại nếu có)"""
+        cls.enqueue_many([cls.build(to_email, subject, body, dedupe_key, html_body, attachments)])
+
+    @classmethod
+    def enqueue_many(cls, emails):
+        """1 câu INSERT cho nhiều email; bản trùng dedupe_key bị bỏ qua (ON CONFLICT DO NOTHING)"""
+        if not emails:
+            return
+        EmailOutbox.objects.bulk_create(emails, ignore_conflicts=True)
+        transaction.on_commit(cls.kick)
+
+    @classmethod
+    def kick(cls):
+        """Hẹn worker gửi ngay (gộp nhiều enqueue liên tiếp thành 1 task)"""
+        delay = getattr(settings, 'EMAIL_OUTBOX_KICK_DELAY', 1)
+        try:
+            if cache.add(cls.KICK_KEY, 1, timeout=delay * 10):
+                from .tasks import deliver_email_outbox
+                deliver_email_outbox.apply_async(countdown=delay)
+        except Exception as e:
+            # Email đã nằm trong outbox, lượt beat kế tiếp sẽ gửi
+            logger.warning(f"Could not schedule email outbox delivery: {e}")
+
+    @staticmethod
+    def claim(batch_size):
+        """
+        Lấy 1 lô email đến hạn và đánh dấu SENDING
+        SENDING quá EMAIL_OUTBOX_SENDING_TIMEOUT (worker chết giữa chừng) được lấy lại
+        """
+        now = timezone.now()
+        stale_before = now - timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_SENDING_TIMEOUT', 600))
+        due = (
+            Q(status=EmailOutbox.Status.PENDING, next_attempt_at__lte=now)
+            | Q(status=EmailOutbox.Status.SENDING, updated_at__lt=stale_before)
+        )
+
+        with transaction.atomic():
+            pks = list(
+                EmailOutbox.objects.select_for_update(skip_locked=True)
+                .filter(due).order_by('next_attempt_at')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            EmailOutbox.objects.filter(pk__in=pks).update(status=EmailOutbox.Status.SENDING, updated_at=now)
+        return list(EmailOutbox.objects.filter(pk__in=pks).order_by('next_attempt_at'))
+
+    @classmethod
+    def acquire(cls, domain, wanted):
+        """Xin quota gửi tới domain trong phút hiện tại, trả về số email được phép gửi"""
+        limits = getattr(settings, 'EMAIL_OUTBOX_DOMAIN_RATE_LIMITS', {})
+        limit = limits.get(domain, getattr(settings, 'EMAIL_OUTBOX_DEFAULT_RATE_LIMIT', 300))
+
+        key = f"{cls.RATE_PREFIX}{domain}:{int(time.time() // 60)}"
+        cache.add(key, 0, timeout=120)
+        used = cache.incr(key, wanted)
+        return max(0, min(wanted, limit - (used - wanted)))
+
+    @staticmethod
+    def to_message(email):
+        message = EmailMultiAlternatives(
+            email.subject, email.body, settings.DEFAULT_FROM_EMAIL, [email.to_email],
+        )
+        if email.html_body:
+            message.attach_alternative(email.html_body, 'text/html')
+        for attachment in email.attachments:
+            content = attachment['content']
+            if attachment.get('base64'):
+                content = base64.b64decode(content)
+            message.attach(attachment['filename'], content, attachment['mimetype'])
+        return message
+
+    @classmethod
+    def send(cls, email):
+        """Gửi qua connection chung; server đã cắt connection thì mở lại và thử 1 lần nữa"""
+        try:
+            return SMTPConnectionPool.get().send_messages([cls.to_message(email)])
+        except smtplib.SMTPServerDisconnected:
+            SMTPConnectionPool.close()
+            return SMTPConnectionPool.get().send_messages([cls.to_message(email)])
+
+    @staticmethod
+    def backoff(attempts):
+        base = getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE_DELAY', 60)
+        return timedelta(seconds=min(base * 2 ** (attempts - 1), 60 * 60 * 6))
+
+    @staticmethod
+    def batch_size():
+        return getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 100)
+
+    @classmethod
+    def drain(cls, batch_size=None):
+        """
+        Gửi 1 lô
+
+        Returns:
+            dict: claimed/sent/retry/failed/deferred
+        """
+        emails = cls.claim(batch_size or cls.batch_size())
+        stats = {'claimed': len(emails), 'sent': 0, 'retry': 0, 'failed': 0, 'deferred': 0}
+        if not emails:
+            return stats
+
+        by_domain = {}
+        for email in emails:
+            by_domain.setdefault(email.domain, []).append(email)
+
+        max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+        sent, updated = [], []
+        now = timezone.now()
+        next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+        for domain, group in by_domain.items():
+            allowed = cls.acquire(domain, len(group))
+            for email in group[allowed:]:
+                # Hết quota phút này: không tính là 1 lần thử
+                email.status = EmailOutbox.Status.PENDING
+                email.next_attempt_at = next_minute
+                updated.append(email)
+                stats['deferred'] += 1
+
+            for email in group[:allowed]:
+                try:
+                    cls.send(email)
+                except Exception as e:
+                    email.attempts += 1
+                    email.last_error = f"{type(e).__name__}: {e}"[:2000]
+                    if email.attempts >= max_attempts or isinstance(e, cls.PERMANENT_ERRORS):
+                        email.status = EmailOutbox.Status.FAILED
+                        stats['failed'] += 1
+                        logger.error(f"Email {email.pk} to {email.to_email} failed permanently: {e}")
+                    else:
+                        email.status = EmailOutbox.Status.PENDING
+                        email.next_attempt_at = timezone.now() + cls.backoff(email.attempts)
+                        stats['retry'] += 1
+                    updated.append(email)
+                    if not isinstance(e, cls.PERMANENT_ERRORS):
+                        SMTPConnectionPool.close()  # Connection có thể đã hỏng
+                else:
+                    sent.append(email.pk)
+                    stats['sent'] += 1
+
+        if sent:
+            EmailOutbox.objects.filter(pk__in=sent).update(
+                status=EmailOutbox.Status.SENT, sent_at=timezone.now(), updated_at=timezone.now(),
+            )
+        if updated:
+            for email in updated:
+                email.updated_at = now
+            EmailOutbox.objects.bulk_update(
+                updated, ['status', 'attempts', 'next_attempt_at', 'last_error', 'updated_at'],
+            )
+        return stats
@@ -5,4 +5,6 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
-        read_only_fields = ['recipient', 'verb', 'description', 'target', 'created_at']
\ No newline at end of file
+        read_only_fields = ['recipient', 'verb', 'description', 'target', 'created_at']
+        # List serialize thẳng từ values_list() (apps/core/fast_serializers.py)
+        fast_read = True
\ No newline at end of file
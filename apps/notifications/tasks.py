@@ -37,3 +37,28 @@ def send_websocket_notification(self, recipient_id, notification_data):
         logger.error(f"Failed to send WebSocket notification: {exc}")
         # Retry sau 5 giây nếu thất bại
         raise self.retry(exc=exc, countdown=5)
+
+
+@shared_task
+def deliver_email_outbox():
+    """
+    Worker gửi email từ EmailOutbox (queue `emails`), gửi hết email đến hạn theo từng lô
+    Được hẹn sau mỗi lần enqueue + chạy mỗi phút (email retry/defer, lần hẹn bị lỡ)
+    """
+    from django.core.cache import cache
+    from .outbox import EmailOutboxService
+
+    # Email enqueue trong lúc đang gửi sẽ hẹn lần chạy mới
+    cache.delete(EmailOutboxService.KICK_KEY)
+
+    totals = {}
+    while True:
+        stats = EmailOutboxService.drain()
+        for name, value in stats.items():
+            totals[name] = totals.get(name, 0) + value
+        if stats['claimed'] < EmailOutboxService.batch_size():
+            break
+
+    if totals.get('claimed'):
+        logger.info(f"Email outbox delivered: {totals}")
+    return totals
@@ -1,4 +1,9 @@
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from rest_framework.test import APITestCase, APIClient
@@ -7,10 +12,12 @@ from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 
-from .models import Notification
+from .models import EmailOutbox, Notification
+from .outbox import EmailOutboxService, SMTPConnectionPool
 from apps.jobs.models import Job
 from apps.companies.models import Company
 from apps.applications.models import Application
+from apps.core.testing import LOCAL_TEST_SETTINGS
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 User = get_user_model()
@@ -548,3 +555,79 @@ class NotificationCreationTest(TestCase):
         # No new notification should be created
         # (Signal only triggers on status changes to INTERVIEW/REJECTED/ACCEPTED)
         self.assertEqual(Notification.objects.count(), initial_count + 1)  # +1 from creation
+
+
+@override_settings(
+    **LOCAL_TEST_SETTINGS,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class EmailOutboxTest(TestCase):
+    """Test cho EmailOutbox (ghi trong transaction, gửi theo lô, dedupe, rate limit, retry)"""
+
+    def setUp(self):
+        cache.clear()
+        SMTPConnectionPool.close()
+
+    def test_dedupe_key_prevents_duplicate_email(self):
+        for _ in range(2):
+            EmailOutboxService.enqueue('user@test.com', 'Hello', 'Body', dedupe_key='welcome:1')
+
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+        self.assertEqual(EmailOutbox.objects.get().domain, 'test.com')
+
+    def test_rollback_discards_email(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                EmailOutboxService.enqueue('user@test.com', 'Hello', 'Body', dedupe_key='k')
+                raise RuntimeError
+
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_drain_sends_batch_with_attachments(self):
+        EmailOutboxService.enqueue_many([
+            EmailOutboxService.build(f'user{i}@test.com', 'Hi', 'Body', dedupe_key=f'k{i}')
+            for i in range(3)
+        ] + [
+            EmailOutboxService.build(
+                'ics@test.com', 'Invite', 'Body', dedupe_key='ics', html_body='<b>Body</b>',
+                attachments=[('invite.ics', b'BEGIN:VCALENDAR', 'text/calendar')],
+            ),
+        ])
+
+        stats = EmailOutboxService.drain()
+
+        self.assertEqual(stats['sent'], 4)
+        self.assertEqual(len(mail.outbox), 4)
+        invite = next(m for m in mail.outbox if m.to == ['ics@test.com'])
+        self.assertEqual(invite.attachments[0][1], 'BEGIN:VCALENDAR')  # text/* được decode lại thành str
+        self.assertEqual(invite.alternatives[0][0], '<b>Body</b>')
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.Status.SENT).exists())
+
+    @override_settings(EMAIL_OUTBOX_DOMAIN_RATE_LIMITS={'test.com': 2})
+    def test_domain_rate_limit_defers_overflow(self):
+        EmailOutboxService.enqueue_many([
+            EmailOutboxService.build(f'user{i}@test.com', 'Hi', 'Body', dedupe_key=f'k{i}')
+            for i in range(3)
+        ])
+
+        stats = EmailOutboxService.drain()
+
+        self.assertEqual((stats['sent'], stats['deferred']), (2, 1))
+        deferred = EmailOutbox.objects.get(status=EmailOutbox.Status.PENDING)
+        self.assertEqual(deferred.attempts, 0)
+        self.assertGreater(deferred.next_attempt_at, timezone.now())
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_send_retries_with_backoff(self):
+        EmailOutboxService.enqueue('user@test.com', 'Hi', 'Body', dedupe_key='k')
+
+        with patch.object(EmailOutboxService, 'send', side_effect=OSError('connection reset')):
+            self.assertEqual(EmailOutboxService.drain()['retry'], 1)
+            email = EmailOutbox.objects.get()
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(EmailOutboxService.drain()['failed'], 1)
+
+        self.assertEqual(EmailOutbox.objects.get().status, EmailOutbox.Status.FAILED)
@@ -4,12 +4,12 @@ from celery import shared_task
 from django.template.loader import render_to_string 
 from django.conf import settings
 from django.core.files.base import ContentFile
-from django.core.mail import send_mail
 from django.utils import timezone # Cần thêm import này nếu chưa có
 from django.utils.translation import gettext as _  # Use gettext (not lazy) for runtime
 
 from weasyprint import HTML 
 from apps.resumes.models import Resume
+from apps.notifications.outbox import EmailOutboxService
 
 logger = logging.getLogger(__name__)
 
@@ -49,20 +49,20 @@ def generate_resume_pdf_async(self, resume_id):
         full_download_url = f"{frontend_url}{relative_url}" if not relative_url.startswith('http') else relative_url
         
         # Kiểm tra xem có email user không trước khi gửi
+        # Email vào outbox (worker `emails` gửi); task retry sau bước này không tạo email trùng
         if resume.user.email:
             try:
-                send_mail(
+                EmailOutboxService.enqueue(
+                    to_email=resume.user.email,
                     subject=str(_('Your CV is ready for download')),
-                    message=_("Your CV ({title}) has been successfully created. Download at: {url}").format(
+                    body=_("Your CV ({title}) has been successfully created. Download at: {url}").format(
                         title=resume.title,
                         url=full_download_url
                     ),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[resume.user.email],
-                    fail_silently=True, # Không raise lỗi nếu gửi mail thất bại
+                    dedupe_key=f"resume-pdf:{resume_id}:{filename}",
                 )
             except Exception as e:
-                logger.error(f"Failed to send email for resume {resume_id}: {e}")
+                logger.error(f"Failed to queue email for resume {resume_id}: {e}")
 
         return f"PDF generated and saved for Resume ID: {resume_id}"
 
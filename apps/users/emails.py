@@ -0,0 +1,49 @@
+"""
+Email tài khoản (ghi vào EmailOutbox, worker `emails` gửi)
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+from django.utils.translation import gettext as _
+
+from apps.notifications.outbox import EmailOutboxService
+
+
+def welcome_email(user):
+    """Email chào mừng RECRUITER mới đăng ký (đang chờ duyệt)"""
+    return EmailOutboxService.build(
+        to_email=user.email,
+        subject=str(_('Account Registration - Pending Approval')),
+        body=_(
+            "Hello {name},\n\n"
+            "Thank you for registering as a Recruiter on OneTop.\n\n"
+            "Your account is currently pending approval by our admin team. "
+            "You will receive another email once your account has been approved and you can start posting jobs.\n\n"
+            "This process usually takes 1-2 business days.\n\n"
+            "Best regards,\nOneTop Team"
+        ).format(name=user.full_name),
+        dedupe_key=f"welcome:{user.id}",
+    )
+
+
+def recruiter_approved_email(user):
+    """
+    Email báo tài khoản RECRUITER đã được duyệt
+    dedupe_key theo user => mỗi lần save() sau đó của tài khoản đã active không gửi lại
+    """
+    context = {
+        'user': user,
+        'SITE_URL': getattr(settings, 'FRONTEND_URL', 'http://localhost:3000'),
+        'current_year': datetime.now().year
+    }
+    html_content = render_to_string('emails/recruiter_approved.html', context)
+
+    return EmailOutboxService.build(
+        to_email=user.email,
+        subject='Your OneTop Recruiter Account Has Been Approved!',
+        body=strip_tags(html_content),
+        html_body=html_content,
+        dedupe_key=f"recruiter-approved:{user.id}",
+    )
@@ -1,8 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 
 User = get_user_model()
@@ -32,26 +32,23 @@ class RegisterSerializer(serializers.ModelSerializer):
         if user_type == 'RECRUITER':
             is_active = False
 
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            username=validated_data['email'],  # Username = Email (no separate username field)
-            password=validated_data['password'],
-            full_name=validated_data['full_name'],
-            phone_number=validated_data.get('phone_number', ''),  # CRITICAL FIX: Save phone_number
-            user_type=user_type,
-            is_active=is_active # <-- Tham số quan trọng
-        )
-        
-        # CRITICAL FIX #5: Async email để không làm chậm API (1-3 giây SMTP connection)
-        # Chuyển sang Celery task thay vì send_mail đồng bộ
-        if user_type == 'RECRUITER' and not is_active:
-            from apps.users.tasks import send_welcome_email_task
-            # Delay task để không block response
-            send_welcome_email_task.delay(
-                user_id=user.id,
-                user_email=user.email,
-                user_full_name=user.full_name
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email=validated_data['email'],
+                username=validated_data['email'],  # Username = Email (no separate username field)
+                password=validated_data['password'],
+                full_name=validated_data['full_name'],
+                phone_number=validated_data.get('phone_number', ''),  # CRITICAL FIX: Save phone_number
+                user_type=user_type,
+                is_active=is_active # <-- Tham số quan trọng
             )
+
+            # Email chào mừng ghi vào outbox cùng transaction (worker `emails` gửi sau commit,
+            # API không chờ SMTP)
+            if user_type == 'RECRUITER' and not is_active:
+                from apps.notifications.outbox import EmailOutboxService
+                from apps.users.emails import welcome_email
+                EmailOutboxService.enqueue_many([welcome_email(user)])
         
         return user
 
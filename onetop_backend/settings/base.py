@@ -159,7 +159,25 @@ REST_FRAMEWORK = {
     'DEFAULT_VERSION': 'v1',
     'ALLOWED_VERSIONS': ['v1', 'v2'],  # Sẵn sàng cho v2
     'VERSION_PARAM': 'version',
+    # Mọi list endpoint: keyset cursor (created_at, pkid); thứ tự không keyset được => offset + count ước lượng
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.KeysetPagination',
+    'PAGE_SIZE': env.int('API_PAGE_SIZE', default=20),
+    # JSON encode/decode bằng orjson (chưa cài orjson => tự dùng json của stdlib)
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
+# ?page_size tối đa; offset pagination đếm chính xác tới ngưỡng này, lớn hơn thì ước lượng (pg_class/EXPLAIN)
+API_MAX_PAGE_SIZE = env.int('API_MAX_PAGE_SIZE', default=100)
+API_COUNT_ESTIMATE_THRESHOLD = env.int('API_COUNT_ESTIMATE_THRESHOLD', default=10000)
+# List endpoint opt-in (Meta.fast_read) serialize thẳng từ values_list() - False => serializer DRF (so sánh/rollback)
+API_FAST_SERIALIZATION = env.bool('API_FAST_SERIALIZATION', default=True)
 
 # --- 9. JWT (SIMPLE JWT) ---
 SIMPLE_JWT = {
@@ -213,6 +231,22 @@ EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='noreply@onetop.vn')
 
+# Email outbox (apps/notifications/outbox.py): worker queue `emails` gửi theo lô qua connection giữ mở
+EMAIL_OUTBOX_BATCH_SIZE = env.int('EMAIL_OUTBOX_BATCH_SIZE', default=100)
+EMAIL_OUTBOX_KICK_DELAY = env.int('EMAIL_OUTBOX_KICK_DELAY', default=1)  # seconds
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5)
+EMAIL_OUTBOX_RETRY_BASE_DELAY = env.int('EMAIL_OUTBOX_RETRY_BASE_DELAY', default=60)  # seconds, x2 mỗi lần thử
+EMAIL_OUTBOX_SENDING_TIMEOUT = env.int('EMAIL_OUTBOX_SENDING_TIMEOUT', default=600)  # seconds
+EMAIL_OUTBOX_CONNECTION_MAX_AGE = env.int('EMAIL_OUTBOX_CONNECTION_MAX_AGE', default=300)  # seconds
+# Số email tối đa mỗi phút theo domain người nhận (domain khác dùng DEFAULT)
+EMAIL_OUTBOX_DEFAULT_RATE_LIMIT = env.int('EMAIL_OUTBOX_DEFAULT_RATE_LIMIT', default=300)
+EMAIL_OUTBOX_DOMAIN_RATE_LIMITS = env.dict('EMAIL_OUTBOX_DOMAIN_RATE_LIMITS', cast={'value': int}, default={
+    'gmail.com': 600,
+    'yahoo.com': 200,
+    'outlook.com': 200,
+    'hotmail.com': 200,
+})
+
 # --- 13. VNPAY CONFIGURATION ---
 VNPAY_TMN_CODE = env('VNPAY_TMN_CODE', default='')
 VNPAY_HASH_SECRET = env('VNPAY_HASH_SECRET', default='')
@@ -246,6 +280,8 @@ CELERY_TASK_ROUTES = {
     # Heavy tasks (PDF generation) go to dedicated queue
     # FIX: Correct task name is generate_resume_pdf_async, not generate_resume_pdf
     'apps.resumes.tasks.generate_resume_pdf_async': {'queue': 'heavy_tasks'},
+    # Email outbox: worker riêng, giữ connection SMTP giữa các lô
+    'apps.notifications.tasks.deliver_email_outbox': {'queue': 'emails'},
     # All other tasks use default queue
     '*': {'queue': 'celery'},
 }
@@ -253,6 +289,7 @@ CELERY_TASK_ROUTES = {
 # Worker configuration hints:
 # Default worker: celery -A onetop_backend worker -Q celery --concurrency=4
 # Heavy worker: celery -A onetop_backend worker -Q heavy_tasks --concurrency=2
+# Email worker: celery -A onetop_backend worker -Q emails --concurrency=2
 
 # Default Primary Key
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -271,6 +308,30 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.applications.tasks.check_upcoming_interviews',
         'schedule': crontab(minute='*/5'),
     },
+    'refresh-job-recommendations-nightly': {
+        'task': 'apps.jobs.tasks.refresh_all_recommendations',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'flush-job-view-counts-every-minute': {
+        'task': 'apps.jobs.tasks.flush_job_view_counts',
+        'schedule': crontab(minute='*'),
+    },
+    'close-expired-jobs-every-day': {
+        'task': 'apps.jobs.tasks.close_expired_jobs',
+        'schedule': crontab(hour=0, minute=5),
+    },
+    'deliver-email-outbox-every-minute': {
+        'task': 'apps.notifications.tasks.deliver_email_outbox',
+        'schedule': crontab(minute='*'),
+    },
+    'rollup-job-daily-stats-every-5-minutes': {
+        'task': 'apps.jobs.tasks.rollup_job_daily_stats',
+        'schedule': crontab(minute='*/5'),
+    },
+    'reconcile-recruiter-stats-nightly': {
+        'task': 'apps.companies.tasks.reconcile_recruiter_stats',
+        'schedule': crontab(hour=2, minute=30),
+    },
 }
 
 # --- 16. ELASTICSEARCH CONFIGURATION ---
@@ -280,6 +341,10 @@ ELASTICSEARCH_DSL = {
     },
 }
 
+# Shards/replicas của index jobs_v{n} (áp dụng khi build index mới bằng reindex_jobs)
+ES_JOBS_INDEX_SHARDS = env.int('ES_JOBS_INDEX_SHARDS', default=1)
+ES_JOBS_INDEX_REPLICAS = env.int('ES_JOBS_INDEX_REPLICAS', default=0)
+
 # CRITICAL FIX: Use Celery for async Elasticsearch indexing
 # Prevents API blocking when ES is slow/down
 # Set to 'celery' in production, 'default' in development
@@ -287,7 +352,9 @@ ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = env(
     'ELASTICSEARCH_DSL_SIGNAL_PROCESSOR',
     default='django_elasticsearch_dsl.signals.RealTimeSignalProcessor'  # Sync for dev
 )
-# Production value: 'django_elasticsearch_dsl.signals.CelerySignalProcessor'
+# Production value: 'apps.jobs.signal_processors.CoalescingSignalProcessor'
+# (gom thay đổi Job, đồng bộ bằng 1 request _bulk sau JOB_INDEX_FLUSH_DELAY giây)
+JOB_INDEX_FLUSH_DELAY = env.int('JOB_INDEX_FLUSH_DELAY', default=2)  # seconds
 
 # --- 17. REDIS CACHE CONFIGURATION ---
 CACHES = {
@@ -328,6 +395,10 @@ MAX_COMPANY_LOGO_SIZE = env.int('MAX_COMPANY_LOGO_SIZE', default=2 * 1024 * 1024
 
 # Email batch size for job alerts
 JOB_ALERT_BATCH_SIZE = env.int('JOB_ALERT_BATCH_SIZE', default=500)
+# Số lô job alert chạy song song tối đa (số chain trong group)
+JOB_ALERT_CONCURRENCY = env.int('JOB_ALERT_CONCURRENCY', default=4)
+# Job đã percolate chờ digest quá hạn này mà user chưa nhận (subscription tắt...) sẽ bị bỏ
+JOB_ALERT_PENDING_TTL = env.int('JOB_ALERT_PENDING_TTL', default=60 * 60 * 24 * 7)  # 7 days
 
 # PDF generation timeout (seconds)
 PDF_GENERATION_TIMEOUT = env.int('PDF_GENERATION_TIMEOUT', default=30)
@@ -357,6 +428,62 @@ ES_SEARCH_FIELDS = env.list('ES_SEARCH_FIELDS', default=[
     'company.name'
 ])
 
+# Search mode: trả job card trực tiếp từ `_source` + search_after cursor (không hit Postgres)
+# Set False để quay về mode cũ (to_queryset + DB serialize)
+ES_SEARCH_SERVE_FROM_SOURCE = env.bool('ES_SEARCH_SERVE_FROM_SOURCE', default=True)
+ES_SEARCH_PAGE_SIZE = env.int('ES_SEARCH_PAGE_SIZE', default=20)
+ES_SEARCH_MAX_PAGE_SIZE = env.int('ES_SEARCH_MAX_PAGE_SIZE', default=100)
+# Faceted search: số bucket tối đa cho terms facet, bước histogram lương
+ES_SEARCH_FACET_SIZE = env.int('ES_SEARCH_FACET_SIZE', default=20)
+ES_SEARCH_SALARY_HISTOGRAM_INTERVAL = env.int('ES_SEARCH_SALARY_HISTOGRAM_INTERVAL', default=1000)
+
+# Backend search: 'elasticsearch' (Postgres full-text làm fallback), 'postgres' (chạy không cần ES)
+# hoặc 'memory' (inverted index trong process - catalog nhỏ/1 node, xem apps/jobs/memory_search.py)
+JOB_SEARCH_BACKEND = env('JOB_SEARCH_BACKEND', default='elasticsearch')
+# Circuit breaker của ES: lỗi/chậm quá budget (giây) N lần => dùng Postgres trong RESET_TIMEOUT giây
+JOB_SEARCH_CIRCUIT_FAILURE_THRESHOLD = env.int('JOB_SEARCH_CIRCUIT_FAILURE_THRESHOLD', default=5)
+JOB_SEARCH_CIRCUIT_RESET_TIMEOUT = env.int('JOB_SEARCH_CIRCUIT_RESET_TIMEOUT', default=30)  # seconds
+JOB_SEARCH_CIRCUIT_LATENCY_BUDGET = env.float('JOB_SEARCH_CIRCUIT_LATENCY_BUDGET', default=2.0)  # seconds
+# Không có ES thì cũng không đồng bộ index khi Job thay đổi
+ELASTICSEARCH_DSL_AUTOSYNC = env.bool('ELASTICSEARCH_DSL_AUTOSYNC', default=JOB_SEARCH_BACKEND == 'elasticsearch')
+# Backend memory: file snapshot (rỗng = không snapshot, build từ DB mỗi lần khởi động)
+# và chu kỳ đọc lại job thay đổi bởi process khác
+JOB_MEMORY_INDEX_PATH = env('JOB_MEMORY_INDEX_PATH', default='')
+JOB_MEMORY_INDEX_REFRESH_INTERVAL = env.int('JOB_MEMORY_INDEX_REFRESH_INTERVAL', default=5)  # seconds
+# Geo search (?near=lat,lon&radius=): bán kính mặc định/tối đa (km)
+JOB_SEARCH_DEFAULT_RADIUS_KM = env.float('JOB_SEARCH_DEFAULT_RADIUS_KM', default=25)
+JOB_SEARCH_MAX_RADIUS_KM = env.float('JOB_SEARCH_MAX_RADIUS_KM', default=500)
+
+# Cache kết quả search/recommendation (invalidate theo generation khi index thay đổi)
+JOB_SEARCH_CACHE_ENABLED = env.bool('JOB_SEARCH_CACHE_ENABLED', default=True)
+JOB_SEARCH_CACHE_TTL = env.int('JOB_SEARCH_CACHE_TTL', default=300)  # seconds
+
+# Cache chi tiết job: invalidate theo tag (Job/Company signals) nên TTL dài được
+JOB_DETAIL_CACHE_TTL = env.int('JOB_DETAIL_CACHE_TTL', default=60 * 60 * 6)  # 6 hours
+
+# Gợi ý việc làm tính sẵn theo ứng viên (Redis ZSET): top-K, TTL, debounce khi CV đổi
+JOB_RECOMMENDATION_SIZE = env.int('JOB_RECOMMENDATION_SIZE', default=50)
+JOB_RECOMMENDATION_TTL = env.int('JOB_RECOMMENDATION_TTL', default=60 * 60 * 48)  # 2 days
+JOB_RECOMMENDATION_RECOMPUTE_DELAY = env.int('JOB_RECOMMENDATION_RECOMPUTE_DELAY', default=30)  # seconds
+
+# Lượt xem job: buffer trên Redis, flush mỗi phút (số job mỗi câu UPDATE ... FROM VALUES)
+JOB_VIEW_FLUSH_BATCH_SIZE = env.int('JOB_VIEW_FLUSH_BATCH_SIZE', default=1000)
+# Lock (SET NX EX) cho 1 lần flush; đánh dấu lô đã áp dụng giữ lại bao nhiêu ngày
+JOB_VIEW_FLUSH_LOCK_TIMEOUT = env.int('JOB_VIEW_FLUSH_LOCK_TIMEOUT', default=300)  # seconds
+JOB_VIEW_FLUSH_MARKER_DAYS = env.int('JOB_VIEW_FLUSH_MARKER_DAYS', default=7)
+
+# Tự đóng job quá deadline mỗi đêm: số job mỗi câu UPDATE (1 transaction/lô)
+JOB_EXPIRY_BATCH_SIZE = env.int('JOB_EXPIRY_BATCH_SIZE', default=1000)
+
+# Analytics theo ngày: khoảng tối đa 1 lần xem (ngày), số ngày quét lại khi task rollup mất mốc lần chạy trước
+JOB_ANALYTICS_MAX_RANGE_DAYS = env.int('JOB_ANALYTICS_MAX_RANGE_DAYS', default=366)
+JOB_ANALYTICS_ROLLUP_LOOKBACK_DAYS = env.int('JOB_ANALYTICS_ROLLUP_LOOKBACK_DAYS', default=2)
+
+# Autocomplete (completion suggester) - cache ngắn theo prefix đã chuẩn hóa
+JOB_AUTOCOMPLETE_MIN_CHARS = env.int('JOB_AUTOCOMPLETE_MIN_CHARS', default=2)
+JOB_AUTOCOMPLETE_MAX_SIZE = env.int('JOB_AUTOCOMPLETE_MAX_SIZE', default=10)
+JOB_AUTOCOMPLETE_CACHE_TTL = env.int('JOB_AUTOCOMPLETE_CACHE_TTL', default=60)  # seconds
+
 
 # --- 20. DATABASE CONCURRENCY CONTROL ---
 # Enable Optimistic Locking for high-traffic models
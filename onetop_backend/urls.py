@@ -3,7 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
-from apps.core.views import download_resume_pdf, download_application_cv, WebSocketTicketView
+from apps.core.views import download_resume_pdf, download_application_cv, WebSocketTicketView, GeneralConfigView
 
 # --- API VERSION CONFIGURATION ---
 # Dynamic versioning - Dễ dàng thêm v2, v3 sau này
@@ -34,6 +34,9 @@ urlpatterns = [
     
     # --- WebSocket Ticket (One-time auth) ---
     path('api/v1/ws-ticket/', WebSocketTicketView.as_view(), name='ws-ticket'),
+
+    # --- Cấu hình chung cho Frontend (choices, danh mục địa điểm) ---
+    path('api/v1/config/', GeneralConfigView.as_view(), name='general-config'),
     
     # --- Secure Media Downloads (Protected Files) ---
     path('api/v1/media/resume/<uuid:resume_id>/download/', download_resume_pdf, name='download-resume-pdf'),